@@ -1,12 +1,212 @@
+import json
 import os
-from collections import Counter
-from flask import Flask, request, jsonify
-from news_extraction import fetch_news
-from comparative_analysis import comparative_sentiment_analysis
-from tts_converter import text_to_speech_hindi
+import sys
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta, timezone
+from flask import Flask, Response, g, request, jsonify
+from article_batch import ArticleBatch
+from article_store import canonical_url, get_article_store
+from jobs import JobManager, JobQueueFull
+from metrics import REGISTRY, SLOW_REQUEST_SECONDS, finish_trace, start_trace, submit_in_context
+from model_loader import warm_up
+from news_extraction import NEWS_SOURCES, fetch_news, iter_news, score_news
+from summarization import summarize_cached, summarize_urls
+from response_cache import ResponseCache, create_backend, normalize_company
+from responses import CursorError, dumps, json_response, page_options, paginate, select_fields
+from deduplication import article_text, cluster_near_duplicates, collapse_duplicates, fan_out
+from comparative_analysis import (
+    COVERAGE_MODES,
+    ArticleAggregator,
+    annotate_topics,
+    compare_companies,
+    comparative_sentiment_analysis,
+)
+from translation import get_translator
+from upstream import UPSTREAM_BREAKER_RESET, UpstreamError, upstream_stats
+from tts_converter import AUDIO_CACHE, iter_speech_hindi, stream_stats, text_to_speech_hindi, text_to_speech_hindi_batch
+from watchlist import Watchlist, load_watchlist, parse_entry
 
 app = Flask(__name__)
 
+# Shared cache for news fetches and analysis results (in-process, or Redis when configured)
+RESPONSE_CACHE = ResponseCache(create_backend())
+
+# Background worker pool for long-running analysis and TTS jobs
+JOB_MANAGER = JobManager()
+
+# Scheduled monitor of watched companies (started by POST /watchlist, or at startup from WATCHLIST_FILE)
+WATCHLIST = Watchlist()
+WATCHLIST_FILE = os.environ.get("WATCHLIST_FILE")
+
+# Upper bounds for the article count and page depth clients may request
+MAX_ARTICLES = 200
+MAX_PAGES = 20
+
+# /summarize: URL lists longer than this are fetched by a background job, and the summary length cap
+MAX_SYNC_SUMMARY_URLS = 10
+MAX_SUMMARY_SENTENCES = 10
+
+# Longest history window served by /trends (days)
+MAX_TREND_DAYS = 365
+
+# Companies accepted by one /analyze_batch call, and how many are fetched or analyzed at once
+MAX_BATCH_COMPANIES = 50
+BATCH_WORKERS = 8
+
+
+@app.before_request
+def _start_request_trace():
+    """Start collecting per-stage timings for this request under a trace id."""
+    g.trace_id = request.headers.get("X-Trace-Id") or uuid.uuid4().hex
+    g.trace_token = start_trace(g.trace_id)
+    g.request_start = time.perf_counter()
+
+
+@app.after_request
+def _finish_request_trace(response):
+    """Record request latency, tag the response with its trace id and log slow requests."""
+    token = g.pop("trace_token", None)
+    if token is None:
+        return response
+    trace = finish_trace(token)
+    elapsed = time.perf_counter() - g.request_start
+    endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+    REGISTRY.observe("newsapp_http_request_seconds", elapsed, endpoint=endpoint, method=request.method)
+    response.headers["X-Trace-Id"] = g.trace_id
+
+    if elapsed > SLOW_REQUEST_SECONDS:
+        REGISTRY.inc("newsapp_slow_requests_total", endpoint=endpoint)
+        breakdown = ", ".join(f"{name}={seconds * 1000:.0f}ms" for name, seconds in sorted(trace.get("stages", {}).items()))
+        print(f"🐢 Slow request {request.method} {request.full_path} [{g.trace_id}] took {elapsed:.2f}s ({breakdown or 'no stages'})")
+    return response
+
+
+@app.teardown_request
+def _reset_request_trace(exc):
+    """Drop the trace context if the request failed before `after_request` ran."""
+    token = g.pop("trace_token", None)
+    if token is not None:
+        finish_trace(token)
+
+
+def _collect_component_stats():
+    """Expose cache, queue and streaming counters tracked by the components as gauges."""
+    for name, value in AUDIO_CACHE.stats().items():
+        yield "newsapp_audio_cache", "Audio cache state.", {"field": name}, value
+    for name, value in RESPONSE_CACHE.stats().items():
+        yield "newsapp_response_cache", "Response cache state.", {"field": name}, value
+    for name, value in get_translator().stats().items():
+        yield "newsapp_translation_cache", "Translation memo state.", {"field": name}, value
+    for name, value in JOB_MANAGER.stats().items():
+        yield "newsapp_jobs", "Background job queue state.", {"field": name}, value
+    for name, value in stream_stats().items():
+        yield "newsapp_tts_stream", "Streaming TTS first-byte latency and truncated streams.", {"field": name}, value
+    for name, value in get_article_store().stats().items():
+        yield "newsapp_article_store", "Articles kept in the article store.", {"field": name}, value
+    for name, value in WATCHLIST.stats().items():
+        yield "newsapp_watchlist", "Watchlist scheduler state.", {"field": name}, value
+    for host, stats in upstream_stats().items():
+        for name, value in stats.items():
+            yield "newsapp_upstream", "Upstream rate limiter, concurrency limit and circuit state.", {"host": host, "field": name}, value
+
+
+REGISTRY.register_collector(_collect_component_stats)
+
+
+def _news_options():
+    """
+    Parse the optional `limit`, `pages` and `sources` query parameters of the news endpoints.
+
+    Returns:
+        tuple: (options dict for `fetch_news`, None) or (None, error response).
+    """
+    try:
+        limit = min(int(request.args.get("limit", 10)), MAX_ARTICLES)
+        pages = min(int(request.args.get("pages", 1)), MAX_PAGES)
+    except ValueError:
+        return None, (jsonify({"error": "limit and pages must be integers"}), 400)
+    if limit < 1 or pages < 1:
+        return None, (jsonify({"error": "limit and pages must be at least 1"}), 400)
+
+    sources = tuple(source.strip() for source in request.args.get("sources", "bing").split(",") if source.strip())
+    unknown = [source for source in sources if source not in NEWS_SOURCES]
+    if not sources or unknown:
+        return None, (jsonify({"error": f"sources must be drawn from {', '.join(NEWS_SOURCES)}"}), 400)
+
+    return {"limit": limit, "pages": pages, "sources": sources}, None
+
+
+def _upstream_unavailable(error: UpstreamError):
+    """503 response for an upstream outage, telling the client when to retry."""
+    response = jsonify({"error": str(error)})
+    response.headers["Retry-After"] = str(max(1, round(error.retry_after or UPSTREAM_BREAKER_RESET)))
+    return response, 503
+
+
+def _news_cache_key(company: str, options: dict) -> str:
+    """Cache key for a news fetch: normalized company name plus fetch options."""
+    return f"news:{normalize_company(company)}:{options['limit']}:{options['pages']}:{','.join(options['sources'])}"
+
+
+def _cached_news(company: str, options: dict) -> list:
+    """Fetch news through the response cache, coalescing concurrent identical fetches."""
+    return RESPONSE_CACHE.get_or_compute(
+        _news_cache_key(company, options), lambda: fetch_news(company, store=get_article_store(), **options)
+    )
+
+
+def _build_analysis(company: str, options: dict, coverage: dict):
+    """
+    Fetch a company's news and analyze it.
+
+    Returns:
+        dict | None: The /analyze response body, or None when no news was found.
+    """
+    news_list = _cached_news(company, options)
+    if not news_list:
+        return None
+    return _analyze_news(news_list, coverage, company)
+
+
+def _analyze_news(news_list: list, coverage: dict, company: str = None) -> dict:
+    """
+    Run topic extraction, comparative analysis and aggregation over fetched articles.
+
+    Syndicated copies of the same story are collapsed first: topics and coverage comparison run
+    once per cluster, while the distribution and trends still count every copy.
+
+    Returns:
+        dict: The /analyze response body.
+    """
+    # Copy articles, since cached articles are shared between requests
+    news_list = [dict(news) for news in news_list]
+    representatives, labels = collapse_duplicates(news_list)
+
+    # Extract topics in one batch per story, share them with its copies, and save new ones
+    untagged = [news for news in news_list if news.get("topics") is None]
+    annotate_topics(representatives)
+    fan_out(news_list, labels, fields=("topics",))
+    if company and untagged:
+        get_article_store().update_articles(company, untagged, fields=("topics",))
+
+    # Sentiment distribution, date-wise trend and keyword frequency computed over columns
+    aggregator = ArticleAggregator().extend(ArticleBatch.from_articles(news_list))
+
+    # Perform comparative sentiment analysis (only the most relevant article pairs by default)
+    sentiment_data = comparative_sentiment_analysis(representatives, aggregator=aggregator, **coverage)
+
+    # Prepare response
+    return {
+        "sentiment_distribution": aggregator.distribution(),
+        "sentiment_trends": aggregator.trends,
+        "keyword_frequency": aggregator.top_keywords(10),  # Top 10 keywords
+        "news_list": representatives,  # One entry per story, with cluster_size and duplicates
+        "duplicates_removed": len(news_list) - len(representatives),
+        "analysis_summary": sentiment_data,  # Additional insights from comparative analysis
+    }
+
 
 @app.route("/fetch_news", methods=["GET"])
 def get_news():
@@ -17,59 +217,334 @@ def get_news():
     if not company:
         return jsonify({"error": "Company name is required"}), 400
 
-    news_list = fetch_news(company)
+    options, error = _news_options()
+    if error:
+        return error
+
+    try:
+        page_size, cursors = page_options("cursor")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        news_list = _cached_news(company, options)
+    except UpstreamError as e:
+        return _upstream_unavailable(e)
     if not news_list:
         return jsonify({"error": "No news found for this company"}), 404
 
-    return jsonify(news_list)
+    if not page_size:
+        return json_response(news_list)
+    try:
+        page, info = paginate(news_list, cursors["cursor"], page_size)
+    except CursorError as e:
+        return jsonify({"error": str(e)}), e.status
+    headers = {"X-Total-Count": str(info["total"])}
+    if info["next_cursor"]:
+        headers["X-Next-Cursor"] = info["next_cursor"]
+    return json_response(page, headers=headers)
+
+
+def _coverage_options():
+    """
+    Parse the coverage comparison query parameters of the analysis endpoints.
+
+    Returns:
+        tuple: (options dict for `comparative_sentiment_analysis`, None) or (None, error response).
+    """
+    coverage_mode = request.args.get("coverage", "similar")
+    if coverage_mode not in COVERAGE_MODES:
+        return None, (jsonify({"error": f"coverage must be one of {', '.join(COVERAGE_MODES)}"}), 400)
+    try:
+        coverage = {
+            "coverage_mode": coverage_mode,
+            "top_k": int(request.args.get("top_k", 10)),
+            "offset": int(request.args.get("coverage_offset", 0)),
+            "limit": int(request.args["coverage_limit"]) if "coverage_limit" in request.args else None,
+        }
+    except ValueError:
+        return None, (jsonify({"error": "top_k, coverage_offset and coverage_limit must be integers"}), 400)
+    if coverage["top_k"] < 1:
+        return None, (jsonify({"error": "top_k must be at least 1"}), 400)
+    if coverage["offset"] < 0 or (coverage["limit"] is not None and coverage["limit"] < 0):
+        return None, (jsonify({"error": "coverage_offset and coverage_limit must not be negative"}), 400)
+    return coverage, None
+
+
+def _paginate_analysis(response_data: dict, page_size: int, cursors: dict) -> dict:
+    """
+    Cut the article list and the coverage comparisons of an analysis into pages.
+
+    Returns:
+        dict: A copy of the response with one page of each list and a "pagination" section
+              holding their totals and next cursors.
+
+    Raises:
+        CursorError: If a cursor doesn't belong to this result.
+    """
+    news_list, news_page = paginate(response_data["news_list"], cursors["news_cursor"], page_size)
+    summary = dict(response_data["analysis_summary"])
+    summary["Coverage Differences"], coverage_page = paginate(
+        summary.get("Coverage Differences", []), cursors["coverage_cursor"], page_size
+    )
+    return dict(
+        response_data,
+        news_list=news_list,
+        analysis_summary=summary,
+        pagination={"news_list": news_page, "coverage_differences": coverage_page},
+    )
 
 
 @app.route("/analyze", methods=["GET"])
 def analyze_sentiment():
     """
     Endpoint to analyze sentiment and extract insights from news articles.
+
+    Optional `fields` keeps only the named sections (e.g. "sentiment_distribution,analysis_summary.Majority Sentiment");
+    `page_size` with `news_cursor`/`coverage_cursor` pages through the article and comparison lists.
     """
     company = request.args.get("company")
     if not company:
         return jsonify({"error": "Company name is required"}), 400
 
-    # Fetch news articles
-    news_list = fetch_news(company)
-    if not news_list:
+    options, error = _news_options()
+    if error:
+        return error
+    coverage, error = _coverage_options()
+    if error:
+        return error
+    try:
+        page_size, cursors = page_options("news_cursor", "coverage_cursor")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    key = "analysis:" + _news_cache_key(company, options) + ":" + ":".join(str(value) for value in coverage.values())
+    try:
+        response_data = RESPONSE_CACHE.get_or_compute(key, lambda: _build_analysis(company, options, coverage))
+    except UpstreamError as e:
+        return _upstream_unavailable(e)
+    if not response_data:
         return jsonify({"error": "No news found for this company"}), 404
 
-    # Perform comparative sentiment analysis
-    sentiment_data = comparative_sentiment_analysis(news_list)
+    if page_size:
+        try:
+            response_data = _paginate_analysis(response_data, page_size, cursors)
+        except CursorError as e:
+            return jsonify({"error": str(e)}), e.status
+    fields = request.args.get("fields")
+    if fields:
+        response_data = select_fields(response_data, fields + ",pagination")
+    return json_response(response_data)
 
-    # Extract sentiment distribution
-    sentiment_counts = Counter(news["sentiment"] for news in news_list)
-    sentiment_distribution = {
-        "Positive": sentiment_counts.get("Positive", 0),
-        "Negative": sentiment_counts.get("Negative", 0),
-        "Neutral": sentiment_counts.get("Neutral", 0),
-    }
 
-    # Extract date-wise sentiment trend
-    sentiment_trends = {}
-    for news in news_list:
-        date = news["timestamp"][:10]  # Extract date part (YYYY-MM-DD)
-        sentiment_trends.setdefault(date, {"Positive": 0, "Negative": 0, "Neutral": 0})
-        sentiment_trends[date][news["sentiment"]] += 1
+def _prepare_companies(fetched: dict, shared: dict) -> dict:
+    """
+    Score and tag the fetched articles of several companies as one batch, reusing articles already processed.
 
-    # Extract keyword frequency
-    all_keywords = [keyword for news in news_list for keyword in news.get("keywords", [])]
-    keyword_counts = dict(Counter(all_keywords).most_common(10))  # Top 10 keywords
+    Articles are shared by canonical URL across the companies of a batch, so a story covering
+    several companies is scored once; stored articles are reused. The new articles of every
+    company in `fetched` are scored in one sentiment batch and tagged in one topic pass, then
+    saved to the article store.
 
-    # Prepare response
-    response_data = {
-        "sentiment_distribution": sentiment_distribution,
-        "sentiment_trends": sentiment_trends,
-        "keyword_frequency": keyword_counts,
-        "news_list": news_list,  # Send back news for display
-        "analysis_summary": sentiment_data,  # Additional insights from comparative analysis
-    }
+    Args:
+        fetched (dict): Company -> its unscored fetched articles.
+        shared (dict): Canonical URL -> article for every article processed in this batch so far.
+
+    Returns:
+        dict: Company -> scored articles with topics (shared dicts; copy before mutating).
+    """
+    store = get_article_store()
+    keys, known = {}, {}
+    for company, articles in fetched.items():
+        known[company] = store.get_many(company, [article["url"] for article in articles])
+        keys[company] = [canonical_url(article["url"]) for article in articles]
+        for key, article in zip(keys[company], articles):
+            if key in known[company] and "sentiment" not in shared.get(key, {}):
+                shared[key] = known[company][key]
+            shared.setdefault(key, article)
+
+    unique = [shared[key] for key in dict.fromkeys(key for company_keys in keys.values() for key in company_keys)]
+    score_news([article for article in unique if "sentiment" not in article])
+    untagged = [article for article in unique if article.get("topics") is None]
+    if untagged:
+        labels = cluster_near_duplicates([article_text(article) for article in untagged])
+        annotate_topics([article for i, article in enumerate(untagged) if labels[i] == i])
+        fan_out(untagged, labels, fields=("topics",))
+
+    for company in fetched:
+        store.add_articles(company, [shared[key] for key in keys[company] if key not in known[company]])
+        store.update_articles(company, [shared[key] for key in dict.fromkeys(keys[company])], fields=("topics",))
+    return {company: [shared[key] for key in keys[company]] for company in fetched}
+
+
+def _iter_batch_analysis(companies: list, options: dict, coverage: dict):
+    """
+    Analyze several companies, yielding each result as soon as that company is done.
+
+    Companies are fetched concurrently. Every fetch that has completed when the previous wave is
+    done is scored and tagged together in one batch (so fetches finishing while a wave is scored
+    form the next, larger one), and each company is then analyzed on a worker pool. This trades
+    one batch across all companies for a first result that doesn't wait for the slowest fetch.
+
+    Yields:
+        dict: {"company", "result"} or {"company", "error"} per company (in completion order),
+              then {"comparison": ...} across all companies.
+    """
+    def fetch(company):
+        try:
+            return list(iter_news(company, score=False, **options)), None
+        except UpstreamError as e:
+            return [], str(e)
 
-    return jsonify(response_data)
+    shared = {}  # canonical URL -> article, shared by every company it appears under
+    company_articles = {}
+    workers = min(BATCH_WORKERS, len(companies))
+    fetch_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch-fetch")
+    analyze_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch-analyze")
+    pending = {submit_in_context(fetch_pool, fetch, company): ("fetch", company) for company in companies}
+    try:
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            fetched = {}
+            for future in done:
+                stage_name, company = pending.pop(future)
+                try:
+                    if stage_name == "analyze":
+                        yield {"company": company, "result": future.result()}
+                        continue
+                    articles, error = future.result()
+                except Exception as e:
+                    print(f"❌ Batch analysis failed for {company}: {e}")
+                    yield {"company": company, "error": str(e)}
+                    continue
+                if error:
+                    yield {"company": company, "error": error}
+                elif not articles:
+                    company_articles[company] = []
+                    yield {"company": company, "error": "No news found for this company"}
+                else:
+                    fetched[company] = articles
+            if not fetched:
+                continue
+
+            # 🔹 Score and tag this wave's companies together, then analyze each one
+            try:
+                prepared = _prepare_companies(fetched, shared)
+            except Exception as e:
+                print(f"❌ Batch analysis failed for {', '.join(fetched)}: {e}")
+                for company in fetched:
+                    yield {"company": company, "error": str(e)}
+                continue
+            company_articles.update(prepared)
+            for company, articles in prepared.items():
+                pending[submit_in_context(analyze_pool, _analyze_news, articles, coverage)] = ("analyze", company)
+    except BaseException:
+        # The client went away (or the batch failed): drop queued work instead of waiting for every fetch
+        fetch_pool.shutdown(wait=False, cancel_futures=True)
+        analyze_pool.shutdown(wait=False, cancel_futures=True)
+        raise
+    fetch_pool.shutdown()
+    analyze_pool.shutdown()
+
+    company_articles = {company: company_articles[company] for company in companies if company in company_articles}
+    yield {"comparison": compare_companies(company_articles, key=lambda article: canonical_url(article["url"]))}
+
+
+@app.route("/analyze_batch", methods=["POST"])
+def analyze_batch():
+    """
+    Endpoint to analyze several companies at once and compare them.
+
+    Takes {"companies": [...]} plus the query parameters of /analyze. With `stream=1`, results
+    are streamed as newline-delimited JSON, one line per company as it completes and a final
+    comparison line; otherwise a single JSON document is returned.
+    """
+    data = request.get_json(silent=True) or {}
+    companies = data.get("companies")
+    if not isinstance(companies, list) or not all(isinstance(company, str) and company.strip() for company in companies):
+        return jsonify({"error": "A list of company names is required"}), 400
+    # Drop repeated names (case and whitespace insensitive), keeping the first spelling
+    unique = {}
+    for company in companies:
+        unique.setdefault(normalize_company(company), company.strip())
+    companies = list(unique.values())
+    if not companies or len(companies) > MAX_BATCH_COMPANIES:
+        return jsonify({"error": f"Between 1 and {MAX_BATCH_COMPANIES} companies are accepted"}), 400
+
+    options, error = _news_options()
+    if error:
+        return error
+    coverage, error = _coverage_options()
+    if error:
+        return error
+
+    if request.args.get("stream", "0") in ("1", "true"):
+        lines = (dumps(item) + b"\n" for item in _iter_batch_analysis(companies, options, coverage))
+        return Response(lines, mimetype="application/x-ndjson", headers={"Cache-Control": "no-cache"})
+
+    response = {"results": {}, "errors": {}}
+    for item in _iter_batch_analysis(companies, options, coverage):
+        if "comparison" in item:
+            response["comparison"] = item["comparison"]
+        elif "error" in item:
+            response["errors"][item["company"]] = item["error"]
+        else:
+            response["results"][item["company"]] = item["result"]
+    return json_response(response)
+
+
+@app.route("/trends", methods=["GET"])
+def sentiment_history():
+    """
+    Endpoint returning a company's daily sentiment counts over the stored article history.
+    """
+    company = request.args.get("company")
+    if not company:
+        return jsonify({"error": "Company name is required"}), 400
+    try:
+        days = min(int(request.args.get("days", 30)), MAX_TREND_DAYS)
+    except ValueError:
+        return jsonify({"error": "days must be an integer"}), 400
+    if days < 1:
+        return jsonify({"error": "days must be at least 1"}), 400
+
+    since = (datetime.now(timezone.utc) - timedelta(days=days)).strftime("%Y-%m-%dT%H:%M:%SZ")
+    return json_response({"company": company, "since": since, "sentiment_trends": get_article_store().sentiment_trends(company, since=since)})
+
+
+@app.route("/summarize", methods=["POST"])
+def summarize():
+    """
+    Endpoint to produce extractive summaries for a text, a list of texts or a list of article URLs.
+
+    Up to `MAX_SYNC_SUMMARY_URLS` URLs are fetched within the request; longer lists are queued
+    as a background job (202, poll /jobs/<id>).
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        num_sentences = int(data.get("num_sentences", 3))
+    except (TypeError, ValueError):
+        return jsonify({"error": "num_sentences must be an integer"}), 400
+    if not 1 <= num_sentences <= MAX_SUMMARY_SENTENCES:
+        return jsonify({"error": f"num_sentences must be between 1 and {MAX_SUMMARY_SENTENCES}"}), 400
+
+    for field in ("urls", "texts"):
+        if field in data:
+            items = data[field]
+            if not isinstance(items, list) or not all(isinstance(item, str) for item in items):
+                return jsonify({"error": f"{field} must be a list of strings"}), 400
+            if len(items) > MAX_ARTICLES:
+                return jsonify({"error": f"At most {MAX_ARTICLES} {field} are accepted"}), 400
+            if field == "urls":
+                if len(items) > MAX_SYNC_SUMMARY_URLS:
+                    return _submit_job("summarize", _run_summary_job, items, num_sentences)
+                return json_response({"results": summarize_urls(items, num_sentences)})
+            return json_response({"summaries": summarize_cached(items, num_sentences=num_sentences)})
+    if data.get("text"):
+        if not isinstance(data["text"], str):
+            return jsonify({"error": "text must be a string"}), 400
+        return json_response({"summary": summarize_cached([data["text"]], num_sentences=num_sentences)[0]})
+    return jsonify({"error": "Text, texts or urls is required"}), 400
 
 
 @app.route("/convert_text_to_speech", methods=["POST"])
@@ -80,12 +555,246 @@ def convert_tts():
     data = request.get_json()
     if not data or "text" not in data:
         return jsonify({"error": "Text is required"}), 400
+    if not isinstance(data["text"], str):
+        return jsonify({"error": "text must be a string"}), 400
 
     audio_file = text_to_speech_hindi(data["text"])
     return jsonify({"audio_file": audio_file})
 
 
+@app.route("/convert_text_to_speech/stream", methods=["POST"])
+def convert_tts_stream():
+    """
+    Endpoint to convert text to speech (Hindi), streaming MP3 data as each sentence chunk is ready.
+    """
+    data = request.get_json()
+    if not data or "text" not in data:
+        return jsonify({"error": "Text is required"}), 400
+    if not isinstance(data["text"], str):
+        return jsonify({"error": "text must be a string"}), 400
+
+    # The first sentence is synthesized up front, so upstream failures still get an error status
+    try:
+        audio = iter_speech_hindi(data["text"])
+    except UpstreamError as e:
+        return _upstream_unavailable(e)
+    except Exception as e:
+        print(f"❌ Error in TTS conversion: {e}")
+        return jsonify({"error": "Text-to-speech conversion failed"}), 502
+
+    return Response(audio, mimetype="audio/mpeg", headers={"Cache-Control": "no-cache"})
+
+
+def _texts_error(texts: list):
+    """Error response for a TTS text list that is not all strings or exceeds `MAX_ARTICLES`, else None."""
+    if not all(isinstance(text, str) for text in texts):
+        return jsonify({"error": "texts must be a list of strings"}), 400
+    if len(texts) > MAX_ARTICLES:
+        return jsonify({"error": f"At most {MAX_ARTICLES} texts are accepted"}), 400
+    return None
+
+
+@app.route("/convert_text_to_speech_batch", methods=["POST"])
+def convert_tts_batch():
+    """
+    Endpoint to convert a list of texts to speech (Hindi) concurrently.
+    """
+    data = request.get_json()
+    if not data or not isinstance(data.get("texts"), list):
+        return jsonify({"error": "A list of texts is required"}), 400
+    error = _texts_error(data["texts"])
+    if error:
+        return error
+
+    audio_files = text_to_speech_hindi_batch(data["texts"])
+    return jsonify({"audio_files": audio_files})
+
+
+# ----------------------------- Background Jobs ----------------------------- #
+
+
+def _run_analysis_job(job, company: str, options: dict, coverage: dict):
+    """Fetch news (emitting each article as it is parsed), then analyze it."""
+    streamed = []
+
+    def fetch():
+        for article in iter_news(company, store=get_article_store(), **options):
+            streamed.append(article)
+            job.emit("article", article)
+        return streamed
+
+    news_list = RESPONSE_CACHE.get_or_compute(_news_cache_key(company, options), fetch)
+    if not streamed:
+        for article in news_list:  # Served from cache (or a coalesced fetch): replay articles
+            job.emit("article", article)
+    if not news_list:
+        raise LookupError("No news found for this company")
+    return _analyze_news(news_list, coverage, company)
+
+
+def _run_tts_job(job, texts: list):
+    """Convert texts to speech with bounded per-job concurrency, emitting each audio file as it is ready."""
+    return {"audio_files": job.map(text_to_speech_hindi, texts, event="audio")}
+
+
+def _run_summary_job(job, urls: list, num_sentences: int):
+    """Fetch and summarize article URLs, emitting each summary as it is ready."""
+    results = job.map(lambda url: summarize_urls([url], num_sentences)[0], urls, event="summary")
+    return {"results": results}
+
+
+def _submit_job(kind: str, fn, *args):
+    """Queue a job, answering 202 with its URLs, or 429 when the queue is full."""
+    try:
+        job = JOB_MANAGER.submit(kind, fn, *args)
+    except JobQueueFull as e:
+        response = jsonify({"error": str(e)})
+        response.headers["Retry-After"] = "5"
+        return response, 429
+    return jsonify(
+        {
+            "job_id": job.id,
+            "status": job.status,
+            "status_url": f"/jobs/{job.id}",
+            "events_url": f"/jobs/{job.id}/events",
+        }
+    ), 202
+
+
+@app.route("/jobs/analyze", methods=["POST"])
+def submit_analysis_job():
+    """
+    Endpoint to queue a news analysis job (same query parameters as /analyze).
+    """
+    company = request.args.get("company") or (request.get_json(silent=True) or {}).get("company")
+    if not company:
+        return jsonify({"error": "Company name is required"}), 400
+
+    options, error = _news_options()
+    if error:
+        return error
+    coverage, error = _coverage_options()
+    if error:
+        return error
+
+    return _submit_job("analyze", _run_analysis_job, company, options, coverage)
+
+
+@app.route("/jobs/convert_text_to_speech", methods=["POST"])
+def submit_tts_job():
+    """
+    Endpoint to queue a text-to-speech (Hindi) job for one text or a list of texts.
+    """
+    data = request.get_json(silent=True) or {}
+    texts = data.get("texts") or ([data["text"]] if data.get("text") else None)
+    if not isinstance(texts, list) or not texts:
+        return jsonify({"error": "Text is required"}), 400
+    error = _texts_error(texts)
+    if error:
+        return error
+
+    return _submit_job("convert_text_to_speech", _run_tts_job, texts)
+
+
+@app.route("/jobs/<job_id>", methods=["GET"])
+def job_status(job_id: str):
+    """
+    Endpoint to poll a job's status, per-item results so far and final result.
+    """
+    job = JOB_MANAGER.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job.to_dict())
+
+
+@app.route("/jobs/<job_id>/events", methods=["GET"])
+def job_events(job_id: str):
+    """
+    Endpoint streaming a job's events as server-sent events until it finishes.
+    """
+    job = JOB_MANAGER.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+
+    def stream():
+        for event in job.iter_events():
+            if event is None:
+                yield ": keepalive\n\n"
+                continue
+            name, data = event
+            yield f"event: {name}\ndata: {json.dumps(data)}\n\n"
+
+    return Response(stream(), mimetype="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+# -------------------------------- Watchlist -------------------------------- #
+
+
+@app.route("/watchlist", methods=["GET"])
+def get_watchlist():
+    """
+    Endpoint listing watched companies with their schedule and rolling sentiment.
+    """
+    return json_response({"companies": WATCHLIST.companies(), "stats": WATCHLIST.stats()})
+
+
+@app.route("/watchlist", methods=["POST"])
+def update_watchlist():
+    """
+    Endpoint to add companies to the watchlist (or change their priority) and start monitoring.
+    """
+    entries = (request.get_json(silent=True) or {}).get("companies")
+    if not isinstance(entries, list) or not entries:
+        return jsonify({"error": "companies must be a non-empty list"}), 400
+
+    # Validate every entry before changing the watchlist
+    try:
+        parsed = [parse_entry(entry) for entry in entries]
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    watched = [WATCHLIST.watch(company, priority, sources) for company, priority, sources in parsed]
+    WATCHLIST.start()
+    return jsonify({"companies": [item.to_dict() for item in watched]})
+
+
+@app.route("/watchlist/<company>", methods=["DELETE"])
+def remove_from_watchlist(company: str):
+    """
+    Endpoint to stop watching a company.
+    """
+    if not WATCHLIST.unwatch(company):
+        return jsonify({"error": "Company is not on the watchlist"}), 404
+    return jsonify({"company": company, "removed": True})
+
+
+@app.route("/watchlist/alerts", methods=["GET"])
+def watchlist_alerts():
+    """
+    Endpoint returning the latest sentiment-shift alerts, newest first.
+    """
+    return json_response({"alerts": list(reversed(WATCHLIST.recent_alerts))})
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    """
+    Prometheus scrape endpoint: per-stage latency histograms, cache hit/miss counters,
+    request latency and component gauges.
+    """
+    return Response(REGISTRY.render(), mimetype="text/plain; version=0.0.4")
+
+
 if __name__ == "__main__":
+    warm_up()  # Load models before serving so the first request doesn't pay for them
+    if WATCHLIST_FILE:
+        try:
+            watched = load_watchlist(WATCHLIST_FILE)
+        except (OSError, ValueError) as e:
+            sys.exit(f"Invalid watchlist file: {e}")
+        for company, priority, sources in watched:
+            WATCHLIST.watch(company, priority, sources)
+        WATCHLIST.start()
     app.run(debug=True, port=5000)
 
 
@@ -1,10 +1,19 @@
+import io
+import os
 import streamlit as st
 import matplotlib.pyplot as plt
 import numpy as np
+from article_batch import ArticleBatch
+from article_store import get_article_store
 from news_extraction import fetch_news
-from comparative_analysis import comparative_sentiment_analysis
-from tts_converter import text_to_speech_hindi
+from deduplication import collapse_duplicates, fan_out
+from comparative_analysis import ArticleAggregator, annotate_topics, comparative_sentiment_analysis
+from response_cache import normalize_company
+from tts_converter import text_to_speech_hindi_as_completed
 import seaborn as sns
+
+# How long analyses and chart images are reused across reruns (seconds); audio reuses the TTS disk cache
+APP_CACHE_TTL = int(os.environ.get("APP_CACHE_TTL", 600))
 # ----------------------------- Page Configuration ----------------------------- #
 st.set_page_config(page_title="The News Summarization and Text-to-Speech (TTS) application ", layout="wide")
 
@@ -62,87 +71,140 @@ with st.sidebar:
     st.markdown("## 🔍 SEARCH NEWS HERE")
     company = st.text_input("Enter a Company Name", placeholder="E.g., Tesla, Google, Amazon")
 
+# ----------------------------- Cached Pipeline Stages ----------------------------- #
+# Streamlit reruns this script on every interaction; these keep results between reruns.
+
+
+@st.cache_resource
+def get_store():
+    """The article store, opened once per server process."""
+    return get_article_store()
+
+
+@st.cache_data(ttl=APP_CACHE_TTL, show_spinner="Fetching and analysing news...")
+def load_analysis(company_key: str):
+    """
+    Fetch and analyse a company's news (cached per normalized company name).
+
+    Returns:
+        dict | None: The final_data layout used for rendering, or None when no news was found.
+    """
+    store = get_store()
+    all_articles = fetch_news(company_key, store=store)  # Only articles not seen before are processed
+    if not all_articles:
+        return None
+
+    # One entry per story: syndicated copies are analyzed and voiced once
+    news_list, labels = collapse_duplicates(all_articles)
+    untagged = [article for article in all_articles if article.get("topics") is None]
+    annotate_topics(news_list)
+    fan_out(all_articles, labels, fields=("topics",))
+    store.update_articles(company_key, untagged, fields=("topics",))
+    aggregator = ArticleAggregator().extend(ArticleBatch.from_articles(all_articles))
+    stories = ArticleBatch.from_articles(news_list)
+    sentiment_analysis = comparative_sentiment_analysis(
+        stories, coverage_mode="similar", top_k=10, aggregator=aggregator
+    )
+
+    return {
+        "Company": company_key,
+        "Articles": stories,  # Columnar; iterating yields row views (article.title, article.sentiment, ...)
+        "Comparative Sentiment Score": {
+            "Sentiment Distribution": sentiment_analysis["Sentiment Distribution"],
+            "Coverage Differences": sentiment_analysis["Coverage Differences"],
+            "Topic Overlap": {
+                "Common Topics": list(set.intersection(*[set(article.get("topics", [])) for article in news_list])) if len(news_list) > 1 else [],
+                "Unique Topics in Article 1": list(set(news_list[0].get("topics", [])) - set(news_list[1].get("topics", []))) if len(news_list) > 1 else [],
+                "Unique Topics in Article 2": list(set(news_list[1].get("topics", [])) - set(news_list[0].get("topics", []))) if len(news_list) > 1 else []
+            }
+        },
+        "Majority Sentiment": sentiment_analysis["Majority Sentiment"],
+    }
+
+
+def render_audio(company_key: str, summaries: list, urls: list, slots: list) -> None:
+    """
+    Generate (or reuse cached) Hindi audio for all summaries concurrently, filling each
+    card's placeholder as soon as its own conversion finishes.
+    """
+    audio_paths = [None] * len(summaries)
+    for i, path in text_to_speech_hindi_as_completed(summaries):
+        audio_paths[i] = path
+        if path:
+            with open(path, "rb") as f:
+                slots[i].audio(f.read(), format="audio/mp3")
+        else:
+            slots[i].empty()
+    get_store().update_articles(
+        company_key,
+        [{"url": url, "audio_path": path} for url, path in zip(urls, audio_paths)],
+        fields=("audio_path",),
+    )
+
+
+@st.cache_data(ttl=APP_CACHE_TTL, show_spinner=False)
+def render_sentiment_pie(distribution: tuple) -> bytes:
+    """Draw the sentiment distribution pie chart once per distribution and return it as PNG bytes."""
+    sentiment_labels = [label for label, _ in distribution]
+    sentiment_values = [value for _, value in distribution]
+
+    fig, ax = plt.subplots(figsize=(6, 6))
+    explode = [0.1]*len(sentiment_values)  # Add 3D effect
+    ax.pie(
+        sentiment_values, labels=sentiment_labels, autopct="%1.1f%%",
+        colors=["#1abc9c", "#e74c3c", "#f39c12"], startangle=140,
+        shadow=True, explode=explode, wedgeprops={'edgecolor': 'black'}
+    )
+    ax.set_title("Sentiment Breakdown (3D)")
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", bbox_inches="tight")
+    plt.close(fig)
+    return buffer.getvalue()
+
+
 # ----------------------------- Fetch & Display News ----------------------------- #
 if company:
     try:
-        news_list = fetch_news(company)
+        final_data = load_analysis(normalize_company(company))
 
-        if not news_list:
+        if not final_data:
             st.warning(f"No news found for '{company}'. Try another keyword.")
         else:
-            sentiment_analysis = comparative_sentiment_analysis(news_list)
-
-            # -------------------- JSON Structure Layout -------------------- #
-            final_data = {
-                "Company": company,
-                "Articles": [
-                    {
-                        "Title": article["title"],
-                        "Summary": article["summary"],
-                        "Sentiment": article["sentiment"],
-                        "Topics": article.get("topics", []),
-                        "URL": article["url"],
-                        "AudioFile": f"speech_{i}.mp3"
-                    }
-                    for i, article in enumerate(news_list, 1)
-                ],
-                "Comparative Sentiment Score": {
-                    "Sentiment Distribution": sentiment_analysis["Sentiment Distribution"],
-                    "Coverage Differences": sentiment_analysis["Coverage Differences"],
-                    "Topic Overlap": {
-                        "Common Topics": list(set.intersection(*[set(article.get("topics", [])) for article in news_list])) if len(news_list) > 1 else [],
-                        "Unique Topics in Article 1": list(set(news_list[0].get("topics", [])) - set(news_list[1].get("topics", []))) if len(news_list) > 1 else [],
-                        "Unique Topics in Article 2": list(set(news_list[1].get("topics", [])) - set(news_list[0].get("topics", []))) if len(news_list) > 1 else []
-                    }
-                },
-                "Final Sentiment Analysis": f"{company}'s latest news coverage is mostly {sentiment_analysis['Majority Sentiment'].lower()}."
-            }
+            final_data = dict(final_data, Company=company)
+            final_data["Final Sentiment Analysis"] = f"{company}'s latest news coverage is mostly {final_data['Majority Sentiment'].lower()}."
 
             # -------------------- UI Rendering -------------------- #
             st.markdown(f"<h1 class='main-title'>{final_data['Company']} News Analysis</h1>", unsafe_allow_html=True)
             
-            # Display Articles in Two-Column Layout
+            # Display Articles in Two-Column Layout; cards render first, audio fills in when ready
             cols = st.columns(2)
-            for i, article in enumerate(final_data["Articles"]):
-                # Generate the TTS file
-                audio_path = f"speech_{i}.mp3"
-                text_to_speech_hindi(article["Summary"], audio_path)  # Generate Hindi audio
+            audio_slots = []
 
+            for i, article in enumerate(final_data["Articles"]):
                 with cols[i % 2]:  # Alternate between two columns
-                    sentiment_color = "sentiment-positive" if article["Sentiment"] == "Positive" else "sentiment-negative" if article["Sentiment"] == "Negative" else "sentiment-neutral"
+                    sentiment_color = "sentiment-positive" if article.sentiment == "Positive" else "sentiment-negative" if article.sentiment == "Negative" else "sentiment-neutral"
                     
                     st.markdown(
                         f"""
                         <div class="news-card">
-                            <h3>📰 <a href="{article['URL']}" target="_blank">{article['Title']}</a></h3>
-                            <p><b>Summary:</b> {article['Summary']}</p>
-                            <p><b>Sentiment:</b> <span class="{sentiment_color}">{article['Sentiment']}</span></p>
-                            <p><b>Topics:</b> {', '.join(article['Topics']) if article['Topics'] else 'No topics identified'}</p>
+                            <h3>📰 <a href="{article.url}" target="_blank">{article.title}</a></h3>
+                            <p><b>Summary:</b> {article.summary}</p>
+                            <p><b>Sentiment:</b> <span class="{sentiment_color}">{article.sentiment}</span></p>
+                            <p><b>Topics:</b> {', '.join(article.topics) if article.topics else 'No topics identified'}</p>
+                            {f"<p><b>Also reported by:</b> {article.cluster_size - 1} other outlet(s)</p>" if article.cluster_size > 1 else ""}
                         </div>
                         """,
                         unsafe_allow_html=True
                     )
                     
 
-                    # ✅ Inline Play Button for Audio
-                    st.audio(audio_path, format="audio/mp3")
+                    # ✅ Inline Play Button for Audio (placeholder until the audio is ready)
+                    audio_slots.append(st.empty())
+                    audio_slots[-1].caption("🔊 Preparing Hindi audio...")
 
             # -------------------- Sentiment Distribution Pie Chart (3D Effect) -------------------- #
             st.markdown("<h2 style='color:#1a1a2e;'>📊 Sentiment Distribution</h2>", unsafe_allow_html=True)
-            sentiment_labels = list(final_data["Comparative Sentiment Score"]["Sentiment Distribution"].keys())
-            sentiment_values = list(final_data["Comparative Sentiment Score"]["Sentiment Distribution"].values())
-
-            fig, ax = plt.subplots(figsize=(6, 6))
-            values=list(sentiment_analysis['Sentiment Distribution'].keys())
-            labels=list(sentiment_analysis["Sentiment Distribution"].values())
-            explode = [0.1]*len(values)  # Add 3D effect
-            ax.pie(
-                sentiment_values, labels=sentiment_labels, autopct="%1.1f%%",
-                colors=["#1abc9c", "#e74c3c", "#f39c12"], startangle=140,
-                shadow=True, explode=explode, wedgeprops={'edgecolor': 'black'}
-            )
-            ax.set_title("Sentiment Breakdown (3D)")
-            st.pyplot(fig)
+            st.image(render_sentiment_pie(tuple(final_data["Comparative Sentiment Score"]["Sentiment Distribution"].items())))
 
             # -------------------- Coverage Differences -------------------- #
             st.markdown("<h2 style='color:#1a1a2e;'>⚖ Coverage Differences</h2>", unsafe_allow_html=True)
@@ -160,6 +222,14 @@ if company:
             st.markdown(f"<h2 style='color:#28a745;'>📌 Final Sentiment Analysis</h2>", unsafe_allow_html=True)
             st.success(final_data["Final Sentiment Analysis"])
 
+            # -------------------- Audio (slowest stage, each card filled in as it finishes) -------------------- #
+            render_audio(
+                normalize_company(company),
+                list(final_data["Articles"].summary),
+                list(final_data["Articles"].url),
+                audio_slots,
+            )
+
     except Exception as e:
         st.error(f"An error occurred: {e}")
 
@@ -0,0 +1,276 @@
+import sys
+
+import numpy as np
+
+from sentiment_analysis import SENTIMENT_LABELS, analyze_sentiment_batch
+
+# Categorical sentiment codes index into this tuple (the order used by `label_sentiments`)
+SENTIMENT_CATEGORIES = tuple(SENTIMENT_LABELS.tolist())
+_SENTIMENT_CODES = {label: code for code, label in enumerate(SENTIMENT_CATEGORIES)}
+
+# Row fields backed by a column of the same name
+_PLAIN_FIELDS = ("title", "summary", "url", "timestamp", "published_at", "source", "topics")
+
+
+def _intern(value):
+    """Intern repeated short strings (sources, dates) so rows share one object."""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class ArticleRow:
+    """
+    Read-only view of one article in an `ArticleBatch`.
+
+    Supports both attribute access (`row.title`) and the dict-style access (`row["title"]`,
+    `row.get("topics")`) that code written for article dictionaries expects.
+    """
+
+    __slots__ = ("_batch", "_index")
+
+    def __init__(self, batch: "ArticleBatch", index: int):
+        self._batch = batch
+        self._index = index
+
+    def __getitem__(self, key: str):
+        return self._batch.value(key, self._index)
+
+    def __getattr__(self, key: str):
+        try:
+            return self._batch.value(key, self._index)
+        except KeyError:
+            raise AttributeError(key) from None
+
+    def __contains__(self, key: str) -> bool:
+        return key in ArticleBatch.FIELDS
+
+    def get(self, key: str, default=None):
+        """Field value, or `default` for unknown or missing fields."""
+        try:
+            value = self._batch.value(key, self._index)
+        except KeyError:
+            return default
+        return default if value is None else value
+
+    def keys(self) -> tuple:
+        return ArticleBatch.FIELDS
+
+    def to_dict(self) -> dict:
+        """Materialize the row as an article dictionary."""
+        return {key: self._batch.value(key, self._index) for key in ArticleBatch.FIELDS}
+
+    def __repr__(self) -> str:
+        return f"ArticleRow({self._index}, {self.title!r})"
+
+
+class ArticleBatch:
+    """
+    Columnar batch of scored articles.
+
+    Scores and cluster sizes are numpy arrays, sentiment labels are int8 codes into
+    `SENTIMENT_CATEGORIES`, and source and date strings are interned. Aggregations run on the
+    columns, and `to_pandas`/`to_arrow` reuse the arrays instead of copying per-row dicts.
+    Iterating or indexing yields `ArticleRow` views.
+    """
+
+    FIELDS = _PLAIN_FIELDS + ("sentiment", "sentiment_score", "cluster_size")
+
+    __slots__ = (
+        "title", "summary", "url", "timestamp", "published_at", "source", "topics",
+        "sentiment_code", "sentiment_score", "cluster_size",
+    )
+
+    def __init__(
+        self,
+        title: list,
+        summary: list,
+        url: list,
+        timestamp: list,
+        published_at: list,
+        source: list,
+        topics: list,
+        sentiment_code: np.ndarray,
+        sentiment_score: np.ndarray,
+        cluster_size: np.ndarray,
+    ):
+        self.title = title
+        self.summary = summary
+        self.url = url
+        self.timestamp = timestamp
+        self.published_at = published_at
+        self.source = source
+        self.topics = topics
+        self.sentiment_code = sentiment_code
+        self.sentiment_score = sentiment_score
+        self.cluster_size = cluster_size
+
+    @classmethod
+    def from_articles(cls, articles: list) -> "ArticleBatch":
+        """
+        Build a batch from article dictionaries (as produced by `fetch_news`).
+
+        Articles without a sentiment are scored from their summary (or title) in one batch.
+
+        Args:
+            articles (list): Article dictionaries.
+
+        Returns:
+            ArticleBatch: The columnar batch.
+        """
+        n = len(articles)
+        codes = np.fromiter((_SENTIMENT_CODES.get(a.get("sentiment"), -1) for a in articles), dtype=np.int8, count=n)
+        scores = np.fromiter(
+            (np.nan if a.get("sentiment_score") is None else a["sentiment_score"] for a in articles),
+            dtype=np.float32,
+            count=n,
+        )
+
+        missing = np.flatnonzero((codes < 0) | np.isnan(scores))
+        if missing.size:
+            sentiments = analyze_sentiment_batch([articles[i].get("summary") or articles[i].get("title", "") for i in missing])
+            scores[missing] = sentiments.compound
+            codes[missing] = [_SENTIMENT_CODES[label] for label in sentiments.labels]
+
+        return cls(
+            title=[a.get("title", "") for a in articles],
+            summary=[a.get("summary", "") for a in articles],
+            url=[a.get("url", "") for a in articles],
+            timestamp=[a.get("timestamp") for a in articles],
+            published_at=[_intern(a.get("published_at")) for a in articles],
+            source=[_intern(a.get("source")) for a in articles],
+            topics=[a.get("topics") for a in articles],
+            sentiment_code=codes,
+            sentiment_score=scores,
+            cluster_size=np.fromiter((a.get("cluster_size", 1) for a in articles), dtype=np.int32, count=n),
+        )
+
+    @classmethod
+    def concat(cls, batches: list) -> "ArticleBatch":
+        """Join several batches into one, in order."""
+        batches = list(batches)
+        if not batches:
+            return cls.from_articles([])
+        columns = {}
+        for name in cls.__slots__:
+            parts = [getattr(batch, name) for batch in batches]
+            columns[name] = np.concatenate(parts) if isinstance(parts[0], np.ndarray) else [v for part in parts for v in part]
+        return cls(**columns)
+
+    def take(self, indices) -> "ArticleBatch":
+        """New batch holding the rows at `indices` (any numpy index: array, mask or slice)."""
+        positions = np.arange(len(self))[indices]
+        columns = {}
+        for name in self.__slots__:
+            column = getattr(self, name)
+            columns[name] = column[positions] if isinstance(column, np.ndarray) else [column[i] for i in positions]
+        return ArticleBatch(**columns)
+
+    def __len__(self) -> int:
+        return len(self.sentiment_code)
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            if index < 0:
+                index += len(self)
+            if not 0 <= index < len(self):
+                raise IndexError(index)
+            return ArticleRow(self, int(index))
+        return self.take(index)
+
+    def __iter__(self):
+        return (ArticleRow(self, i) for i in range(len(self)))
+
+    def value(self, key: str, index: int):
+        """Value of field `key` for row `index`."""
+        if key in _PLAIN_FIELDS:
+            return getattr(self, key)[index]
+        if key == "sentiment":
+            return SENTIMENT_CATEGORIES[self.sentiment_code[index]]
+        if key == "sentiment_score":
+            return float(self.sentiment_score[index])
+        if key == "cluster_size":
+            return int(self.cluster_size[index])
+        raise KeyError(key)
+
+    @property
+    def sentiments(self) -> np.ndarray:
+        """Sentiment label of every article."""
+        return SENTIMENT_LABELS[self.sentiment_code]
+
+    @property
+    def dates(self) -> list:
+        """Publication date (YYYY-MM-DD) of every article, falling back to the raw timestamp text."""
+        return [_intern((published or raw or "")[:10]) for published, raw in zip(self.published_at, self.timestamp)]
+
+    def distribution(self) -> dict:
+        """Sentiment counts per label."""
+        counts = np.bincount(self.sentiment_code, minlength=len(SENTIMENT_CATEGORIES))
+        return {label: int(count) for label, count in zip(SENTIMENT_CATEGORIES, counts)}
+
+    def trends(self) -> dict:
+        """Sentiment counts per publication date, in first-seen date order."""
+        index = {}
+        date_codes = np.fromiter((index.setdefault(date, len(index)) for date in self.dates), dtype=np.int64, count=len(self))
+        counts = np.zeros((len(index), len(SENTIMENT_CATEGORIES)), dtype=np.int64)
+        np.add.at(counts, (date_codes, self.sentiment_code), 1)
+        return {
+            date: {label: int(n) for label, n in zip(SENTIMENT_CATEGORIES, row)} for date, row in zip(index, counts.tolist())
+        }
+
+    def shift_positions(self) -> np.ndarray:
+        """Indices `i` where article `i` has a different sentiment than article `i - 1`."""
+        return np.flatnonzero(self.sentiment_code[1:] != self.sentiment_code[:-1]) + 1
+
+    def to_articles(self) -> list:
+        """Materialize every row as an article dictionary (e.g. for JSON responses)."""
+        return [row.to_dict() for row in self]
+
+    def to_pandas(self):
+        """
+        Convert to a pandas DataFrame.
+
+        Numeric columns wrap the existing arrays and sentiment/source become categoricals built
+        from codes, so no per-row objects are created for them.
+
+        Returns:
+            pd.DataFrame: One row per article.
+        """
+        import pandas as pd
+
+        sources = pd.Categorical(self.source)
+        return pd.DataFrame(
+            {
+                "title": self.title,
+                "summary": self.summary,
+                "url": self.url,
+                "published_at": pd.to_datetime(pd.Series(self.published_at, dtype=object), utc=True, errors="coerce"),
+                "source": sources,
+                "sentiment": pd.Categorical.from_codes(self.sentiment_code, categories=SENTIMENT_CATEGORIES),
+                "sentiment_score": self.sentiment_score,
+                "cluster_size": self.cluster_size,
+            },
+            copy=False,
+        )
+
+    def to_arrow(self):
+        """
+        Convert to a pyarrow Table, with sentiment as a dictionary-encoded column over its codes.
+
+        Returns:
+            pyarrow.Table: One row per article.
+        """
+        import pyarrow as pa
+
+        return pa.table(
+            {
+                "title": pa.array(self.title, type=pa.string()),
+                "summary": pa.array(self.summary, type=pa.string()),
+                "url": pa.array(self.url, type=pa.string()),
+                "published_at": pa.array(self.published_at, type=pa.string()),
+                "source": pa.array(self.source, type=pa.string()).dictionary_encode(),
+                "sentiment": pa.DictionaryArray.from_arrays(
+                    pa.array(self.sentiment_code), pa.array(SENTIMENT_CATEGORIES, type=pa.string())
+                ),
+                "sentiment_score": pa.array(self.sentiment_score),
+                "cluster_size": pa.array(self.cluster_size),
+            }
+        )
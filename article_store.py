@@ -0,0 +1,287 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from response_cache import normalize_company
+
+# SQLite database holding every article seen so far (":memory:" keeps it in-process only)
+ARTICLE_STORE_PATH = os.environ.get("ARTICLE_STORE_PATH", "articles.db")
+
+# Known click-tracking parameters (besides utm_*) that never change the article; ocid/cvid are
+# added by MSN to links from Bing News. Anything else may identify the article and is kept.
+_TRACKING_PARAMS = {"fbclid", "gclid", "dclid", "gbraid", "wbraid", "msclkid", "mc_cid", "mc_eid", "igshid", "yclid", "_ga", "_gl", "ocid", "cvid"}
+
+# Upper bound for open-ended ranges; ISO timestamps always sort below it
+_END_OF_TIME = "9999"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    company TEXT NOT NULL,
+    url TEXT NOT NULL,
+    title TEXT NOT NULL,
+    summary TEXT,
+    source TEXT,
+    timestamp TEXT,
+    published_at TEXT,
+    fetched_at REAL NOT NULL,
+    sentiment TEXT,
+    sentiment_score REAL,
+    topics TEXT,
+    audio_path TEXT,
+    UNIQUE (company, url)
+);
+CREATE INDEX IF NOT EXISTS idx_articles_company_published ON articles (company, published_at);
+CREATE INDEX IF NOT EXISTS idx_articles_company_id ON articles (company, id);
+"""
+
+_COLUMNS = (
+    "url", "title", "summary", "source", "timestamp", "published_at",
+    "fetched_at", "sentiment", "sentiment_score", "topics", "audio_path",
+)
+
+
+def canonical_url(url: str) -> str:
+    """
+    Normalize an article URL so the same story is stored once.
+
+    Lowercases the scheme and host, drops the fragment, tracking parameters (utm_*, fbclid, ...)
+    and any trailing slash, and sorts the remaining query parameters.
+
+    Args:
+        url (str): Article URL as found in the listing.
+
+    Returns:
+        str: The canonical URL.
+    """
+    parts = urlsplit(url.strip())
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in _TRACKING_PARAMS
+    )
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(query), ""))
+
+
+class ArticleStore:
+    """
+    SQLite store of scraped articles keyed by (company, canonical URL).
+
+    Holds parsed publication times, sentiment, topics and audio paths so repeated fetches only
+    process new articles, and serves history queries through the (company, published_at) index.
+    """
+
+    def __init__(self, path: str = ARTICLE_STORE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            if path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+
+    @staticmethod
+    def _to_article(row: sqlite3.Row) -> dict:
+        """Convert a database row back into the article dictionary shape used by the pipeline."""
+        article = {key: row[key] for key in _COLUMNS if key not in ("topics", "fetched_at")}
+        if row["topics"] is not None:
+            article["topics"] = json.loads(row["topics"])
+        if article["audio_path"] is None:
+            del article["audio_path"]
+        return article
+
+    def get_many(self, company: str, urls: list) -> dict:
+        """
+        Look up stored articles by URL.
+
+        Args:
+            company (str): Company name.
+            urls (list): Article URLs (canonicalized before lookup).
+
+        Returns:
+            dict: Canonical URL -> stored article, for the URLs already in the store.
+        """
+        keys = list({canonical_url(url) for url in urls})
+        found = {}
+        with self._lock:
+            # Stay below SQLite's bound-parameter limit
+            for i in range(0, len(keys), 500):
+                chunk = keys[i : i + 500]
+                rows = self._conn.execute(
+                    f"SELECT * FROM articles WHERE company = ? AND url IN ({','.join('?' * len(chunk))})",
+                    [normalize_company(company), *chunk],
+                ).fetchall()
+                found.update((row["url"], self._to_article(row)) for row in rows)
+        return found
+
+    def add_articles(self, company: str, articles: list) -> int:
+        """
+        Insert newly processed articles; URLs already stored are left untouched.
+
+        Args:
+            company (str): Company name.
+            articles (list): Articles with title, summary, url, timestamp and, optionally,
+                published_at, sentiment, sentiment_score, source, topics and audio_path.
+
+        Returns:
+            int: Number of articles inserted.
+        """
+        now = time.time()
+        rows = [
+            (
+                normalize_company(company),
+                canonical_url(article["url"]),
+                article["title"],
+                article.get("summary"),
+                article.get("source"),
+                article.get("timestamp"),
+                article.get("published_at"),
+                now,
+                article.get("sentiment"),
+                article.get("sentiment_score"),
+                json.dumps(article["topics"]) if article.get("topics") is not None else None,
+                article.get("audio_path"),
+            )
+            for article in articles
+        ]
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO articles (company, " + ", ".join(_COLUMNS) + ") "
+                "VALUES (" + ", ".join("?" * (len(_COLUMNS) + 1)) + ")",
+                rows,
+            )
+            return self._conn.total_changes - before
+
+    def update_articles(self, company: str, articles: list, fields: tuple = ("topics", "audio_path")) -> None:
+        """
+        Save derived fields (topics, audio paths) computed after an article was stored.
+
+        Args:
+            company (str): Company name.
+            articles (list): Articles carrying "url" and the fields to save; missing fields are skipped.
+            fields (tuple): Names of the fields to update.
+        """
+        company = normalize_company(company)
+        with self._lock, self._conn:
+            for field in fields:
+                rows = [
+                    (
+                        json.dumps(article[field]) if field == "topics" else article[field],
+                        company,
+                        canonical_url(article["url"]),
+                    )
+                    for article in articles
+                    if article.get(field) is not None
+                ]
+                if rows:
+                    self._conn.executemany(f"UPDATE articles SET {field} = ? WHERE company = ? AND url = ?", rows)
+
+    def articles(self, company: str, since: str = None, until: str = None, limit: int = None) -> list:
+        """
+        Return stored articles for a company, newest first, as an indexed range scan.
+
+        Args:
+            company (str): Company name.
+            since (str): Earliest publication time (ISO-8601), inclusive.
+            until (str): Latest publication time (ISO-8601), exclusive.
+            limit (int): Maximum number of articles (None for all).
+
+        Returns:
+            list: Article dictionaries with a known publication time.
+        """
+        query = "SELECT * FROM articles WHERE company = ? AND published_at >= ? AND published_at < ? ORDER BY published_at DESC"
+        params = [normalize_company(company), since or "", until or _END_OF_TIME]
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            return [self._to_article(row) for row in self._conn.execute(query, params)]
+
+    def added_since(self, company: str, after: int = 0) -> tuple:
+        """
+        Return articles stored for a company after a given insertion mark, in insertion order.
+
+        Marks are article ids, which only grow (AUTOINCREMENT never reuses one, and VACUUM keeps
+        them), so a consumer that keeps the returned mark sees every article exactly once no
+        matter which caller stored it.
+
+        Args:
+            company (str): Company name.
+            after (int): Mark returned by the previous call (0 for everything).
+
+        Returns:
+            tuple: (article dictionaries, new mark).
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM articles WHERE company = ? AND id > ? ORDER BY id",
+                (normalize_company(company), after),
+            ).fetchall()
+        return [self._to_article(row) for row in rows], (rows[-1]["id"] if rows else after)
+
+    def last_mark(self, company: str) -> int:
+        """Insertion mark of the newest article stored for a company (0 when there is none)."""
+        with self._lock:
+            row = self._conn.execute("SELECT MAX(id) FROM articles WHERE company = ?", (normalize_company(company),)).fetchone()
+        return row[0] or 0
+
+    def sentiment_trends(self, company: str, since: str = None, until: str = None) -> dict:
+        """
+        Count articles per publication date and sentiment over a time range.
+
+        Args:
+            company (str): Company name.
+            since (str): Earliest publication time (ISO-8601), inclusive.
+            until (str): Latest publication time (ISO-8601), exclusive.
+
+        Returns:
+            dict: Date (YYYY-MM-DD) -> {"Positive": n, "Negative": n, "Neutral": n}, in date order.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT substr(published_at, 1, 10) AS day, sentiment, COUNT(*) AS n FROM articles "
+                "WHERE company = ? AND published_at >= ? AND published_at < ? GROUP BY day, sentiment ORDER BY day",
+                (normalize_company(company), since or "", until or _END_OF_TIME),
+            ).fetchall()
+
+        trends = {}
+        for row in rows:
+            counts = trends.setdefault(row["day"], {"Positive": 0, "Negative": 0, "Neutral": 0})
+            if row["sentiment"] in counts:
+                counts[row["sentiment"]] += row["n"]
+        return trends
+
+    def stats(self) -> dict:
+        """
+        Report store size.
+
+        Returns:
+            dict: Number of stored articles and companies.
+        """
+        with self._lock:
+            articles, companies = self._conn.execute("SELECT COUNT(*), COUNT(DISTINCT company) FROM articles").fetchone()
+        return {"articles": articles, "companies": companies}
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+_STORE = None
+_STORE_LOCK = threading.Lock()
+
+
+def get_article_store() -> ArticleStore:
+    """Return the process-wide article store, opening it on first use."""
+    global _STORE
+    with _STORE_LOCK:
+        if _STORE is None:
+            _STORE = ArticleStore()
+        return _STORE
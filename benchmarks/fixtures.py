@@ -0,0 +1,124 @@
+"""
+Offline inputs for the benchmarks: synthetic Bing News result pages, synthetic article corpora,
+and stand-in translation/TTS backends so no stage touches the network.
+
+The result pages in fixtures/ were written by hand to follow Bing News' result-card markup
+(news-card elements with data-author/data-url, title, snippet and source); they are not
+recordings of real Bing responses, and their article links point to example.com.
+"""
+import os
+import random
+import re
+from urllib.parse import parse_qs, urlparse
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+_COMPANIES = ["Tesla", "Google", "Amazon", "Apple", "Microsoft", "Nvidia", "Meta", "Netflix"]
+_PLACES = ["China", "India", "Germany", "Texas", "California", "Europe", "Japan"]
+_OUTLETS = ["Reuters", "Bloomberg", "CNBC", "Financial Times", "TechCrunch", "Associated Press"]
+_HEADLINES = [
+    "{c} shares jump after record quarterly deliveries",
+    "{c} faces new lawsuit over safety claims",
+    "Analysts cut {c} price target amid slowing demand",
+    "{c} unveils cheaper product to win back buyers",
+    "{c} expands factory in {p} as exports rise",
+    "Regulators in {p} open probe into {c}",
+    "{c} beats earnings estimates but warns on margins",
+    "Investors rally behind {c} AI strategy",
+    "{c} recalls thousands of units over defect",
+    "{c} names new chief financial officer",
+]
+_SENTENCES = [
+    "{c} reported stronger than expected results, sending its stock higher as investors cheered the outlook.",
+    "The company is facing mounting criticism after a string of incidents in {p}.",
+    "Analysts warned that competition could erode {c}'s market share over the coming year.",
+    "{c} said the move would help it reach new customers while keeping costs in check.",
+    "Officials in {p} said the investigation was at an early stage.",
+    "Shares fell sharply in early trading after the disappointing forecast.",
+    "The new plant is expected to create thousands of jobs and boost regional growth.",
+    "Critics called the decision reckless and harmful to consumers.",
+]
+
+
+def load_fixture_page(name: str = "synthetic_bing_tesla") -> str:
+    """Return the HTML of a synthetic Bing News results page."""
+    with open(os.path.join(FIXTURE_DIR, f"{name}.html"), encoding="utf-8") as f:
+        return f.read()
+
+
+def fixture_fetcher(name: str = "synthetic_bing_tesla"):
+    """
+    Build a `fetcher(url, timeout)` for `news_extraction.iter_news` that serves a fixture page.
+
+    Article URLs are rewritten per result page so every page contributes distinct articles.
+    """
+    page = load_fixture_page(name)
+
+    def fetch(url, timeout):
+        first = parse_qs(urlparse(url).query).get("first", ["1"])[0]
+        return re.sub(r'(https://news\.example\.com/[a-z]+/)', rf"\g<1>p{first}-", page)
+
+    return fetch
+
+
+def synthetic_articles(n: int, seed: int = 0, sentences_per_body: int = 8) -> list:
+    """
+    Generate a deterministic corpus of articles shaped like `fetch_news` output.
+
+    Args:
+        n (int): Number of articles.
+        seed (int): Random seed.
+        sentences_per_body (int): Sentences in each article's "body" field (used for summarization).
+
+    Returns:
+        list: Article dictionaries with title, summary, body, url and timestamp.
+    """
+    rnd = random.Random(seed)
+    articles = []
+    for i in range(n):
+        c, p = rnd.choice(_COMPANIES), rnd.choice(_PLACES)
+        body = " ".join(rnd.choice(_SENTENCES).format(c=c, p=p) for _ in range(sentences_per_body))
+        articles.append(
+            {
+                "title": rnd.choice(_HEADLINES).format(c=c, p=p),
+                "summary": " ".join(rnd.choice(_SENTENCES).format(c=c, p=p) for _ in range(2)),
+                "body": body,
+                "url": f"https://news.example.com/synthetic/{seed}/{i}",
+                "timestamp": f"2025-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}",
+                "source": rnd.choice(_OUTLETS),
+            }
+        )
+    return articles
+
+
+class StubTranslatorBackend:
+    """Translation backend that tags each line locally instead of calling a web service."""
+
+    max_chars = 4500
+
+    def __init__(self):
+        self.calls = 0
+
+    def translate(self, text: str, source: str, target: str) -> str:
+        self.calls += 1
+        return "\n".join(f"[{target}] {line}" for line in text.split("\n"))
+
+
+class StubGTTS:
+    """Drop-in for `gtts.gTTS` that produces deterministic fake MP3 bytes without network access."""
+
+    def __init__(self, text: str, lang: str = "en", **kwargs):
+        self.text = text
+
+    def stream(self):
+        data = self.text.encode("utf-8")
+        for i in range(0, len(data), 1024):
+            yield b"\xff\xfb" + data[i : i + 1024]
+
+    def write_to_fp(self, fp):
+        for piece in self.stream():
+            fp.write(piece)
+
+    def save(self, filename: str):
+        with open(filename, "wb") as f:
+            self.write_to_fp(f)
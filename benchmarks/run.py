@@ -0,0 +1,276 @@
+"""
+Benchmark every pipeline stage offline and optionally compare against a saved baseline.
+
+Usage (from the repository root):
+    python -m benchmarks.run --sizes 10 100 1000 --output bench.json
+    python -m benchmarks.run --baseline bench.json --tolerance 0.25
+"""
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from unittest import mock
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import StubGTTS, StubTranslatorBackend, fixture_fetcher, synthetic_articles  # noqa: E402
+
+DEFAULT_SIZES = (10, 100, 1000, 10000)
+
+
+class StageSkipped(Exception):
+    """Raised by a stage whose offline requirements (e.g. a local model) are missing."""
+
+
+def _require_nltk(*names):
+    """Skip a stage unless the given NLTK data packages are already installed locally."""
+    import nltk
+    from model_loader import NLTK_RESOURCES
+
+    for name in names:
+        try:
+            nltk.data.find(NLTK_RESOURCES[name])
+        except LookupError:
+            raise StageSkipped(f"NLTK resource '{name}' is not installed")
+
+
+def _require_spacy_model():
+    """Skip a stage unless the spaCy model is installed (never download it during a benchmark)."""
+    import spacy
+    from model_loader import SPACY_MODEL
+
+    if not spacy.util.is_package(SPACY_MODEL):
+        raise StageSkipped(f"spaCy model '{SPACY_MODEL}' is not installed")
+
+
+def _scored(articles):
+    """Attach sentiment labels and scores to a synthetic corpus outside the timed region."""
+    from news_extraction import _score_articles
+
+    return _score_articles([dict(article) for article in articles])
+
+
+# Each stage takes the corpus size and returns a zero-argument callable to time.
+# Work done before returning is setup and is not measured.
+
+
+def stage_fetch_parse(n):
+    from news_extraction import fetch_news
+
+    _require_nltk("vader_lexicon")
+    fetcher = fixture_fetcher("synthetic_bing_tesla")
+    pages = math.ceil(n / 10)
+    return lambda: fetch_news("Tesla", limit=n, pages=pages, fetcher=fetcher, summarize=False)
+
+
+def stage_sentiment(n):
+    from sentiment_analysis import _polarity_scores, analyze_sentiment_batch
+
+    _require_nltk("vader_lexicon")
+    texts = [article["summary"] for article in synthetic_articles(n)]
+
+    def run():
+        _polarity_scores.cache_clear()  # Measure cold scoring, not memo hits
+        return analyze_sentiment_batch(texts)
+
+    return run
+
+
+def stage_topics(n):
+    from comparative_analysis import extract_topics_batch
+
+    _require_nltk("stopwords", "punkt", "punkt_tab")
+    _require_spacy_model()
+    texts = [article["summary"] for article in synthetic_articles(n)]
+    return lambda: extract_topics_batch(texts)
+
+
+def stage_dedup(n):
+    from deduplication import article_text, cluster_near_duplicates
+
+    texts = [article_text(article) for article in synthetic_articles(n)]
+    return lambda: cluster_near_duplicates(texts)
+
+
+def stage_comparative(n):
+    from comparative_analysis import comparative_sentiment_analysis
+
+    _require_nltk("vader_lexicon")
+    articles = _scored(synthetic_articles(n))
+    return lambda: comparative_sentiment_analysis(articles, coverage_mode="similar", top_k=10)
+
+
+def stage_summarize(n):
+    from summarization import summarize_texts
+
+    texts = [article["body"] for article in synthetic_articles(n)]
+    return lambda: summarize_texts(texts)
+
+
+def stage_translation(n):
+    from translation import BatchTranslator
+
+    texts = [article["summary"] for article in synthetic_articles(n)]
+    # A fresh translator per run so memoized results don't hide the packing cost
+    return lambda: BatchTranslator(StubTranslatorBackend()).translate_batch(texts)
+
+
+@contextlib.contextmanager
+def _offline_tts(cache_dir: str):
+    """Swap in stub translation/TTS backends and an empty audio cache, restoring the originals on exit."""
+    import translation
+    import tts_converter
+    import upstream
+
+    with contextlib.ExitStack() as stack:
+        stack.enter_context(mock.patch.object(tts_converter, "gTTS", StubGTTS))
+        stack.enter_context(mock.patch.object(tts_converter, "AUDIO_CACHE", tts_converter.AudioCache(cache_dir)))
+        stack.enter_context(mock.patch.object(translation, "_TRANSLATOR", translation.BatchTranslator(StubTranslatorBackend())))
+        stack.enter_context(mock.patch.dict(upstream._UPSTREAMS))
+        # The stand-ins are local, so measure the pipeline rather than the per-host rate limit
+        upstream.configure_upstream(translation.TRANSLATION_HOST, rate=math.inf, burst=math.inf, max_concurrency=64)
+        yield
+
+
+def stage_tts(n):
+    from tts_converter import text_to_speech_hindi_batch
+
+    texts = [f"{article['summary']} ({i})" for i, article in enumerate(synthetic_articles(n))]
+
+    def run():
+        # Empty cache directory and translator per run, so every item is translated and synthesized
+        with tempfile.TemporaryDirectory(prefix="bench-tts-") as cache_dir, _offline_tts(cache_dir):
+            return text_to_speech_hindi_batch(texts)
+
+    return run
+
+
+STAGES = {
+    "fetch_parse": stage_fetch_parse,
+    "sentiment": stage_sentiment,
+    "topics": stage_topics,
+    "dedup": stage_dedup,
+    "comparative": stage_comparative,
+    "summarize": stage_summarize,
+    "translation": stage_translation,
+    "tts": stage_tts,
+}
+
+
+def measure(stage: str, size: int, repeat: int) -> dict:
+    """
+    Time one stage at one corpus size.
+
+    Latency percentiles come from `repeat` untraced runs; peak memory from one extra run
+    under tracemalloc (which would otherwise distort the timings).
+
+    Returns:
+        dict: stage, size, runs, p50_ms, p95_ms, throughput_per_s and peak_mem_kb (or a skip reason).
+    """
+    try:
+        run = STAGES[stage](size)
+    except StageSkipped as e:
+        return {"stage": stage, "size": size, "skipped": str(e)}
+
+    with contextlib.redirect_stdout(io.StringIO()):  # Keep per-item log lines out of the report
+        run()  # Warm-up: lazy imports and model loading
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - start)
+
+        tracemalloc.start()
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    p50 = float(np.percentile(timings, 50))
+    return {
+        "stage": stage,
+        "size": size,
+        "runs": repeat,
+        "p50_ms": round(p50 * 1000, 3),
+        "p95_ms": round(float(np.percentile(timings, 95)) * 1000, 3),
+        "throughput_per_s": round(size / p50, 1) if p50 > 0 else None,
+        "peak_mem_kb": round(peak / 1024, 1),
+    }
+
+
+def compare(results: list, baseline: dict, tolerance: float) -> list:
+    """
+    Compare p50 latencies against a baseline results document.
+
+    Returns:
+        list: (stage, size, baseline p50, current p50, ratio) for every regression beyond `tolerance`.
+    """
+    previous = {(r["stage"], r["size"]): r for r in baseline.get("results", []) if "p50_ms" in r}
+    regressions = []
+    for result in results:
+        before = previous.get((result["stage"], result["size"]))
+        if not before or "p50_ms" not in result or not before["p50_ms"]:
+            continue
+        ratio = result["p50_ms"] / before["p50_ms"]
+        marker = "REGRESSION" if ratio > 1 + tolerance else "ok"
+        print(f"  {result['stage']:<12} n={result['size']:<6} {before['p50_ms']:>10.2f} -> {result['p50_ms']:>10.2f} ms  x{ratio:.2f}  {marker}")
+        if ratio > 1 + tolerance:
+            regressions.append((result["stage"], result["size"], before["p50_ms"], result["p50_ms"], ratio))
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the news pipeline stages offline.")
+    parser.add_argument("--stages", nargs="+", choices=sorted(STAGES), default=list(STAGES))
+    parser.add_argument("--sizes", nargs="+", type=int, default=list(DEFAULT_SIZES))
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per stage and size")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed p50 slowdown before flagging (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    results = []
+    for stage in args.stages:
+        for size in args.sizes:
+            result = measure(stage, size, args.repeat)
+            results.append(result)
+            if "skipped" in result:
+                print(f"{stage:<12} n={size:<6} skipped: {result['skipped']}")
+            else:
+                print(
+                    f"{stage:<12} n={size:<6} p50 {result['p50_ms']:>10.2f} ms  p95 {result['p95_ms']:>10.2f} ms  "
+                    f"{result['throughput_per_s']:>10} items/s  peak {result['peak_mem_kb']:>10} KiB"
+                )
+
+    document = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(document, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"\nComparison with {args.baseline} (tolerance {args.tolerance:.0%}):")
+        if compare(results, baseline, args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
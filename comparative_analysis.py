@@ -1,52 +1,109 @@
 import re
 from collections import Counter
-from itertools import combinations
-import spacy
-from sklearn.feature_extraction.text import TfidfVectorizer
-import nltk
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
-import os
-
-# Ensure necessary NLTK downloads
-nltk.download("punkt")
-nltk.download("stopwords")
-
-# Load spaCy model (fixed)
-try:
-    nlp = spacy.load("en_core_web_sm")
-except OSError:
-    print(" spaCy model not found! Downloading now...")
-    import subprocess
-    subprocess.run(["python", "-m", "spacy", "download", "en_core_web_sm"], check=True)
-    print(" Model downloaded! Loading now...")
-    nlp = spacy.load("en_core_web_sm")
-
-# (Rest of your script remains unchanged)
+from itertools import combinations, islice
+import numpy as np
+from article_batch import SENTIMENT_CATEGORIES, ArticleBatch
+from metrics import timed
+from model_loader import get_nlp, get_stopwords, get_word_tokenize
+from sentiment_analysis import analyze_sentiment_batch
+
+# spaCy, NLTK data and scikit-learn are loaded lazily on first use (see model_loader.warm_up)
+
+
+# Entity types kept as topics, and the pipeline component that produces them
+TOPIC_ENTITY_LABELS = frozenset({"ORG", "GPE", "PRODUCT"})
+TOPIC_PIPES = ("ner",)
 
 
 def extract_topics(text, num_topics=3):
     """Extracts meaningful topics using TF-IDF and Named Entity Recognition (NER)"""
-    if not text:
-        return ["No topics identified"]  # Fallback for empty summaries
+    return extract_topics_batch([text], num_topics=num_topics)[0]
+
+
+@timed("topics")
+def extract_topics_batch(texts: list, num_topics: int = 3, batch_size: int = 64, n_process: int = 1) -> list:
+    """
+    Extract topics for a whole set of articles at once.
+
+    Named entities come from a single `nlp.pipe` pass with every component except NER disabled.
+    Keywords come from one TF-IDF model fitted across all texts, so term weights reflect how
+    distinctive a word is within this article set.
+
+    Args:
+        texts (list): Article texts (typically summaries).
+        num_topics (int): Number of TF-IDF keywords to keep per text.
+        batch_size (int): Number of texts spaCy processes per batch.
+        n_process (int): Number of spaCy worker processes.
+
+    Returns:
+        list: A list of topics for each text (["No topics identified"] when none are found).
+    """
+    results = [["No topics identified"] for _ in texts]  # Fallback for empty summaries
+    indices = [i for i, text in enumerate(texts) if text]
+    if not indices:
+        return results
+    docs_text = [texts[i] for i in indices]
+
+    from sklearn.feature_extraction.text import TfidfVectorizer
 
     # Named Entity Recognition (NER) for Companies, Tech, and Places
-    doc = nlp(text)
-    named_entities = [ent.text for ent in doc.ents if ent.label_ in ["ORG", "GPE", "PRODUCT"]]
-
-    # TF-IDF for Keyword Extraction
-    words = word_tokenize(text.lower())  # Tokenize
-    words = [word for word in words if word.isalpha()]  # Remove punctuation
-    words = [word for word in words if word not in stopwords.words("english")]  # Remove stopwords
-    
-    vectorizer = TfidfVectorizer(max_features=10)
-    tfidf_matrix = vectorizer.fit_transform([" ".join(words)])
-    feature_names = vectorizer.get_feature_names_out()
-    
+    nlp = get_nlp()
+    disabled = [name for name in nlp.pipe_names if name not in TOPIC_PIPES]
+    named_entities = [
+        [ent.text for ent in doc.ents if ent.label_ in TOPIC_ENTITY_LABELS]
+        for doc in nlp.pipe(docs_text, batch_size=batch_size, n_process=n_process, disable=disabled)
+    ]
+
+    # TF-IDF for Keyword Extraction, fitted once over the whole article set
+    word_tokenize = get_word_tokenize()
+    stop_words = get_stopwords()
+    documents = [
+        " ".join(word for word in word_tokenize(text.lower()) if word.isalpha() and word not in stop_words)
+        for text in docs_text
+    ]
+
+    keywords = [[] for _ in docs_text]
+    vectorizer = TfidfVectorizer()
+    try:
+        tfidf_matrix = vectorizer.fit_transform(documents).tocsr()
+        feature_names = vectorizer.get_feature_names_out()
+        for row in range(tfidf_matrix.shape[0]):
+            start, end = tfidf_matrix.indptr[row], tfidf_matrix.indptr[row + 1]
+            top = np.argsort(-tfidf_matrix.data[start:end], kind="stable")[:num_topics]
+            keywords[row] = feature_names[tfidf_matrix.indices[start:end][top]].tolist()
+    except ValueError:
+        pass  # Every document was empty after stopword removal
+
     # 3️⃣ Combine Results (NER + TF-IDF)
-    topics = list(set(named_entities + list(feature_names[:num_topics])))  
+    for i, entities, words in zip(indices, named_entities, keywords):
+        topics = list(dict.fromkeys(entities + words))
+        if topics:
+            results[i] = topics
+
+    return results
+
+
+def annotate_topics(news_list: list, num_topics: int = 3) -> list:
+    """
+    Attach a "topics" list to every article, extracted from its summary in one batch.
+
+    Articles that already carry topics (e.g. loaded from the article store) are left as they are.
+
+    Args:
+        news_list (list): List of news article dictionaries.
+        num_topics (int): Number of TF-IDF keywords to keep per article.
+
+    Returns:
+        list: The same list, with "topics" set on each article.
+    """
+    pending = [article for article in news_list if article.get("topics") is None]
+    if not pending:
+        return news_list
+    topics = extract_topics_batch([article.get("summary", "") for article in pending], num_topics=num_topics)
+    for article, article_topics in zip(pending, topics):
+        article["topics"] = article_topics
+    return news_list
 
-    return topics if topics else ["No topics identified"]  # Ensure non-empty output
 
 def extract_keywords(text: str) -> list:
     """
@@ -63,12 +120,297 @@ def extract_keywords(text: str) -> list:
     return [word for word in words if word not in stop_words]
 
 
-def comparative_sentiment_analysis(news_list: list) -> dict:
+def sentiment_scores(news_list: list) -> np.ndarray:
+    """
+    Collect compound sentiment scores for a list of articles.
+
+    Articles that already carry a "sentiment_score" (as produced by `fetch_news`) use it;
+    the rest are scored from their summary (or title) in a single batch.
+
+    Args:
+        news_list (list | ArticleBatch): News article dictionaries, or a batch (whose score column is returned).
+
+    Returns:
+        np.ndarray: Compound score per article, in input order.
+    """
+    if isinstance(news_list, ArticleBatch):
+        return news_list.sentiment_score
+    compound = np.array([article.get("sentiment_score", np.nan) for article in news_list], dtype=np.float32)
+    missing = np.flatnonzero(np.isnan(compound))
+    if missing.size:
+        texts = [news_list[i].get("summary") or news_list[i].get("title", "") for i in missing]
+        compound[missing] = analyze_sentiment_batch(texts).compound
+    return compound
+
+
+SENTIMENTS = ("Positive", "Negative", "Neutral")
+
+
+class ArticleAggregator:
+    """
+    Incremental, single-pass analytics over a stream of articles.
+
+    Each article is consumed once and updates the sentiment distribution, per-date trends,
+    title keyword counts, sentiment extremes and sentiment shifts. Aggregators built over
+    separate shards (consecutive slices of one article stream) can be combined with `merge`.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.sentiment_counts = Counter()
+        self.trends = {}  # date -> {"Positive": n, "Negative": n, "Neutral": n}
+        self.keyword_counts = Counter()
+        self.shifts = []
+        self.most_positive = None  # (compound score, title, sentiment)
+        self.most_negative = None
+        self.first = None  # (sentiment, title) of the first and last articles, to detect shifts across shards
+        self.last = None
+
+    def add(self, article: dict, score: float = None) -> "ArticleAggregator":
+        """
+        Absorb one article.
+
+        Args:
+            article (dict): News article with "title", "sentiment" and "published_at" (or "timestamp").
+            score (float): Compound sentiment score; defaults to the article's "sentiment_score",
+                or scores the article when it has none.
+
+        Returns:
+            ArticleAggregator: self, for chaining.
+        """
+        if score is None:
+            score = float(sentiment_scores([article])[0])
+        sentiment, title = article["sentiment"], article["title"]
+
+        self.count += 1
+        self.sentiment_counts[sentiment] += 1
+
+        date = (article.get("published_at") or article.get("timestamp", ""))[:10]  # Date part (YYYY-MM-DD)
+        self.trends.setdefault(date, {label: 0 for label in SENTIMENTS})
+        self.trends[date][sentiment] = self.trends[date].get(sentiment, 0) + 1
+
+        self.keyword_counts.update(extract_keywords(title))
+
+        if self.most_positive is None or score > self.most_positive[0]:
+            self.most_positive = (score, title, sentiment)
+        if self.most_negative is None or score < self.most_negative[0]:
+            self.most_negative = (score, title, sentiment)
+
+        self._shift(self.last, (sentiment, title))
+        self.last = (sentiment, title)
+        if self.first is None:
+            self.first = self.last
+        return self
+
+    def extend(self, news_list: list) -> "ArticleAggregator":
+        """Absorb a list of articles, scoring any that lack a "sentiment_score" in one batch."""
+        if isinstance(news_list, ArticleBatch):
+            return self._extend_batch(news_list)
+        for article, score in zip(news_list, sentiment_scores(news_list).tolist()):
+            self.add(article, score)
+        return self
+
+    def _extend_batch(self, batch: ArticleBatch) -> "ArticleAggregator":
+        """Absorb an `ArticleBatch`, counting sentiments, dates, extremes and shifts column-wise."""
+        if not len(batch):
+            return self
+        codes, titles = batch.sentiment_code, batch.title
+        labels = batch.sentiments.tolist()
+
+        self.count += len(batch)
+        # Labels in first-seen order, as `add` would have inserted them
+        seen, first_index = np.unique(codes, return_index=True)
+        counts = np.bincount(codes)
+        for code in seen[np.argsort(first_index)].tolist():
+            self.sentiment_counts[SENTIMENT_CATEGORIES[code]] += int(counts[code])
+
+        for date, date_counts in batch.trends().items():
+            merged = self.trends.setdefault(date, {label: 0 for label in SENTIMENTS})
+            for sentiment, n in date_counts.items():
+                if n:
+                    merged[sentiment] = merged.get(sentiment, 0) + n
+
+        for title in titles:
+            self.keyword_counts.update(extract_keywords(title))
+
+        scores = batch.sentiment_score
+        high, low = int(np.argmax(scores)), int(np.argmin(scores))
+        if self.most_positive is None or scores[high] > self.most_positive[0]:
+            self.most_positive = (float(scores[high]), titles[high], labels[high])
+        if self.most_negative is None or scores[low] < self.most_negative[0]:
+            self.most_negative = (float(scores[low]), titles[low], labels[low])
+
+        self._shift(self.last, (labels[0], titles[0]))
+        for i in batch.shift_positions().tolist():
+            self._shift((labels[i - 1], titles[i - 1]), (labels[i], titles[i]))
+        self.last = (labels[-1], titles[-1])
+        if self.first is None:
+            self.first = (labels[0], titles[0])
+        return self
+
+    def merge(self, other: "ArticleAggregator") -> "ArticleAggregator":
+        """
+        Fold in an aggregator built over the articles that directly follow this one's.
+
+        Args:
+            other (ArticleAggregator): Aggregator of the next shard.
+
+        Returns:
+            ArticleAggregator: self, for chaining.
+        """
+        if other.count == 0:
+            return self
+        self.count += other.count
+        self.sentiment_counts.update(other.sentiment_counts)
+        for date, counts in other.trends.items():
+            merged = self.trends.setdefault(date, {label: 0 for label in SENTIMENTS})
+            for sentiment, n in counts.items():
+                merged[sentiment] = merged.get(sentiment, 0) + n
+        self.keyword_counts.update(other.keyword_counts)
+
+        if self.most_positive is None or other.most_positive[0] > self.most_positive[0]:
+            self.most_positive = other.most_positive
+        if self.most_negative is None or other.most_negative[0] < self.most_negative[0]:
+            self.most_negative = other.most_negative
+
+        self._shift(self.last, other.first)
+        self.shifts.extend(other.shifts)
+        self.last = other.last
+        if self.first is None:
+            self.first = other.first
+        return self
+
+    def _shift(self, previous, current) -> None:
+        """Record a sentiment shift between two consecutive (sentiment, title) articles."""
+        if previous is not None and previous[0] != current[0]:
+            self.shifts.append(
+                {"Change": f"Shift from {previous[0]} in '{previous[1]}' to {current[0]} in '{current[1]}'."}
+            )
+
+    def distribution(self) -> dict:
+        """Sentiment counts, always including every label."""
+        return {label: self.sentiment_counts.get(label, 0) for label in SENTIMENTS}
+
+    def majority_sentiment(self) -> str:
+        """The most frequent sentiment label ("Neutral" when empty)."""
+        return max(self.sentiment_counts, key=self.sentiment_counts.get, default="Neutral")
+
+    def top_keywords(self, n: int) -> dict:
+        """The `n` most frequent title keywords and their counts."""
+        return dict(self.keyword_counts.most_common(n))
+
+    def extremes(self) -> tuple:
+        """Titles of the most positive and most negative articles ("None" if no article qualifies)."""
+        most_positive = self.most_positive[1] if self.most_positive and self.most_positive[2] == "Positive" else "None"
+        most_negative = self.most_negative[1] if self.most_negative and self.most_negative[2] == "Negative" else "None"
+        return most_positive, most_negative
+
+
+# Coverage comparison modes: every pair (paginated), most similar pairs, or similar pairs with opposing sentiment
+COVERAGE_MODES = ("all", "similar", "contrast")
+
+
+def _coverage_vectors(news_list: list):
+    """Vectorize article titles and summaries once as L2-normalized sparse TF-IDF rows."""
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    texts = [f"{article.get('title', '')} {article.get('summary', '')}" for article in news_list]
+    try:
+        return TfidfVectorizer(stop_words="english", sublinear_tf=True).fit_transform(texts).tocsr()
+    except ValueError:
+        return None  # No usable vocabulary (e.g. all texts empty)
+
+
+def _coverage_entry(news_list: list, i: int, j: int, similarity: float) -> dict:
+    """Describe how two articles (0-based indices) differ in focus and stance."""
+    article1, article2 = news_list[i], news_list[j]
+    a, b = i + 1, j + 1
+    return {
+        "Comparison": f"Article {a} discusses \"{article1['title']}\", while Article {b} focuses on \"{article2['title']}\".",
+        "Impact": f"Article {a} presents a {article1['sentiment']} view, while Article {b} takes a {article2['sentiment']} stance.",
+        "Articles": [a, b],
+        "Similarity": round(float(similarity), 4),
+    }
+
+
+def coverage_differences(news_list: list, mode: str = "all", top_k: int = 10, offset: int = 0, limit: int = None) -> list:
+    """
+    Compare how articles differ in focus and stance.
+
+    Titles and summaries are vectorized once; pair similarities come from a single sparse
+    matrix product, so only pairs that share vocabulary are ever materialized.
+
+    Args:
+        news_list (list): List of news article dictionaries.
+        mode (str): "all" for every pair in order (use `offset`/`limit` to paginate),
+            "similar" for the `top_k` most similar pairs, or "contrast" for the `top_k` pairs
+            that cover similar ground with the most opposed sentiment scores.
+        top_k (int): Number of pairs returned by the "similar" and "contrast" modes.
+        offset (int): Index of the first pair returned in "all" mode.
+        limit (int): Maximum number of pairs returned in "all" mode (None for all).
+
+    Returns:
+        list: Comparison entries with the 1-based article numbers and their cosine similarity.
+    """
+    if mode not in COVERAGE_MODES:
+        raise ValueError(f"Unknown coverage mode '{mode}', expected one of {COVERAGE_MODES}")
+    if len(news_list) < 2:
+        return []
+
+    vectors = _coverage_vectors(news_list)
+
+    if mode == "all":
+        stop = None if limit is None else offset + limit
+        pairs = list(islice(combinations(range(len(news_list)), 2), offset, stop))
+        if vectors is None or not pairs:
+            return [_coverage_entry(news_list, i, j, 0.0) for i, j in pairs]
+        rows, cols = np.array(pairs).T
+        similarities = np.asarray(vectors[rows].multiply(vectors[cols]).sum(axis=1)).ravel()
+        return [_coverage_entry(news_list, i, j, sim) for (i, j), sim in zip(pairs, similarities)]
+
+    if vectors is None:
+        return []
+
+    from scipy.sparse import triu as sparse_triu
+
+    # Upper triangle of the cosine similarity matrix, kept sparse
+    similarity = sparse_triu(vectors @ vectors.T, k=1).tocoo()
+    rows, cols, weights = similarity.row, similarity.col, similarity.data
+    if mode == "contrast":
+        compound = sentiment_scores(news_list)
+        weights = weights * np.abs(compound[rows] - compound[cols])
+
+    candidates = np.flatnonzero(weights > 0)
+    if candidates.size > top_k:
+        candidates = candidates[np.argpartition(-weights[candidates], top_k - 1)[:top_k]]
+    candidates = candidates[np.argsort(-weights[candidates], kind="stable")]
+
+    return [
+        _coverage_entry(news_list, int(rows[n]), int(cols[n]), similarity.data[n])
+        for n in candidates
+    ]
+
+
+@timed("comparative")
+def comparative_sentiment_analysis(
+    news_list: list,
+    coverage_mode: str = "all",
+    top_k: int = 10,
+    offset: int = 0,
+    limit: int = None,
+    aggregator: ArticleAggregator = None,
+) -> dict:
     """
     Perform comparative sentiment analysis on a list of news articles.
 
     Args:
         news_list (list): List of news articles (each article is a dictionary with "title" and "sentiment").
+        coverage_mode (str): How to build coverage differences (see `coverage_differences`).
+        top_k (int): Number of pairs for the "similar" and "contrast" coverage modes.
+        offset (int): First pair returned in "all" coverage mode.
+        limit (int): Maximum pairs returned in "all" coverage mode (None for all).
+        aggregator (ArticleAggregator): Aggregator already fed with `news_list`, to avoid
+            another pass over the articles.
 
     Returns:
         dict: Dictionary containing sentiment distribution, major trends, sentiment shifts, coverage differences, 
@@ -80,50 +422,65 @@ def comparative_sentiment_analysis(news_list: list) -> dict:
             "Majority Sentiment": "Neutral",
             "Sentiment Shifts": [],
             "Coverage Differences": [],
+            "Coverage Pairs Total": 0,
             "Keyword Frequency": {},
             "Most Positive Article": "None",
             "Most Negative Article": "None",
         }
 
-    # 🔹 Sentiment Distribution
-    sentiment_counts = Counter(article["sentiment"] for article in news_list)
-    majority_sentiment = max(sentiment_counts, key=sentiment_counts.get, default="Neutral")
-
-    # 🔹 Detect Sentiment Shifts
-    sentiment_shifts = [
-        {
-            "Change": f"Shift from {news_list[i]['sentiment']} in '{news_list[i]['title']}' "
-            f"to {news_list[i + 1]['sentiment']} in '{news_list[i + 1]['title']}'."
-        }
-        for i in range(len(news_list) - 1)
-        if news_list[i]["sentiment"] != news_list[i + 1]["sentiment"]
-    ]
-
-    # 🔹 Identify Most Positive & Negative Articles
-    most_positive = next((article["title"] for article in news_list if article["sentiment"] == "Positive"), "None")
-    most_negative = next((article["title"] for article in news_list if article["sentiment"] == "Negative"), "None")
-
-    # 🔹 Keyword Frequency Analysis
-    keyword_counter = Counter()
-    for article in news_list:
-        keyword_counter.update(extract_keywords(article["title"]))
+    # 🔹 Sentiment distribution, shifts, extremes and keywords in a single pass
+    if aggregator is None:
+        aggregator = ArticleAggregator().extend(news_list)
+    most_positive, most_negative = aggregator.extremes()
 
     # 🔹 Coverage Differences (Comparing Article Focus)
-    coverage_differences = [
-        {
-            "Comparison": f"Article {i} discusses \"{article1['title']}\", while Article {j} focuses on \"{article2['title']}\".",
-            "Impact": f"Article {i} presents a {article1['sentiment']} view, while Article {j} takes a {article2['sentiment']} stance.",
-        }
-        for (i, article1), (j, article2) in combinations(enumerate(news_list, 1), 2)
-    ]
+    coverage = coverage_differences(news_list, mode=coverage_mode, top_k=top_k, offset=offset, limit=limit)
 
     return {
-        "Sentiment Distribution": dict(sentiment_counts),
-        "Majority Sentiment": majority_sentiment,
-        "Sentiment Shifts": sentiment_shifts,
-        "Coverage Differences": coverage_differences,
-        "Keyword Frequency": dict(keyword_counter.most_common(5)),  # Top 5 keywords
+        "Sentiment Distribution": dict(aggregator.sentiment_counts),
+        "Majority Sentiment": aggregator.majority_sentiment(),
+        "Sentiment Shifts": aggregator.shifts,
+        "Coverage Differences": coverage,
+        "Coverage Pairs Total": len(news_list) * (len(news_list) - 1) // 2,
+        "Keyword Frequency": aggregator.top_keywords(5),  # Top 5 keywords
         "Most Positive Article": most_positive,
         "Most Negative Article": most_negative,
     }
 
+
+def compare_companies(company_articles: dict, key=lambda article: article["url"]) -> dict:
+    """
+    Build a cross-company comparison from each company's scored articles.
+
+    Args:
+        company_articles (dict): Company name -> list of articles with "sentiment" and "sentiment_score".
+        key (callable): Identity of an article, used to count coverage shared between companies.
+
+    Returns:
+        dict: "companies" (row/column order), per-company "summary" (article count, average score,
+              sentiment shares, majority sentiment), and matrices "sentiment_gap" (row average minus
+              column average) and "shared_articles" (articles covering both companies).
+    """
+    companies = list(company_articles)
+    averages = np.array(
+        [float(sentiment_scores(articles).mean()) if articles else 0.0 for articles in company_articles.values()]
+    )
+    keys = [{key(article) for article in articles} for articles in company_articles.values()]
+
+    summary = {}
+    for company, articles, average in zip(companies, company_articles.values(), averages):
+        counts = Counter(article.get("sentiment", "Neutral") for article in articles)
+        total = max(len(articles), 1)
+        summary[company] = {
+            "articles": len(articles),
+            "average_score": round(float(average), 4),
+            "shares": {label: round(counts[label] / total, 4) for label in SENTIMENTS},
+            "majority_sentiment": counts.most_common(1)[0][0] if counts else "Neutral",
+        }
+
+    return {
+        "companies": companies,
+        "summary": summary,
+        "sentiment_gap": np.round(averages[:, None] - averages[None, :], 4).tolist(),
+        "shared_articles": [[len(a & b) for b in keys] for a in keys],
+    }
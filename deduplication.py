@@ -0,0 +1,164 @@
+import os
+import re
+import zlib
+
+import numpy as np
+
+from metrics import timed
+
+# Estimated Jaccard similarity (of word shingles) above which two articles are the same story
+DUPLICATE_THRESHOLD = float(os.environ.get("DUPLICATE_THRESHOLD", 0.6))
+
+# MinHash signature length and LSH banding: 16 bands of 4 rows puts candidates at ~0.5 similarity
+NUM_PERM = 64
+LSH_BANDS = 16
+SHINGLE_SIZE = 3
+_SIGNATURE_BLOCK = 1024
+
+# Fields computed once per cluster and copied to the other members
+FANOUT_FIELDS = ("sentiment", "sentiment_score", "topics", "audio_path")
+
+_rng = np.random.default_rng(1)
+# Multiply-shift hash family: h(x) = (a * x + b) >> 32 with odd 64-bit multipliers
+_HASH_A = _rng.integers(1, 2**63, size=NUM_PERM, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+_HASH_B = _rng.integers(0, 2**63, size=NUM_PERM, dtype=np.uint64)
+
+
+def _shingles(text: str, k: int = SHINGLE_SIZE) -> np.ndarray:
+    """Hash the word k-grams of a text to 32-bit integers."""
+    words = re.findall(r"\w+", text.lower())
+    if len(words) < k:
+        grams = [" ".join(words)] if words else []
+    else:
+        grams = {" ".join(words[i : i + k]) for i in range(len(words) - k + 1)}
+    return np.fromiter((zlib.crc32(gram.encode("utf-8")) for gram in grams), dtype=np.uint64)
+
+
+def minhash_signatures(texts: list, num_perm: int = NUM_PERM) -> np.ndarray:
+    """
+    Compute MinHash signatures for a batch of texts, vectorized over blocks of texts.
+
+    Args:
+        texts (list): Texts to sign.
+        num_perm (int): Signature length (at most `NUM_PERM`).
+
+    Returns:
+        np.ndarray: (len(texts), num_perm) array of uint64 minimum hashes.
+    """
+    shingles = [_shingles(text or "") for text in texts]
+    # Texts without words get a unique sentinel shingle so they never match anything
+    shingles = [s if len(s) else np.array([2**40 + i], dtype=np.uint64) for i, s in enumerate(shingles)]
+    signatures = np.empty((len(texts), num_perm), dtype=np.uint64)
+
+    # Hash in blocks of texts to bound the (shingles x num_perm) intermediate
+    for start in range(0, len(shingles), _SIGNATURE_BLOCK):
+        block = shingles[start : start + _SIGNATURE_BLOCK]
+        offsets = np.concatenate(([0], np.cumsum([len(s) for s in block])[:-1]))
+        values = np.concatenate(block)[:, None]
+        with np.errstate(over="ignore"):  # uint64 wrap-around is part of the hash
+            hashed = (values * _HASH_A[:num_perm] + _HASH_B[:num_perm]) >> np.uint64(32)
+        signatures[start : start + len(block)] = np.minimum.reduceat(hashed, offsets, axis=0)
+    return signatures
+
+
+def _find(parent: list, i: int) -> int:
+    """Union-find root lookup with path halving."""
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+@timed("dedup")
+def cluster_near_duplicates(texts: list, threshold: float = DUPLICATE_THRESHOLD, bands: int = LSH_BANDS) -> list:
+    """
+    Group near-identical texts (e.g. one wire story syndicated by several outlets).
+
+    Signatures are bucketed per LSH band, so only texts sharing a band are compared and the
+    work stays roughly linear in the number of texts.
+
+    Args:
+        texts (list): Texts to cluster.
+        threshold (float): Minimum estimated Jaccard similarity for two texts to be merged.
+        bands (int): Number of LSH bands the signature is split into.
+
+    Returns:
+        list: For every text, the index of its cluster representative (the first member).
+    """
+    n = len(texts)
+    if n < 2:
+        return list(range(n))
+
+    signatures = minhash_signatures(texts)
+    rows = signatures.shape[1] // bands
+    parent = list(range(n))
+
+    for band in range(bands):
+        buckets = {}
+        for i, key in enumerate(map(bytes, signatures[:, band * rows : (band + 1) * rows])):
+            buckets.setdefault(key, []).append(i)
+        for members in buckets.values():
+            for j in members[1:]:
+                first, other = _find(parent, members[0]), _find(parent, j)
+                if first == other:
+                    continue
+                if np.mean(signatures[members[0]] == signatures[j]) >= threshold:
+                    parent[max(first, other)] = min(first, other)
+
+    return [_find(parent, i) for i in range(n)]
+
+
+def article_text(article: dict) -> str:
+    """Text used to compare articles: title plus summary."""
+    return f"{article.get('title', '')} {article.get('summary', '')}"
+
+
+def collapse_duplicates(news_list: list, threshold: float = DUPLICATE_THRESHOLD) -> tuple:
+    """
+    Keep one representative per cluster of near-duplicate articles.
+
+    Each representative gets a "cluster_size" and the URLs and sources of its "duplicates".
+
+    Args:
+        news_list (list): News article dictionaries.
+        threshold (float): Minimum estimated similarity for two articles to be merged.
+
+    Returns:
+        tuple: (representatives in original order, representative index of every article).
+    """
+    labels = cluster_near_duplicates([article_text(article) for article in news_list], threshold)
+    members = {}
+    for i, label in enumerate(labels):
+        members.setdefault(label, []).append(i)
+
+    representatives = []
+    for label, indices in members.items():
+        article = news_list[label]
+        article["cluster_size"] = len(indices)
+        article["duplicates"] = [
+            {"url": news_list[i]["url"], "source": news_list[i].get("source")} for i in indices[1:]
+        ]
+        representatives.append(article)
+    return representatives, labels
+
+
+def fan_out(news_list: list, labels: list, fields: tuple = FANOUT_FIELDS) -> list:
+    """
+    Copy fields computed on cluster representatives to the other members.
+
+    Args:
+        news_list (list): All articles, aligned with `labels`.
+        labels (list): Representative index of every article (from `collapse_duplicates`).
+        fields (tuple): Names of the fields to copy when the representative has them.
+
+    Returns:
+        list: The same list, with member articles updated.
+    """
+    for article, label in zip(news_list, labels):
+        representative = news_list[label]
+        if representative is article:
+            continue
+        for field in fields:
+            if field in representative:
+                article[field] = representative[field]
+    return news_list
@@ -0,0 +1,205 @@
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Worker pool size, maximum queued + running jobs, per-job item concurrency and retention of finished jobs
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", 4))
+JOB_MAX_PENDING = int(os.environ.get("JOB_MAX_PENDING", 32))
+JOB_ITEM_CONCURRENCY = int(os.environ.get("JOB_ITEM_CONCURRENCY", 4))
+JOB_RETENTION_SECONDS = float(os.environ.get("JOB_RETENTION_SECONDS", 600))
+
+
+class JobQueueFull(Exception):
+    """Raised when a job is submitted while the queue is at capacity."""
+
+
+class Job:
+    """
+    A unit of background work and the events it has produced so far.
+
+    Events are appended in order as `(name, data)` tuples; readers wait on `changed`
+    to be woken when new events arrive or the job finishes.
+    """
+
+    def __init__(self, kind: str):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.status = "queued"
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.events = []
+        self.result = None
+        self.error = None
+        self.changed = threading.Condition()
+
+    @property
+    def finished(self) -> bool:
+        """Whether the job has completed or failed."""
+        return self.status in ("completed", "failed")
+
+    def emit(self, name: str, data) -> None:
+        """Record an event and wake any subscribers."""
+        with self.changed:
+            self.events.append((name, data))
+            self.changed.notify_all()
+
+    def map(self, fn, items: list, event: str = "item", concurrency: int = JOB_ITEM_CONCURRENCY) -> list:
+        """
+        Apply `fn` to every item with bounded concurrency, emitting each result as it completes.
+
+        Args:
+            fn (callable): Function applied to each item.
+            items (list): Work items.
+            event (str): Name of the event emitted per item (data: {"index", "result"}).
+            concurrency (int): Maximum number of items processed at once for this job.
+
+        Returns:
+            list: Results in input order.
+        """
+        results = [None] * len(items)
+        if not items:
+            return results
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(items)), thread_name_prefix=f"job-{self.id[:8]}") as pool:
+            futures = {pool.submit(fn, item): index for index, item in enumerate(items)}
+            for future in as_completed(futures):
+                index = futures[future]
+                results[index] = future.result()
+                self.emit(event, {"index": index, "result": results[index]})
+        return results
+
+    def iter_events(self, start: int = 0, keepalive: float = 15.0):
+        """
+        Yield events from position `start` onwards, blocking until the job finishes.
+
+        Yields `None` whenever `keepalive` seconds pass without a new event, so streaming
+        responses can send a heartbeat.
+        """
+        position = start
+        while True:
+            with self.changed:
+                if position >= len(self.events) and not self.finished:
+                    self.changed.wait(keepalive)
+                pending = self.events[position:]
+                finished = self.finished
+            position += len(pending)
+            if not pending and not finished:
+                yield None
+            for event in pending:
+                yield event
+            if finished and position >= len(self.events):
+                return
+
+    def to_dict(self) -> dict:
+        """
+        Summarize the job for status responses.
+
+        Returns:
+            dict: Id, kind, status, timestamps, per-item results so far, final result and error.
+        """
+        with self.changed:
+            items = [data for name, data in self.events if name not in ("status", "result", "error")]
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "items": items,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class JobManager:
+    """
+    Runs jobs on a bounded worker pool with a bounded number of pending jobs.
+
+    Submitting beyond `max_pending` queued or running jobs raises `JobQueueFull`, so callers
+    can apply backpressure (e.g. HTTP 429) instead of letting work pile up.
+    """
+
+    def __init__(self, workers: int = JOB_WORKERS, max_pending: int = JOB_MAX_PENDING, retention: float = JOB_RETENTION_SECONDS):
+        self.max_pending = max_pending
+        self.retention = retention
+        self._jobs = {}
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job-worker")
+
+    def submit(self, kind: str, fn, *args, **kwargs) -> Job:
+        """
+        Queue `fn(job, *args, **kwargs)`; its return value becomes the job result.
+
+        Args:
+            kind (str): Job type label.
+            fn (callable): Work function receiving the Job as its first argument.
+
+        Returns:
+            Job: The queued job.
+
+        Raises:
+            JobQueueFull: If `max_pending` jobs are already queued or running.
+        """
+        job = Job(kind)
+        with self._lock:
+            self._purge()
+            if self._pending >= self.max_pending:
+                raise JobQueueFull(f"Job queue is full ({self.max_pending} pending jobs)")
+            self._pending += 1
+            self._jobs[job.id] = job
+        self._pool.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def get(self, job_id: str):
+        """Return a job by id, or None if unknown or expired."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run(self, job: Job, fn, args, kwargs) -> None:
+        """Execute a job and record its outcome."""
+        job.started_at = time.time()
+        job.status = "running"
+        job.emit("status", {"status": job.status})
+        try:
+            result = fn(job, *args, **kwargs)
+        except Exception as e:
+            print(f"❌ Job {job.id} ({job.kind}) failed: {e}")
+            job.error = str(e)
+            self._finish(job, "failed", "error", {"error": job.error})
+        else:
+            job.result = result
+            self._finish(job, "completed", "result", result)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    @staticmethod
+    def _finish(job: Job, status: str, event: str, data) -> None:
+        """Mark a job finished and record its final event atomically for subscribers."""
+        with job.changed:
+            # finished_at first, so a job that reports itself finished always has a finish time
+            job.finished_at = time.time()
+            job.status = status
+            job.events.append((event, data))
+            job.changed.notify_all()
+
+    def _purge(self) -> None:
+        """Forget finished jobs older than the retention period (caller holds the lock)."""
+        cutoff = time.time() - self.retention
+        expired = [job_id for job_id, job in self._jobs.items() if job.finished_at is not None and job.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def stats(self) -> dict:
+        """
+        Report queue occupancy.
+
+        Returns:
+            dict: Pending (queued + running) jobs, capacity and jobs retained.
+        """
+        with self._lock:
+            return {"pending": self._pending, "max_pending": self.max_pending, "retained": len(self._jobs)}
@@ -0,0 +1,229 @@
+import contextvars
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Set METRICS_ENABLED=0 to turn all instrumentation into near no-ops
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1") not in ("0", "false", "False")
+SLOW_REQUEST_SECONDS = float(os.environ.get("SLOW_REQUEST_SECONDS", 2.0))
+
+# Histogram buckets (seconds) shared by all timing metrics
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+STAGE_METRIC = "newsapp_stage_seconds"
+
+# Per-request stage breakdown: {"trace_id": str, "stages": {stage: seconds}}
+_current_trace = contextvars.ContextVar("newsapp_trace", default=None)
+# Worker threads add to the same trace dict, so updates are serialized
+_trace_lock = threading.Lock()
+
+
+def _escape(value) -> str:
+    """Escape a label value for the Prometheus text format."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value) -> str:
+    """Render a sample value without losing precision on large integers."""
+    return str(value) if isinstance(value, int) else f"{value:.10g}"
+
+
+def _format_labels(labels: tuple) -> str:
+    """Render a sorted label tuple as a Prometheus label set."""
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+class MetricsRegistry:
+    """
+    Thread-safe counters and histograms with Prometheus text-format export.
+
+    Gauges are provided by collector callables evaluated at scrape time, so components
+    that already track their own state (caches, queues) don't pay for updates.
+    """
+
+    def __init__(self, enabled: bool = METRICS_ENABLED):
+        self.enabled = enabled
+        self._help = {}
+        self._counters = {}  # name -> {labels: value}
+        self._histograms = {}  # name -> {labels: [bucket counts..., sum, count]}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def describe(self, name: str, kind: str, help_text: str) -> None:
+        """Set the TYPE and HELP lines of a metric family."""
+        self._help[name] = (kind, help_text)
+
+    def inc(self, name: str, value: float = 1.0, **labels) -> None:
+        """Add `value` to a counter."""
+        if not self.enabled:
+            return
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        """Record one observation in a histogram."""
+        if not self.enabled:
+            return
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            state = series.get(key)
+            if state is None:
+                state = series[key] = [0] * len(BUCKETS) + [0.0, 0]
+            for i, bound in enumerate(BUCKETS):
+                if value <= bound:
+                    state[i] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def register_collector(self, collector) -> None:
+        """
+        Add a callable returning gauge samples at scrape time.
+
+        Args:
+            collector (callable): Returns an iterable of `(name, help, labels dict, value)`.
+        """
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """
+        Export every metric in the Prometheus text exposition format.
+
+        Returns:
+            str: The metrics document.
+        """
+        lines = []
+        with self._lock:
+            counters = {name: dict(series) for name, series in self._counters.items()}
+            histograms = {name: {key: list(state) for key, state in series.items()} for name, series in self._histograms.items()}
+
+        for name, series in sorted(counters.items()):
+            kind, help_text = self._help.get(name, ("counter", name))
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+            lines += [f"{name}{_format_labels(key)} {_format_value(value)}" for key, value in sorted(series.items())]
+
+        for name, series in sorted(histograms.items()):
+            kind, help_text = self._help.get(name, ("histogram", name))
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+            for key, state in sorted(series.items()):
+                for bound, bucket_count in zip(BUCKETS, state):
+                    lines.append(f"{name}_bucket{_format_labels(key + (('le', f'{bound:g}'),))} {bucket_count}")
+                lines.append(f"{name}_bucket{_format_labels(key + (('le', '+Inf'),))} {state[-1]}")
+                lines.append(f"{name}_sum{_format_labels(key)} {_format_value(state[-2])}")
+                lines.append(f"{name}_count{_format_labels(key)} {state[-1]}")
+
+        gauges = {}
+        for collector in self._collectors:
+            try:
+                for name, help_text, labels, value in collector():
+                    if value is not None:
+                        gauges.setdefault(name, (help_text, []))[1].append((tuple(sorted(labels.items())), value))
+            except Exception as e:
+                print(f"Error collecting metrics: {e}")
+        for name, (help_text, samples) in sorted(gauges.items()):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+            lines += [f"{name}{_format_labels(key)} {_format_value(value)}" for key, value in samples]
+
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+REGISTRY.describe(STAGE_METRIC, "histogram", "Time spent in each pipeline stage.")
+REGISTRY.describe("newsapp_cache_requests_total", "counter", "Cache lookups by cache and result.")
+REGISTRY.describe("newsapp_http_request_seconds", "histogram", "HTTP request latency by endpoint.")
+REGISTRY.describe("newsapp_slow_requests_total", "counter", "HTTP requests slower than SLOW_REQUEST_SECONDS.")
+
+
+def _record_stage(name: str, seconds: float) -> None:
+    """Observe a stage duration and add it to the current request trace."""
+    REGISTRY.observe(STAGE_METRIC, seconds, stage=name)
+    trace = _current_trace.get()
+    if trace is not None:
+        with _trace_lock:
+            stages = trace["stages"]
+            stages[name] = stages.get(name, 0.0) + seconds
+
+
+@contextmanager
+def stage(name: str):
+    """Time a block of code as a pipeline stage."""
+    if not REGISTRY.enabled:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _record_stage(name, time.perf_counter() - start)
+
+
+def timed(name: str):
+    """Decorator timing every call of a function as a pipeline stage."""
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not REGISTRY.enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _record_stage(name, time.perf_counter() - start)
+
+        return wrapper
+
+    return decorator
+
+
+def submit_in_context(pool, fn, *args, **kwargs):
+    """
+    Submit `fn` to an executor inside a copy of the caller's context.
+
+    Worker threads start with an empty context, so without this their stages would be
+    missing from the request trace.
+
+    Returns:
+        concurrent.futures.Future: The submitted call.
+    """
+    return pool.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+def count_cache(cache: str, result: str, n: int = 1) -> None:
+    """Count `n` cache lookups with the given result ("hit", "miss", "stale" or "coalesced")."""
+    if n:
+        REGISTRY.inc("newsapp_cache_requests_total", n, cache=cache, result=result)
+
+
+def start_trace(trace_id: str):
+    """
+    Begin collecting a stage breakdown for the current request (context-local).
+
+    Returns:
+        contextvars.Token: Token to pass to `finish_trace`.
+    """
+    return _current_trace.set({"trace_id": trace_id, "stages": {}, "start": time.perf_counter()})
+
+
+def finish_trace(token) -> dict:
+    """
+    Stop collecting the current request's breakdown.
+
+    Returns:
+        dict: trace_id, total seconds and per-stage seconds, including stages of work submitted with `submit_in_context`.
+    """
+    trace = _current_trace.get()
+    _current_trace.reset(token)
+    if trace is None:
+        return {}
+    return {
+        "trace_id": trace["trace_id"],
+        "total": time.perf_counter() - trace["start"],
+        "stages": trace["stages"],
+    }
@@ -0,0 +1,151 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+from functools import lru_cache
+
+# NLTK packages used by the pipeline and the data path that proves each one is installed
+NLTK_RESOURCES = {
+    "vader_lexicon": "sentiment/vader_lexicon.zip",
+    "punkt": "tokenizers/punkt",
+    "punkt_tab": "tokenizers/punkt_tab",
+    "stopwords": "corpora/stopwords",
+}
+
+SPACY_MODEL = "en_core_web_sm"
+
+# Set MODEL_DOWNLOADS=0 to fail fast on missing NLTK data or spaCy models instead of downloading them
+MODEL_DOWNLOADS = os.environ.get("MODEL_DOWNLOADS", "1") not in ("0", "false", "False")
+
+_NLTK_LOCK = threading.Lock()
+
+
+class ModelUnavailable(LookupError):
+    """Raised when a model or data package is missing and downloads are disabled (`MODEL_DOWNLOADS=0`)."""
+
+
+def ensure_nltk_resource(name: str) -> None:
+    """
+    Make sure an NLTK data package is installed, downloading it only when it is missing.
+
+    The local data path is checked first, so nothing touches the network once the data exists.
+
+    Args:
+        name (str): NLTK package name (a key of `NLTK_RESOURCES`).
+
+    Raises:
+        ModelUnavailable: If the package is missing and `MODEL_DOWNLOADS` is off.
+    """
+    import nltk
+
+    path = NLTK_RESOURCES.get(name, name)
+    with _NLTK_LOCK:
+        try:
+            nltk.data.find(path)
+        except LookupError:
+            if not MODEL_DOWNLOADS:
+                raise ModelUnavailable(
+                    f"NLTK resource '{name}' is not installed and MODEL_DOWNLOADS=0; "
+                    f"install it with `python -m nltk.downloader {name}`"
+                )
+            print(f"⚠ NLTK resource '{name}' not found! Downloading now...")
+            nltk.download(name, quiet=True)
+
+
+@lru_cache(maxsize=None)
+def get_sia():
+    """Load the VADER sentiment analyzer once per process."""
+    ensure_nltk_resource("vader_lexicon")
+    from nltk.sentiment import SentimentIntensityAnalyzer
+
+    return SentimentIntensityAnalyzer()
+
+
+@lru_cache(maxsize=None)
+def get_stopwords() -> frozenset:
+    """Load the English stopword list once per process."""
+    ensure_nltk_resource("stopwords")
+    from nltk.corpus import stopwords
+
+    return frozenset(stopwords.words("english"))
+
+
+@lru_cache(maxsize=None)
+def get_word_tokenize():
+    """Return NLTK's `word_tokenize`, making sure the punkt tokenizer data is present."""
+    ensure_nltk_resource("punkt")
+    ensure_nltk_resource("punkt_tab")
+    from nltk.tokenize import word_tokenize
+
+    return word_tokenize
+
+
+@lru_cache(maxsize=None)
+def get_nlp():
+    """
+    Load the spaCy English pipeline once per process, installing it if necessary.
+
+    Raises:
+        ModelUnavailable: If the model is missing and `MODEL_DOWNLOADS` is off.
+    """
+    import spacy
+
+    try:
+        return spacy.load(SPACY_MODEL)
+    except OSError:
+        if not MODEL_DOWNLOADS:
+            raise ModelUnavailable(
+                f"spaCy model '{SPACY_MODEL}' is not installed and MODEL_DOWNLOADS=0; "
+                f"install it with `python -m spacy download {SPACY_MODEL}`"
+            )
+        print(" spaCy model not found! Downloading now...")
+        subprocess.run([sys.executable, "-m", "spacy", "download", SPACY_MODEL], check=True)
+        print(" Model downloaded! Loading now...")
+        return spacy.load(SPACY_MODEL)
+
+
+def warm_up() -> dict:
+    """
+    Load every model up front (e.g. when a worker starts) and report how long each took.
+
+    Returns:
+        dict: Seconds spent loading each resource, plus the total.
+    """
+    timings = {}
+    start = time.perf_counter()
+    for name, loader in (
+        ("vader", get_sia),
+        ("stopwords", get_stopwords),
+        ("punkt", get_word_tokenize),
+        ("spacy", get_nlp),
+    ):
+        t0 = time.perf_counter()
+        loader()
+        timings[name] = round(time.perf_counter() - t0, 4)
+    timings["total"] = round(time.perf_counter() - start, 4)
+    print(f"✅ Models warmed up in {timings['total']}s: {timings}")
+    return timings
+
+
+def measure_startup() -> dict:
+    """
+    Measure cold-start cost: importing the pipeline modules, then warming up all models.
+
+    Intended to be run in a fresh interpreter (`python model_loader.py`) so imports are not cached.
+
+    Returns:
+        dict: Import seconds per module and warm-up timings.
+    """
+    imports = {}
+    for module in ("sentiment_analysis", "news_extraction", "comparative_analysis", "tts_converter"):
+        t0 = time.perf_counter()
+        __import__(module)
+        imports[module] = round(time.perf_counter() - t0, 4)
+    return {"imports": imports, "warm_up": warm_up()}
+
+
+if __name__ == "__main__":
+    import json
+
+    print(json.dumps(measure_startup(), indent=2))
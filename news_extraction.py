@@ -1,61 +1,332 @@
+import os
+import threading
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import quote_plus
+
 import requests
 from bs4 import BeautifulSoup
-import nltk
+from requests.adapters import HTTPAdapter
+from article_store import canonical_url
+from deduplication import article_text, cluster_near_duplicates, fan_out
+from metrics import REGISTRY, stage, submit_in_context, timed
+from response_cache import MemoryBackend
+from sentiment_analysis import analyze_sentiment_batch
+from upstream import UpstreamUnavailable, classify, get_upstream
+from utils import parse_timestamp
+
+HEADERS = {"User-Agent": "Mozilla/5.0"}
+
+# Maximum number of pages fetched concurrently across all sources
+FETCH_MAX_WORKERS = 8
+
+# How long the last good copy of a page is kept to be served while its host is failing
+PAGE_FALLBACK_TTL = float(os.environ.get("PAGE_FALLBACK_TTL", 6 * 3600))
+_PAGE_FALLBACK = MemoryBackend(max_entries=256)
 
-nltk.download("vader_lexicon")
-from sentiment_analysis import analyze_sentiment
+_SESSION = None
+_SESSION_LOCK = threading.Lock()
 
 
-def fetch_news(company_name: str) -> list:
+def get_session() -> requests.Session:
+    """Return the process-wide HTTP session, reusing pooled keep-alive connections."""
+    global _SESSION
+    with _SESSION_LOCK:
+        if _SESSION is None:
+            session = requests.Session()
+            session.headers.update(HEADERS)
+            adapter = HTTPAdapter(pool_connections=16, pool_maxsize=FETCH_MAX_WORKERS * 2)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _SESSION = session
+        return _SESSION
+
+
+@timed("fetch")
+def http_fetch(url: str, timeout: float) -> str:
     """
-    Fetch top 10 news articles related to the given company from Bing News.
+    Download a page over the shared session, within the host's rate and concurrency limits.
+
+    Throttled and transient failures are retried with backoff. When the host keeps failing (or
+    its circuit is open), the last good copy of the page is served if one is cached.
 
     Args:
-        company_name (str): The name of the company to search news for.
+        url (str): Page URL.
+        timeout (float): Request timeout in seconds.
 
     Returns:
-        list: A list of dictionaries containing news details (title, summary, URL, timestamp, sentiment).
+        str: The response body.
     """
-    search_url = f"https://www.bing.com/news/search?q={company_name}"
-    headers = {"User-Agent": "Mozilla/5.0"}
+    def get():
+        response = get_session().get(url, timeout=timeout)
+        response.raise_for_status()  # Raise exception for HTTP errors
+        return response.text
 
+    upstream = get_upstream(url)
     try:
-        response = requests.get(search_url, headers=headers, timeout=10)
-        response.raise_for_status()  # Raise exception for HTTP errors
-    except requests.RequestException as e:
-        print(f"Error fetching news: {e}")
-        return []
-
-    soup = BeautifulSoup(response.text, "html.parser")
-    articles = []
-
-    for item in soup.select(".news-card")[:10]:  # Bing News uses .news-card for articles
-        title_tag = item.select_one("a.title")
-        description_tag = item.select_one(".snippet")
-        timestamp_tag = item.select_one(".source")
-
-        if not title_tag:
-            continue  # Skip if no valid title
-
-        title = title_tag.text.strip()
-        link = title_tag["href"]
-        description = description_tag.text.strip() if description_tag else "No description available"
-        timestamp = timestamp_tag.text.strip() if timestamp_tag else "No timestamp available"
-        sentiment = analyze_sentiment(description)  # Perform sentiment analysis
-
-        articles.append(
-            {
-                "title": title,
-                "summary": description,
-                "url": link,
-                "timestamp": timestamp,
-                "sentiment": sentiment,
-            }
-        )
+        text = upstream.call(get)
+    except Exception as e:
+        cached = _PAGE_FALLBACK.get(url)
+        # Only a client error (404, 410, ...) says the page itself is gone; an open circuit,
+        # exhausted retries or a network failure just mean the host is unhealthy
+        if cached is None or (isinstance(e, requests.HTTPError) and classify(e) == "error"):
+            raise
+        print(f"⚠ {upstream.host} is failing ({e}); serving the cached copy of {url}")
+        REGISTRY.inc("newsapp_upstream_fallbacks_total", host=upstream.label)
+        return cached[0]
+    _PAGE_FALLBACK.set(url, text, PAGE_FALLBACK_TTL)
+    return text
+
+
+class BingNewsSource:
+    """Bing News search results, paginated through the `first` query parameter."""
+
+    name = "bing"
+    page_size = 10
+    timeout = 10
+
+    def page_urls(self, company_name: str, pages: int) -> list:
+        """Return the search URLs for the first `pages` result pages."""
+        query = quote_plus(company_name)
+        return [
+            f"https://www.bing.com/news/search?q={query}" + (f"&first={page * self.page_size + 1}" if page else "")
+            for page in range(pages)
+        ]
+
+    def parse(self, html: str) -> list:
+        """Extract articles (title, summary, url, timestamp) from a Bing News results page."""
+        soup = BeautifulSoup(html, "html.parser")
+        articles = []
+
+        for item in soup.select(".news-card"):  # Bing News uses .news-card for articles
+            title_tag = item.select_one("a.title")
+            description_tag = item.select_one(".snippet")
+            timestamp_tag = item.select_one(".source")
 
+            if not title_tag or not title_tag.get("href"):
+                continue  # Skip if no valid title
+
+            articles.append(
+                {
+                    "title": title_tag.text.strip(),
+                    "summary": description_tag.text.strip() if description_tag else "No description available",
+                    "url": title_tag["href"],
+                    "timestamp": timestamp_tag.text.strip() if timestamp_tag else "No timestamp available",
+                }
+            )
+
+        return articles
+
+
+class GoogleNewsRssSource:
+    """Google News RSS search feed (a single page of results)."""
+
+    name = "google"
+    timeout = 10
+
+    def page_urls(self, company_name: str, pages: int) -> list:
+        """Return the feed URL; the RSS feed is not paginated."""
+        return [f"https://news.google.com/rss/search?q={quote_plus(company_name)}&hl=en-US&gl=US&ceid=US:en"]
+
+    def parse(self, xml_text: str) -> list:
+        """Extract articles (title, summary, url, timestamp) from an RSS document."""
+        try:
+            root = ET.fromstring(xml_text)
+        except ET.ParseError as e:
+            print(f"Error parsing RSS feed: {e}")
+            return []
+
+        articles = []
+        for item in root.iter("item"):
+            title = (item.findtext("title") or "").strip()
+            link = (item.findtext("link") or "").strip()
+            if not title or not link:
+                continue
+            description = BeautifulSoup(item.findtext("description") or "", "html.parser").get_text(" ").strip()
+            articles.append(
+                {
+                    "title": title,
+                    "summary": description or "No description available",
+                    "url": link,
+                    "timestamp": (item.findtext("pubDate") or "No timestamp available").strip(),
+                }
+            )
+        return articles
+
+
+# Registered news sources; add an object with `name`, `timeout`, `page_urls()` and `parse()` to extend
+NEWS_SOURCES = {source.name: source for source in (BingNewsSource(), GoogleNewsRssSource())}
+
+
+def _tag_articles(articles: list, source_name: str) -> list:
+    """Parse timestamps and tag the source of freshly scraped articles."""
+    for article in articles:
+        article["published_at"] = parse_timestamp(article["timestamp"])
+        article["source"] = source_name
     return articles
 
 
+def score_news(articles: list) -> list:
+    """
+    Attach sentiment labels and compound scores to articles in one batch.
 
+    Near-duplicate copies of a story are scored once and share the representative's sentiment.
 
+    Args:
+        articles (list): Articles with "title" and "summary".
 
+    Returns:
+        list: The same list, with "sentiment" and "sentiment_score" set.
+    """
+    if not articles:
+        return articles
+    labels = cluster_near_duplicates([article_text(article) for article in articles])
+    _score_articles([article for i, article in enumerate(articles) if labels[i] == i])
+    return fan_out(articles, labels, fields=("sentiment", "sentiment_score"))
+
+
+def _score_articles(articles: list) -> list:
+    """Attach sentiment labels and compound scores to a batch of articles."""
+    sentiments = analyze_sentiment_batch([article["summary"] for article in articles])
+    for article, label, score in zip(articles, sentiments.labels, sentiments.compound.tolist()):
+        article["sentiment"] = label
+        article["sentiment_score"] = round(score, 4)
+    return articles
+
+
+def iter_news(
+    company_name: str,
+    sources: tuple = ("bing",),
+    pages: int = 1,
+    limit: int = 10,
+    fetcher=None,
+    max_workers: int = FETCH_MAX_WORKERS,
+    store=None,
+    score: bool = True,
+    summarize: bool = None,
+):
+    """
+    Stream news articles about a company from several pages and sources concurrently.
+
+    Pages are downloaded in parallel over a pooled session; each page is parsed and scored
+    as soon as it arrives and its articles are yielded immediately. Articles with a URL that
+    was already yielded are skipped.
+
+    With a `store`, articles already stored for this company are yielded from the store
+    (with their saved sentiment, topics and audio) instead of being processed again, and new
+    articles are added to it.
+
+    Args:
+        company_name (str): The name of the company to search news for.
+        sources (tuple): Names of sources in `NEWS_SOURCES` (or source objects) to query.
+        pages (int): Number of result pages to request from each paginated source.
+        limit (int): Maximum number of articles to yield (None for no limit).
+        fetcher (callable): Optional `fetcher(url, timeout) -> str` used instead of HTTP,
+            e.g. to serve saved fixture pages.
+        max_workers (int): Maximum number of pages downloaded at once.
+        store (ArticleStore): Optional article store used to skip already-processed articles.
+        score (bool): Score new articles as they arrive. Pass False to score them later in one
+            larger batch with `score_news` (unscored articles are not added to the store).
+        summarize (bool): Replace each new article's listing snippet with an extractive summary
+            of its full body (defaults to `ARTICLE_FULL_SUMMARIES`). Article pages are fetched with
+            `fetcher` when one is given.
+
+    Yields:
+        dict: News details (title, summary, URL, timestamp, published_at, sentiment, sentiment_score, source).
+
+    Raises:
+        UpstreamUnavailable: If no page could be downloaded, so callers can tell an outage from
+            a company without news.
+    """
+    from summarization import ARTICLE_FULL_SUMMARIES, summarize_articles
+
+    summarize = ARTICLE_FULL_SUMMARIES if summarize is None else summarize
+    article_fetcher = fetcher
+    fetcher = fetcher or http_fetch
+    sources = [NEWS_SOURCES[source] if isinstance(source, str) else source for source in sources]
+    tasks = [(source, url) for source in sources for url in source.page_urls(company_name, pages)]
+    if not tasks or limit == 0:
+        return
+
+    seen_urls = set()
+    yielded = 0
+    errors = []
+    executor = ThreadPoolExecutor(max_workers=min(max_workers, len(tasks)), thread_name_prefix="fetch")
+    try:
+        futures = {submit_in_context(executor, fetcher, url, source.timeout): (source, url) for source, url in tasks}
+        for future in as_completed(futures):
+            source, url = futures[future]
+            try:
+                page = future.result()
+            except Exception as e:
+                print(f"Error fetching news from {source.name} ({url}): {e}")
+                errors.append(e)
+                continue
+
+            with stage("parse"):
+                parsed = source.parse(page)
+
+            articles = []
+            for article in parsed:
+                key = canonical_url(article["url"])
+                if key in seen_urls:
+                    continue
+                seen_urls.add(key)
+                articles.append(article)
+                if limit is not None and yielded + len(articles) >= limit:
+                    break
+
+            known = store.get_many(company_name, [article["url"] for article in articles]) if store else {}
+            fresh = _tag_articles([a for a in articles if canonical_url(a["url"]) not in known], source.name)
+            if summarize and fresh:
+                summarize_articles(fresh, fetcher=article_fetcher)
+            if score:
+                score_news(fresh)
+            if store and score and fresh:
+                store.add_articles(company_name, fresh)
+
+            for article in articles:
+                yield known.get(canonical_url(article["url"]), article)
+                yielded += 1
+            if limit is not None and yielded >= limit:
+                return
+        if len(errors) == len(tasks):
+            raise UpstreamUnavailable(
+                f"News sources are unavailable: {errors[-1]}", retry_after=getattr(errors[-1], "retry_after", None)
+            )
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def fetch_news(
+    company_name: str,
+    limit: int = 10,
+    pages: int = 1,
+    sources: tuple = ("bing",),
+    fetcher=None,
+    store=None,
+    summarize: bool = None,
+) -> list:
+    """
+    Fetch news articles related to the given company (top 10 from Bing News by default).
+
+    Args:
+        company_name (str): The name of the company to search news for.
+        limit (int): Maximum number of articles to return.
+        pages (int): Number of result pages to request from each source.
+        sources (tuple): Names of sources in `NEWS_SOURCES` to query.
+        fetcher (callable): Optional `fetcher(url, timeout) -> str` replacing HTTP downloads.
+        store (ArticleStore): Optional article store; only articles not stored yet are processed.
+        summarize (bool): Summarize full article bodies instead of keeping listing snippets
+            (defaults to `ARTICLE_FULL_SUMMARIES`).
+
+    Returns:
+        list: A list of dictionaries containing news details (title, summary, URL, timestamp, published_at,
+              sentiment, sentiment_score, source).
+
+    Raises:
+        UpstreamUnavailable: If no news page could be downloaded.
+    """
+    return list(
+        iter_news(company_name, sources=sources, pages=pages, limit=limit, fetcher=fetcher, store=store, summarize=summarize)
+    )
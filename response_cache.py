@@ -0,0 +1,225 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from metrics import count_cache
+
+# Fresh lifetime, extra window in which stale results are served while refreshing, and size bound
+RESPONSE_CACHE_TTL = float(os.environ.get("RESPONSE_CACHE_TTL", 300))
+RESPONSE_CACHE_STALE_TTL = float(os.environ.get("RESPONSE_CACHE_STALE_TTL", 900))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get("RESPONSE_CACHE_MAX_ENTRIES", 1024))
+RESPONSE_CACHE_REDIS_URL = os.environ.get("RESPONSE_CACHE_REDIS_URL")
+
+
+def normalize_company(company: str) -> str:
+    """Normalize a company name for use in cache keys ("  Tesla  Inc" -> "tesla inc")."""
+    return " ".join(company.split()).casefold()
+
+
+class MemoryBackend:
+    """In-process cache storage with LRU eviction once `max_entries` is reached."""
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        """Return `(value, stored_at)` for a key, or None if it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, stored_at, expires_at = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value, stored_at
+
+    def set(self, key: str, value, ttl: float) -> None:
+        """Store a value that the backend may drop after `ttl` seconds."""
+        now = time.time()
+        with self._lock:
+            self._entries[key] = (value, now, now + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        """Remove a key if present."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class RedisBackend:
+    """
+    Cache storage on a Redis-compatible server, shared by every worker process.
+
+    Values are stored as JSON, so they must be JSON-serializable.
+    """
+
+    def __init__(self, client, prefix: str = "newsapp:"):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key: str):
+        """Return `(value, stored_at)` for a key, or None if it is missing."""
+        payload = self.client.get(self.prefix + key)
+        if payload is None:
+            return None
+        entry = json.loads(payload)
+        return entry["value"], entry["stored_at"]
+
+    def set(self, key: str, value, ttl: float) -> None:
+        """Store a value that expires on the server after `ttl` seconds."""
+        payload = json.dumps({"value": value, "stored_at": time.time()})
+        self.client.set(self.prefix + key, payload, ex=max(int(ttl), 1))
+
+    def delete(self, key: str) -> None:
+        """Remove a key if present."""
+        self.client.delete(self.prefix + key)
+
+
+class ResponseCache:
+    """
+    TTL cache with single-flight request coalescing and stale-while-revalidate.
+
+    Concurrent misses for the same key share one in-flight computation. Once a result is older
+    than `ttl` but younger than `ttl + stale_ttl`, it is still returned immediately while a
+    single background refresh recomputes it.
+    """
+
+    def __init__(self, backend=None, ttl: float = RESPONSE_CACHE_TTL, stale_ttl: float = RESPONSE_CACHE_STALE_TTL):
+        self.backend = backend if backend is not None else MemoryBackend()
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._inflight = {}  # key -> Future of the running computation
+        self._lock = threading.Lock()
+        self._refresher = ThreadPoolExecutor(max_workers=4, thread_name_prefix="cache-refresh")
+
+    def get_or_compute(self, key: str, compute, should_cache=bool):
+        """
+        Return the cached value for `key`, computing it with `compute()` when needed.
+
+        Args:
+            key (str): Cache key.
+            compute (callable): Zero-argument function producing the value.
+            should_cache (callable): Predicate deciding whether a computed value is stored
+                (by default empty results are not cached).
+
+        Returns:
+            The cached or freshly computed value.
+        """
+        entry = self.backend.get(key)
+        if entry is not None:
+            value, stored_at = entry
+            age = time.time() - stored_at
+            if age < self.ttl:
+                with self._lock:
+                    self.hits += 1
+                count_cache("response", "hit")
+                return value
+            if age < self.ttl + self.stale_ttl:
+                with self._lock:
+                    self.stale_hits += 1
+                count_cache("response", "stale")
+                self._refresh_in_background(key, compute, should_cache)
+                return value
+
+        future, owner = self._join_or_start(key)
+        count_cache("response", "miss" if owner else "coalesced")
+        if not owner:
+            return future.result()
+        return self._run(key, compute, should_cache, future)
+
+    def _join_or_start(self, key: str):
+        """Return the in-flight Future for `key` and whether the caller must compute it."""
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = Future()
+            self._inflight[key] = future
+            self.misses += 1
+            return future, True
+
+    def _run(self, key: str, compute, should_cache, future: Future):
+        """Compute a value as the single flight for `key`, publishing it to any waiters."""
+        try:
+            value = compute()
+            if should_cache(value):
+                self.backend.set(key, value, self.ttl + self.stale_ttl)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _refresh_in_background(self, key: str, compute, should_cache) -> None:
+        """Start one background recomputation of a stale entry unless one is already running."""
+        with self._lock:
+            if key in self._inflight:
+                return
+            future = Future()
+            self._inflight[key] = future
+
+        def refresh():
+            try:
+                self._run(key, compute, should_cache, future)
+            except Exception as e:
+                print(f"Error refreshing cached response '{key}': {e}")
+
+        self._refresher.submit(refresh)
+
+    def invalidate(self, key: str) -> None:
+        """Drop a cached entry."""
+        self.backend.delete(key)
+
+    def stats(self) -> dict:
+        """
+        Report cache counters.
+
+        Returns:
+            dict: Fresh hits, stale hits, misses and coalesced (joined in-flight) requests.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "inflight": len(self._inflight),
+            }
+
+
+def create_backend():
+    """
+    Build the configured cache backend: Redis when `RESPONSE_CACHE_REDIS_URL` is set, else in-process.
+
+    Raises:
+        ImportError: If `RESPONSE_CACHE_REDIS_URL` is set but the optional redis package is missing.
+    """
+    if RESPONSE_CACHE_REDIS_URL:
+        try:
+            import redis
+        except ImportError as e:
+            raise ImportError(
+                "RESPONSE_CACHE_REDIS_URL is set but the redis package is not installed; "
+                "install it with `pip install redis` or unset RESPONSE_CACHE_REDIS_URL"
+            ) from e
+
+        return RedisBackend(redis.Redis.from_url(RESPONSE_CACHE_REDIS_URL))
+    return MemoryBackend()
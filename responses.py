@@ -0,0 +1,205 @@
+import base64
+import gzip
+import hashlib
+import json
+
+import numpy as np
+from flask import Response, request
+
+from metrics import stage
+
+try:
+    import orjson
+except ImportError:  # Optional: the standard library encoder is used instead
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # Optional: only gzip is offered without it
+    brotli = None
+
+# Bodies smaller than this are sent uncompressed; compression would cost more than it saves
+COMPRESS_MIN_BYTES = 1024
+GZIP_LEVEL = 5
+BROTLI_QUALITY = 5
+
+# Largest page a client may request from a paginated list
+MAX_PAGE_SIZE = 200
+
+
+class CursorError(ValueError):
+    """
+    Raised for a malformed pagination cursor (status 400), or one issued for a result that has
+    since changed (status 410).
+    """
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+
+def _json_default(value):
+    """Encode numpy values the standard library encoder doesn't know."""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(data) -> bytes:
+    """
+    Serialize a response body to compact UTF-8 JSON, with orjson when it is installed.
+
+    Args:
+        data: JSON-compatible data (numpy scalars and arrays are allowed).
+
+    Returns:
+        bytes: The encoded document.
+    """
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False, default=_json_default).encode("utf-8")
+
+
+def _version(items: list) -> str:
+    """Short content hash identifying one version of a paginated list."""
+    return hashlib.sha1(dumps(items)).hexdigest()[:16]
+
+
+def encode_cursor(offset: int, version: str) -> str:
+    """Opaque cursor pointing at `offset` within one version of a list."""
+    return base64.urlsafe_b64encode(f"{offset}:{version}".encode("ascii")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, version: str) -> int:
+    """
+    Return the offset a cursor points at.
+
+    Raises:
+        CursorError: If the cursor is malformed or belongs to a different version of the list.
+    """
+    try:
+        offset, cursor_version = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("ascii").split(":")
+        offset = int(offset)
+    except (ValueError, UnicodeDecodeError):
+        raise CursorError("Malformed cursor")
+    if cursor_version != version or offset < 0:
+        raise CursorError("Cursor has expired; the results changed, start again without a cursor", status=410)
+    return offset
+
+
+def paginate(items: list, cursor: str = None, page_size: int = None) -> tuple:
+    """
+    Cut one page out of a list.
+
+    Args:
+        items (list): The full list.
+        cursor (str): Cursor from a previous page (None for the first page).
+        page_size (int): Items per page.
+
+    Returns:
+        tuple: (page items, {"total", "next_cursor"}) where next_cursor is None on the last page.
+
+    Raises:
+        CursorError: If the cursor is invalid for this list.
+    """
+    version = _version(items)
+    offset = decode_cursor(cursor, version) if cursor else 0
+    end = offset + page_size
+    next_cursor = encode_cursor(end, version) if end < len(items) else None
+    return items[offset:end], {"total": len(items), "next_cursor": next_cursor}
+
+
+def page_options(*cursor_params: str) -> tuple:
+    """
+    Parse `page_size` and the given cursor query parameters.
+
+    Returns:
+        tuple: (page size, or None when pagination wasn't requested; {param: cursor or None}).
+
+    Raises:
+        ValueError: If `page_size` is not an integer in range.
+    """
+    page_size = request.args.get("page_size")
+    if page_size is None:
+        return None, {}
+    try:
+        page_size = int(page_size)
+    except ValueError:
+        raise ValueError("page_size must be an integer") from None
+    if not 0 < page_size <= MAX_PAGE_SIZE:
+        raise ValueError(f"page_size must be between 1 and {MAX_PAGE_SIZE}")
+    return page_size, {param: request.args.get(param) for param in cursor_params}
+
+
+def select_fields(data: dict, fields: str) -> dict:
+    """
+    Keep only the requested sections of a response.
+
+    Args:
+        data (dict): Response body.
+        fields (str): Comma-separated top-level keys; "section.key" keeps one key of a nested section.
+
+    Returns:
+        dict: A new dictionary holding the selected sections (unknown names are ignored).
+    """
+    selected = {}
+    for field in (name.strip() for name in fields.split(",")):
+        section, _, key = field.partition(".")
+        if section not in data:
+            continue
+        if key and isinstance(data[section], dict):
+            if key in data[section]:
+                selected.setdefault(section, {})[key] = data[section][key]
+        else:
+            selected[section] = data[section]
+    return selected
+
+
+def _negotiate_encoding():
+    """Pick the best content encoding the client accepts ("br", "gzip" or None)."""
+    accepted = request.accept_encodings
+    br, gz = accepted.quality("br"), accepted.quality("gzip")
+    if brotli is not None and br > 0 and br >= gz:
+        return "br"
+    if gz > 0:
+        return "gzip"
+    return None
+
+
+def json_response(data, status: int = 200, headers: dict = None) -> Response:
+    """
+    Build a JSON response with ETag revalidation and negotiated compression.
+
+    A request whose If-None-Match matches the body's ETag gets an empty 304. Bodies of at
+    least `COMPRESS_MIN_BYTES` are brotli- or gzip-compressed per the Accept-Encoding header.
+
+    Args:
+        data: Response body.
+        status (int): HTTP status for a full response.
+        headers (dict): Extra response headers.
+
+    Returns:
+        Response: The Flask response.
+    """
+    with stage("serialize"):
+        body = dumps(data)
+    etag = hashlib.sha1(body).hexdigest()
+
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304, headers=headers)
+    else:
+        encoding = _negotiate_encoding() if len(body) >= COMPRESS_MIN_BYTES else None
+        with stage("compress"):
+            if encoding == "br":
+                body = brotli.compress(body, quality=BROTLI_QUALITY)
+            elif encoding == "gzip":
+                body = gzip.compress(body, compresslevel=GZIP_LEVEL)
+        response = Response(body, status=status, mimetype="application/json", headers=headers)
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+
+    response.set_etag(etag, weak=True)  # Weak: the same content may be sent with different encodings
+    response.vary.add("Accept-Encoding")
+    return response
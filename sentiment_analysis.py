@@ -1,11 +1,53 @@
-import nltk
-from nltk.sentiment import SentimentIntensityAnalyzer
+from functools import lru_cache
+from typing import NamedTuple
 
-# Ensure VADER is available
-nltk.download("vader_lexicon")
+import numpy as np
 
-# Initialize Sentiment Analyzer once to avoid redundant reloading
-SIA = SentimentIntensityAnalyzer()
+from metrics import timed
+from model_loader import get_sia
+
+# Column order of the score matrix returned by `analyze_sentiment_batch`
+SCORE_FIELDS = ("compound", "pos", "neg", "neu")
+SENTIMENT_LABELS = np.array(["Negative", "Neutral", "Positive"])
+
+
+class SentimentBatch(NamedTuple):
+    """
+    Sentiment results for a batch of texts.
+
+    Attributes:
+        scores (np.ndarray): float32 array of shape (n, 4) with columns in `SCORE_FIELDS` order.
+        labels (list): "Positive", "Negative" or "Neutral" for each text.
+    """
+
+    scores: np.ndarray
+    labels: list
+
+    @property
+    def compound(self) -> np.ndarray:
+        """Compound scores as a 1-D array."""
+        return self.scores[:, 0]
+
+
+@lru_cache(maxsize=65536)
+def _polarity_scores(text: str) -> tuple:
+    """Memoized VADER scores for a text, in `SCORE_FIELDS` order."""
+    scores = get_sia().polarity_scores(text)  # VADER is loaded once, on first use
+    return tuple(scores[field] for field in SCORE_FIELDS)
+
+
+def label_sentiments(compound: np.ndarray) -> np.ndarray:
+    """
+    Map compound scores to sentiment labels using the standard VADER thresholds.
+
+    Args:
+        compound (np.ndarray): Compound scores.
+
+    Returns:
+        np.ndarray: Array of "Positive", "Negative" or "Neutral" labels.
+    """
+    codes = (compound >= 0.05).astype(np.int8) - (compound <= -0.05).astype(np.int8) + 1
+    return SENTIMENT_LABELS[codes]
 
 
 def analyze_sentiment(text: str) -> str:
@@ -21,10 +63,34 @@ def analyze_sentiment(text: str) -> str:
     if not text:  # If empty text, return "Neutral"
         return "Neutral"
 
-    score = SIA.polarity_scores(text)["compound"]
+    score = _polarity_scores(text)[0]
 
     if score >= 0.05:
         return "Positive"
     elif score <= -0.05:
         return "Negative"
     return "Neutral"
+
+
+@timed("sentiment")
+def analyze_sentiment_batch(texts: list) -> SentimentBatch:
+    """
+    Analyze the sentiment of many texts at once using VADER.
+
+    Scores are memoized per text, so repeated headlines are only scored once per process.
+
+    Args:
+        texts (list): The texts to analyze.
+
+    Returns:
+        SentimentBatch: Score matrix (compound/pos/neg/neu) and labels in input order.
+            Empty texts score as neutral.
+    """
+    scores = np.zeros((len(texts), len(SCORE_FIELDS)), dtype=np.float32)
+    scores[:, 3] = 1.0  # Empty texts are fully neutral
+    for i, text in enumerate(texts):
+        if text:
+            scores[i] = _polarity_scores(text)
+
+    labels = label_sentiments(scores[:, 0]).tolist()
+    return SentimentBatch(scores=scores, labels=labels)
@@ -0,0 +1,316 @@
+import hashlib
+import ipaddress
+import os
+import socket
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import urljoin, urlsplit, urlunsplit
+
+import numpy as np
+import requests
+from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+
+from metrics import count_cache, submit_in_context, timed
+from response_cache import MemoryBackend
+from upstream import get_upstream
+from utils import split_sentences
+
+# Batches at least this large are split across a process pool
+SUMMARY_PROCESS_THRESHOLD = int(os.environ.get("SUMMARY_PROCESS_THRESHOLD", 200))
+SUMMARY_CHUNK_SIZE = int(os.environ.get("SUMMARY_CHUNK_SIZE", 100))
+SUMMARY_CACHE_TTL = float(os.environ.get("SUMMARY_CACHE_TTL", 24 * 3600))
+
+# Replace listing snippets with summaries of the full article body when fetching news (one extra
+# request per article, so off unless enabled)
+ARTICLE_FULL_SUMMARIES = os.environ.get("ARTICLE_FULL_SUMMARIES", "0") not in ("0", "false", "False")
+
+# Small bonus for early sentences, since news articles front-load their key facts
+POSITION_WEIGHT = 0.1
+
+_MIN_PARAGRAPH_CHARS = 40
+_MAX_REDIRECTS = 5
+
+_SUMMARY_CACHE = MemoryBackend(max_entries=4096)
+
+_PROCESS_POOL = None
+_PROCESS_POOL_LOCK = threading.Lock()
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    """Create the shared summarization process pool on first use."""
+    global _PROCESS_POOL
+    with _PROCESS_POOL_LOCK:
+        if _PROCESS_POOL is None:
+            _PROCESS_POOL = ProcessPoolExecutor()
+        return _PROCESS_POOL
+
+
+def _summarize_chunk(texts: list, num_sentences: int) -> list:
+    """
+    Score every sentence of every text in one vectorized pass and keep the best per text.
+
+    Each sentence is scored by its cosine similarity to its article's TF-IDF centroid (plus a
+    small lead bonus); the selected sentences are returned in their original order.
+    """
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.preprocessing import normalize
+    from scipy.sparse import csr_matrix
+
+    documents = [split_sentences(text or "") for text in texts]
+    summaries = [" ".join(sentences) for sentences in documents]
+
+    # Only articles longer than the summary need scoring
+    long_docs = [i for i, sentences in enumerate(documents) if len(sentences) > num_sentences]
+    if not long_docs:
+        return summaries
+
+    sentences = [sentence for i in long_docs for sentence in documents[i]]
+    doc_ids = np.repeat(np.arange(len(long_docs)), [len(documents[i]) for i in long_docs])
+    positions = np.concatenate([np.arange(len(documents[i])) for i in long_docs])
+    offsets = np.concatenate(([0], np.cumsum([len(documents[i]) for i in long_docs])))
+
+    try:
+        vectors = TfidfVectorizer(stop_words="english", sublinear_tf=True).fit_transform(sentences).tocsr()
+    except ValueError:
+        # No usable vocabulary: fall back to the lead sentences
+        for i in long_docs:
+            summaries[i] = " ".join(documents[i][:num_sentences])
+        return summaries
+
+    # Article centroids via a sparse (documents x sentences) membership matrix
+    membership = csr_matrix(
+        (np.ones(len(sentences)), (doc_ids, np.arange(len(sentences)))), shape=(len(long_docs), len(sentences))
+    )
+    centroids = normalize(membership @ vectors)
+    scores = np.asarray(vectors.multiply(centroids[doc_ids]).sum(axis=1)).ravel()
+    scores += POSITION_WEIGHT / (1.0 + positions)
+
+    for n, i in enumerate(long_docs):
+        start, end = offsets[n], offsets[n + 1]
+        best = np.sort(np.argsort(-scores[start:end], kind="stable")[:num_sentences])
+        summaries[i] = " ".join(documents[i][k] for k in best)
+    return summaries
+
+
+@timed("summarize")
+def summarize_texts(texts: list, num_sentences: int = 3) -> list:
+    """
+    Produce extractive summaries for a batch of texts.
+
+    Large batches are split into chunks summarized on a process pool; smaller ones run inline.
+
+    Args:
+        texts (list): Article texts.
+        num_sentences (int): Maximum number of sentences per summary.
+
+    Returns:
+        list: Summaries in input order.
+    """
+    if len(texts) < SUMMARY_PROCESS_THRESHOLD:
+        return _summarize_chunk(texts, num_sentences)
+
+    chunks = [texts[i : i + SUMMARY_CHUNK_SIZE] for i in range(0, len(texts), SUMMARY_CHUNK_SIZE)]
+    results = _get_process_pool().map(_summarize_chunk, chunks, [num_sentences] * len(chunks))
+    return [summary for chunk in results for summary in chunk]
+
+
+def _cache_key(url: str, text: str, num_sentences: int) -> str:
+    """Cache key from the article URL and a hash of its content."""
+    digest = hashlib.sha1(text.encode("utf-8")).hexdigest()
+    return f"summary:{num_sentences}:{url}:{digest}"
+
+
+def summarize_cached(texts: list, urls: list = None, num_sentences: int = 3) -> list:
+    """
+    Summarize texts, reusing earlier summaries of the same URL and content.
+
+    Args:
+        texts (list): Article texts.
+        urls (list): Article URLs aligned with `texts` (optional).
+        num_sentences (int): Maximum number of sentences per summary.
+
+    Returns:
+        list: Summaries in input order.
+    """
+    urls = urls or [""] * len(texts)
+    keys = [_cache_key(url, text or "", num_sentences) for url, text in zip(urls, texts)]
+    summaries = []
+    for key in keys:
+        entry = _SUMMARY_CACHE.get(key)
+        summaries.append(entry[0] if entry else None)
+
+    missing = [i for i, summary in enumerate(summaries) if summary is None]
+    count_cache("summary", "hit", len(summaries) - len(missing))
+    count_cache("summary", "miss", len(missing))
+    if missing:
+        for i, summary in zip(missing, summarize_texts([texts[i] for i in missing], num_sentences)):
+            summaries[i] = summary
+            _SUMMARY_CACHE.set(keys[i], summary, SUMMARY_CACHE_TTL)
+    return summaries
+
+
+def check_public_url(url: str) -> str:
+    """
+    Refuse URLs that could reach internal services: only http(s) to hosts resolving to public addresses.
+
+    Args:
+        url (str): URL about to be fetched.
+
+    Returns:
+        str: A vetted IP address of the host. Connect to this address rather than resolving the
+            host again, so DNS rebinding can't swap in an internal address after the check.
+
+    Raises:
+        ValueError: If the scheme is not http/https, or the host is missing, doesn't resolve, or
+            resolves to a private, loopback, link-local or otherwise reserved address.
+    """
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise ValueError(f"Only http(s) URLs can be fetched: {url}")
+    try:
+        addresses = {info[4][0] for info in socket.getaddrinfo(parts.hostname, parts.port or None, proto=socket.IPPROTO_TCP)}
+    except (socket.gaierror, UnicodeError):
+        raise ValueError(f"Cannot resolve host {parts.hostname}")
+    for address in addresses:
+        ip = ipaddress.ip_address(address.split("%")[0])
+        if not ip.is_global or ip.is_multicast:
+            raise ValueError(f"Refusing to fetch {parts.hostname}: it resolves to a non-public address")
+    return sorted(addresses)[0]
+
+
+class _PinnedAdapter(HTTPAdapter):
+    """
+    Transport adapter that connects to one vetted IP address while keeping the URL's host name
+    for the Host header, TLS SNI and certificate verification.
+    """
+
+    def __init__(self, hostname: str, address: str, **kwargs):
+        self.hostname = hostname
+        self.address = address
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        # Dropped again by urllib3 for plain-http pools
+        kwargs["server_hostname"] = self.hostname
+        kwargs["assert_hostname"] = self.hostname
+        super().init_poolmanager(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        parts = urlsplit(request.url)
+        host = f"[{self.address}]" if ":" in self.address else self.address
+        request.headers["Host"] = f"{parts.hostname}:{parts.port}" if parts.port else parts.hostname
+        request.url = urlunsplit(parts._replace(netloc=f"{host}:{parts.port}" if parts.port else host))
+        return super().send(request, **kwargs)
+
+
+def _pinned_session(url: str, address: str) -> requests.Session:
+    """A session whose connections for `url` go straight to `address` (no proxies, no re-resolution)."""
+    from news_extraction import HEADERS
+
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    session.trust_env = False
+    adapter = _PinnedAdapter(urlsplit(url).hostname, address)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+@timed("article_fetch")
+def _download_article(url: str, timeout: float) -> str:
+    """Download an article page within its host's limits, checking and pinning every redirect target."""
+    for _ in range(_MAX_REDIRECTS + 1):
+        address = check_public_url(url)
+
+        def get():
+            with _pinned_session(url, address) as session:
+                response = session.get(url, timeout=timeout, allow_redirects=False)
+            response.raise_for_status()  # Raise exception for HTTP errors
+            return response
+
+        response = get_upstream(url, track=False).call(get)
+        if not response.is_redirect:
+            return response.text
+        url = urljoin(url, response.headers["Location"])
+    raise ValueError(f"Too many redirects for {url}")
+
+
+def fetch_article_text(url: str, timeout: float = 10, fetcher=None) -> str:
+    """
+    Download an article and extract its body text.
+
+    Only public http(s) addresses are fetched (see `check_public_url`), so client-supplied URLs
+    can't be used to reach internal services.
+
+    Args:
+        url (str): Article URL.
+        timeout (float): Request timeout in seconds.
+        fetcher (callable): Optional `fetcher(url, timeout) -> str` used instead of HTTP.
+
+    Returns:
+        str: Paragraph text of the article (empty if nothing usable was found).
+
+    Raises:
+        ValueError: If the URL is not allowed.
+    """
+    page = fetcher(url, timeout) if fetcher else _download_article(url, timeout)
+    soup = BeautifulSoup(page, "html.parser")
+    for tag in soup(["script", "style", "nav", "header", "footer", "aside"]):
+        tag.decompose()
+    container = soup.find("article") or soup.body or soup
+    paragraphs = [p.get_text(" ", strip=True) for p in container.find_all("p")]
+    return "\n".join(p for p in paragraphs if len(p) >= _MIN_PARAGRAPH_CHARS)
+
+
+def summarize_urls(urls: list, num_sentences: int = 3, max_workers: int = 8, fetcher=None) -> list:
+    """
+    Fetch article bodies concurrently and summarize them as one batch.
+
+    Args:
+        urls (list): Article URLs.
+        num_sentences (int): Maximum number of sentences per summary.
+        max_workers (int): Maximum number of concurrent downloads.
+        fetcher (callable): Optional `fetcher(url, timeout) -> str` used instead of HTTP.
+
+    Returns:
+        list: One dict per URL with "url" and "summary" (None plus "error" if the fetch failed).
+    """
+    def fetch(url):
+        try:
+            return fetch_article_text(url, fetcher=fetcher), None
+        except Exception as e:
+            return None, str(e)
+
+    if not urls:
+        return []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(urls)), thread_name_prefix="article") as pool:
+        fetched = [future.result() for future in [submit_in_context(pool, fetch, url) for url in urls]]
+
+    ok = [i for i, (text, _) in enumerate(fetched) if text]
+    summaries = summarize_cached([fetched[i][0] for i in ok], [urls[i] for i in ok], num_sentences)
+
+    results = [{"url": url, "summary": None, "error": error or "No article text found"} for url, (_, error) in zip(urls, fetched)]
+    for i, summary in zip(ok, summaries):
+        results[i] = {"url": urls[i], "summary": summary}
+    return results
+
+
+def summarize_articles(articles: list, num_sentences: int = 3, fetcher=None) -> list:
+    """
+    Replace the listing snippet in each article's "summary" with a summary of its full body.
+
+    Articles whose page can't be fetched or has no usable text keep their snippet.
+
+    Args:
+        articles (list): Articles with "url" and "summary".
+        num_sentences (int): Maximum number of sentences per summary.
+        fetcher (callable): Optional `fetcher(url, timeout) -> str` used instead of HTTP.
+
+    Returns:
+        list: The same list, updated in place.
+    """
+    for article, result in zip(articles, summarize_urls([article["url"] for article in articles], num_sentences, fetcher=fetcher)):
+        if result["summary"]:
+            article["summary"] = result["summary"]
+    return articles
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# The application modules live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep the article store in memory so tests never write articles.db
+os.environ.setdefault("ARTICLE_STORE_PATH", ":memory:")
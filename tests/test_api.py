@@ -0,0 +1,201 @@
+import json
+
+import pytest
+
+import api
+from test_watchlist import INVALID_ENTRIES
+
+
+@pytest.fixture
+def client():
+    return api.app.test_client()
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        {"texts": [1, 2]},
+        {"texts": ["ok", None]},
+        {"text": 5},
+        {"texts": ["x"] * (api.MAX_ARTICLES + 1)},
+    ],
+)
+def test_tts_job_rejects_invalid_texts(client, body, monkeypatch):
+    monkeypatch.setattr(api, "_submit_job", lambda *args: pytest.fail("job was queued"))
+
+    response = client.post("/jobs/convert_text_to_speech", json=body)
+
+    assert response.status_code == 400
+    assert "error" in response.get_json()
+
+
+def test_tts_job_accepts_a_list_of_strings(client, monkeypatch):
+    submitted = []
+    monkeypatch.setattr(api, "_submit_job", lambda kind, fn, texts: submitted.append(texts) or ("", 202))
+
+    assert client.post("/jobs/convert_text_to_speech", json={"texts": ["a", "b"]}).status_code == 202
+    assert client.post("/jobs/convert_text_to_speech", json={"text": "c"}).status_code == 202
+    assert submitted == [["a", "b"], ["c"]]
+
+
+@pytest.mark.parametrize("path", ["/convert_text_to_speech", "/convert_text_to_speech/stream"])
+@pytest.mark.parametrize("text", [5, None, ["a"]])
+def test_tts_rejects_non_string_text(client, path, text, monkeypatch):
+    monkeypatch.setattr(api, "text_to_speech_hindi", lambda text: pytest.fail("text was converted"))
+    monkeypatch.setattr(api, "iter_speech_hindi", lambda text: pytest.fail("text was converted"))
+
+    response = client.post(path, json={"text": text})
+
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "text must be a string"}
+
+
+def _story(slug, title):
+    return {
+        "title": title,
+        "summary": f"{title}. Details follow in the full report.",
+        "url": f"https://news.example.com/{slug}",
+        "timestamp": "2025-03-01",
+        "published_at": "2025-03-01T09:00:00+00:00",
+        "source": "bing",
+    }
+
+
+FEEDS = {
+    "Tesla": [_story("tesla-factory", "Tesla opens battery factory"), _story("ev-tariffs", "EV makers face new tariffs")],
+    "Ford": [_story("ev-tariffs?utm_source=rss", "EV makers face new tariffs"), _story("ford-recall", "Ford recalls pickup trucks")],
+}
+
+
+@pytest.fixture
+def batch_pipeline(monkeypatch):
+    """Serve FEEDS offline with a fresh article store; returns the URLs passed to score_news, per call."""
+    from article_store import ArticleStore
+
+    store = ArticleStore(":memory:")
+    scored = []
+
+    def score_news(articles):
+        scored.append([article["url"] for article in articles])
+        for article in articles:
+            negative = "recall" in article["url"]
+            article["sentiment"], article["sentiment_score"] = ("Negative", -0.4) if negative else ("Positive", 0.5)
+        return articles
+
+    def annotate_topics(articles):
+        for article in articles:
+            article.setdefault("topics", ["EV"])
+        return articles
+
+    monkeypatch.setattr(api, "get_article_store", lambda: store)
+    monkeypatch.setattr(api, "iter_news", lambda company, score, **options: iter([dict(a) for a in FEEDS[company]]))
+    monkeypatch.setattr(api, "score_news", score_news)
+    monkeypatch.setattr(api, "annotate_topics", annotate_topics)
+    yield scored
+    store.close()
+
+
+def test_shared_article_is_scored_once_across_companies(batch_pipeline):
+    fetched = {company: [dict(a) for a in articles] for company, articles in FEEDS.items()}
+
+    prepared = api._prepare_companies(fetched, {})
+
+    assert len(batch_pipeline) == 1
+    assert sorted(batch_pipeline[0]) == sorted(
+        ["https://news.example.com/tesla-factory", "https://news.example.com/ev-tariffs", "https://news.example.com/ford-recall"]
+    )
+    assert prepared["Tesla"][1] is prepared["Ford"][0]  # One shared, scored article
+
+
+def test_batch_stream_yields_one_line_per_company(batch_pipeline, client):
+    response = client.post("/analyze_batch?stream=1", json={"companies": ["Tesla", "Ford", "tesla "]})
+
+    assert response.mimetype == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert sorted(line["company"] for line in lines[:-1]) == ["Ford", "Tesla"]
+    assert all("result" in line for line in lines[:-1])
+    assert lines[-1]["comparison"]["shared_articles"] == [[2, 1], [1, 2]]
+
+    scored = [url for call in batch_pipeline for url in call]
+    assert len(scored) == len(set(scored)) == 3
+
+
+def test_analyze_fields_keep_the_documented_sections(batch_pipeline, client, monkeypatch):
+    from response_cache import ResponseCache
+
+    articles = api.score_news([dict(a) for a in FEEDS["Tesla"] + FEEDS["Ford"][1:]])
+    monkeypatch.setattr(api, "RESPONSE_CACHE", ResponseCache())
+    monkeypatch.setattr(api, "fetch_news", lambda company, store, **options: articles)
+
+    # The example from the README's "Response format" section
+    fields = "sentiment_distribution,analysis_summary.Coverage Differences"
+    response = client.get("/analyze", query_string={"company": "Tesla", "fields": fields})
+
+    body = response.get_json()
+    assert response.status_code == 200
+    assert set(body) == {"sentiment_distribution", "analysis_summary"}
+    assert list(body["analysis_summary"]) == ["Coverage Differences"]
+    assert body["analysis_summary"]["Coverage Differences"]
+
+
+@pytest.mark.parametrize("entry", INVALID_ENTRIES)
+def test_watchlist_rejects_invalid_entries(client, entry, monkeypatch):
+    monkeypatch.setattr(api, "WATCHLIST", None)  # Any use of the watchlist would fail
+
+    response = client.post("/watchlist", json={"companies": ["Tesla", entry]})
+
+    assert response.status_code == 400
+    assert "error" in response.get_json()
+
+
+def test_watchlist_accepts_valid_entries(client, monkeypatch):
+    from article_store import ArticleStore
+    from watchlist import Watchlist
+
+    watchlist = Watchlist(store=ArticleStore(":memory:"), sinks=[])
+    monkeypatch.setattr(watchlist, "start", lambda: None)
+    monkeypatch.setattr(api, "WATCHLIST", watchlist)
+
+    ford = {"company": "Ford", "priority": 3, "sources": ["bing", "google"]}
+    response = client.post("/watchlist", json={"companies": ["Tesla", ford]})
+
+    assert response.status_code == 200
+    assert [(c["company"], c["priority"], c["sources"]) for c in response.get_json()["companies"]] == [
+        ("Tesla", 1, ["bing"]),
+        ("Ford", 3, ["bing", "google"]),
+    ]
+
+
+@pytest.mark.parametrize("num_sentences", [0, api.MAX_SUMMARY_SENTENCES + 1, "many"])
+def test_summarize_rejects_out_of_range_num_sentences(client, num_sentences):
+    response = client.post("/summarize", json={"text": "One. Two.", "num_sentences": num_sentences})
+
+    assert response.status_code == 400
+
+
+def test_summarize_fetches_short_url_lists_in_the_request(client, monkeypatch):
+    monkeypatch.setattr(api, "summarize_urls", lambda urls, n: [{"url": url, "summary": f"{n} sentences"} for url in urls])
+    urls = [f"https://news.example.com/{i}" for i in range(api.MAX_SYNC_SUMMARY_URLS)]
+
+    response = client.post("/summarize", json={"urls": urls, "num_sentences": 2})
+
+    assert response.status_code == 200
+    assert response.headers["ETag"]
+    assert [result["url"] for result in response.get_json()["results"]] == urls
+
+
+def test_summarize_queues_long_url_lists_as_a_job(client, monkeypatch):
+    queued = []
+    monkeypatch.setattr(api, "summarize_urls", lambda urls, n: pytest.fail("fetched in the request"))
+    monkeypatch.setattr(api, "_submit_job", lambda kind, fn, *args: queued.append((kind, args)) or ("", 202))
+    urls = [f"https://news.example.com/{i}" for i in range(api.MAX_SYNC_SUMMARY_URLS + 1)]
+
+    assert client.post("/summarize", json={"urls": urls}).status_code == 202
+    assert queued == [("summarize", (urls, 3))]
+
+
+def test_non_integer_page_size_is_a_400(client):
+    response = client.get("/fetch_news", query_string={"company": "Tesla", "page_size": "abc"})
+
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "page_size must be an integer"}
@@ -0,0 +1,81 @@
+
+import pytest
+
+from article_store import ArticleStore, canonical_url
+
+
+@pytest.fixture
+def store():
+    store = ArticleStore(":memory:")
+    yield store
+    store.close()
+
+
+def _article(n, published_at=None, **fields):
+    return {"url": f"https://news.test/story/{n}", "title": f"Story {n}", "published_at": published_at, **fields}
+
+
+def test_canonical_url_strips_only_tracking_parameters():
+    assert canonical_url("HTTPS://News.Test/a/?utm_source=x&b=2&fbclid=y&a=1#top") == "https://news.test/a?a=1&b=2"
+    assert canonical_url("https://news.test/article?id=5&ref=home&mod=rss") == "https://news.test/article?id=5&mod=rss&ref=home"
+
+
+def test_add_ignores_urls_already_stored(store):
+    assert store.add_articles("Tesla", [_article(1), _article(2)]) == 2
+    assert store.add_articles("tesla ", [_article(1), {**_article(2), "url": "https://news.test/story/2/?utm_medium=rss"}]) == 0
+    assert set(store.get_many("TESLA", ["https://news.test/story/1"])) == {"https://news.test/story/1"}
+    assert store.stats() == {"articles": 2, "companies": 1}
+
+
+def test_update_saves_derived_fields(store):
+    store.add_articles("Tesla", [_article(1)])
+    store.update_articles("Tesla", [{"url": "https://news.test/story/1", "topics": ["EV"], "audio_path": "/tmp/a.mp3"}])
+    article = store.get_many("Tesla", ["https://news.test/story/1"])["https://news.test/story/1"]
+    assert article["topics"] == ["EV"] and article["audio_path"] == "/tmp/a.mp3"
+
+
+def test_history_queries_use_publication_time(store):
+    store.add_articles(
+        "Tesla",
+        [
+            _article(1, "2026-01-01T10:00:00Z", sentiment="Positive"),
+            _article(2, "2026-01-02T10:00:00Z", sentiment="Negative"),
+            _article(3, "2026-01-02T12:00:00Z", sentiment="Negative"),
+            _article(4),  # Unknown publication time
+        ],
+    )
+    assert [a["title"] for a in store.articles("Tesla", since="2026-01-02")] == ["Story 3", "Story 2"]
+    assert [a["title"] for a in store.articles("Tesla", limit=1)] == ["Story 3"]
+    assert store.sentiment_trends("Tesla") == {
+        "2026-01-01": {"Positive": 1, "Negative": 0, "Neutral": 0},
+        "2026-01-02": {"Positive": 0, "Negative": 2, "Neutral": 0},
+    }
+
+
+def test_added_since_returns_each_article_once(store):
+    assert store.last_mark("Tesla") == 0
+    store.add_articles("Tesla", [_article(1), _article(2)])
+    store.add_articles("Google", [_article(9)])
+
+    first, mark = store.added_since("Tesla")
+    assert [a["title"] for a in first] == ["Story 1", "Story 2"]
+    assert mark == store.last_mark("Tesla")
+
+    store.add_articles("Tesla", [_article(2), _article(3)])
+    new, mark = store.added_since("Tesla", mark)
+    assert [a["title"] for a in new] == ["Story 3"]
+    assert store.added_since("Tesla", mark) == ([], mark)
+
+
+def test_marks_survive_vacuum(tmp_path):
+    store = ArticleStore(str(tmp_path / "articles.db"))
+    store.add_articles("Tesla", [_article(n) for n in range(5)])
+    _, mark = store.added_since("Tesla")
+    store._conn.execute("DELETE FROM articles WHERE url = ?", ("https://news.test/story/0",))
+    store._conn.commit()
+    store._conn.execute("VACUUM")
+
+    store.add_articles("Tesla", [_article(5)])
+    assert [a["title"] for a in store.added_since("Tesla", mark)[0]] == ["Story 5"]
+    store.close()
+
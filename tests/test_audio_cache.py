@@ -0,0 +1,91 @@
+import os
+import time
+
+import pytest
+
+from tts_converter import AudioCache
+
+
+def _writer(size):
+    def write(path):
+        with open(path, "wb") as f:
+            f.write(b"x" * size)
+
+    return write
+
+
+def _age(cache, key, seconds):
+    """Backdate an entry's modification time, which is what LRU order is based on."""
+    stamp = time.time() - seconds
+    os.utime(cache.path_for(key), (stamp, stamp))
+
+
+def test_make_key_normalizes_text_and_separates_voices():
+    assert AudioCache.make_key("Hello  world") == AudioCache.make_key(" Hello world\n")
+    assert AudioCache.make_key("Hello world", voice="hi") != AudioCache.make_key("Hello world", voice="en")
+
+
+def test_put_then_get(tmp_path):
+    cache = AudioCache(str(tmp_path), max_bytes=10_000)
+    path = cache.put("k", _writer(100))
+
+    assert cache.get("k") == path
+    assert os.path.getsize(path) == 100
+    assert cache.get("missing") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = AudioCache(str(tmp_path), max_bytes=250)
+    cache.put("a", _writer(100))
+    cache.put("b", _writer(100))
+    _age(cache, "a", 20)
+    _age(cache, "b", 10)
+    cache.get("a")  # Now the most recently used
+
+    cache.put("c", _writer(100))
+
+    assert cache.get("b") is None
+    assert cache.get("a") and cache.get("c")
+    assert cache.evictions == 1
+
+
+def test_workers_share_one_budget_and_lru_order(tmp_path):
+    first = AudioCache(str(tmp_path), max_bytes=250)
+    second = AudioCache(str(tmp_path), max_bytes=250)
+    first.put("a", _writer(100))
+    second.put("b", _writer(100))
+    _age(first, "a", 20)
+    _age(second, "b", 10)
+    first.get("a")  # Recency bumped by one worker is seen by the other
+
+    second.put("c", _writer(100))
+
+    assert sorted(os.listdir(tmp_path)) == ["a.mp3", "c.mp3"]
+
+
+def test_failed_write_leaves_no_entry(tmp_path):
+    cache = AudioCache(str(tmp_path))
+
+    def broken(path):
+        raise RuntimeError("synthesis failed")
+
+    with pytest.raises(RuntimeError):
+        cache.put("k", broken)
+    assert cache.get("k") is None
+    assert os.listdir(tmp_path) == []
+
+
+def test_put_under_budget_does_not_rescan(tmp_path, monkeypatch):
+    cache = AudioCache(str(tmp_path), max_bytes=10_000)
+    cache.put("a", _writer(100))
+    scans = []
+    real_scandir = os.scandir
+    monkeypatch.setattr(os, "scandir", lambda path: scans.append(path) or real_scandir(path))
+
+    cache.put("b", _writer(100))
+    cache.put("a", _writer(50))
+
+    assert scans == []
+    assert cache.stats()["entries"] == 2 and cache.stats()["bytes"] == 150
@@ -0,0 +1,170 @@
+import re
+from itertools import combinations
+from types import SimpleNamespace
+
+import pytest
+
+import comparative_analysis
+from article_batch import ArticleBatch
+from comparative_analysis import ArticleAggregator, comparative_sentiment_analysis, coverage_differences, extract_topics, extract_topics_batch
+
+STOPWORDS = frozenset({"the", "a", "and", "in", "of"})
+ENTITIES = {"Tesla": "ORG", "Berlin": "GPE", "Model": "PRODUCT", "Monday": "DATE"}
+
+
+class StubNLP:
+    """spaCy stand-in that tags a fixed set of words as entities and records each `pipe` call."""
+
+    pipe_names = ["tok2vec", "tagger", "parser", "ner", "lemmatizer"]
+
+    def __init__(self):
+        self.calls = []
+
+    def pipe(self, texts, batch_size, n_process, disable):
+        texts = list(texts)
+        self.calls.append((texts, disable))
+        for text in texts:
+            ents = [SimpleNamespace(text=word, label_=ENTITIES[word]) for word in text.split() if word in ENTITIES]
+            yield SimpleNamespace(ents=ents)
+
+
+@pytest.fixture
+def nlp(monkeypatch):
+    stub = StubNLP()
+    monkeypatch.setattr(comparative_analysis, "get_nlp", lambda: stub)
+    monkeypatch.setattr(comparative_analysis, "get_word_tokenize", lambda: lambda text: re.findall(r"\w+", text))
+    monkeypatch.setattr(comparative_analysis, "get_stopwords", lambda: STOPWORDS)
+    return stub
+
+
+def test_topics_batch_matches_per_text_topics(nlp):
+    # No shared vocabulary, so every word's IDF weight is the same in the batch and per text
+    texts = [
+        "Tesla opens factory in Berlin factory factory jobs jobs",
+        "",
+        "Monday rally lifts markets markets markets bonds",
+        "Model recall widens recall recall defects defects",
+    ]
+
+    batch = extract_topics_batch(texts)
+
+    assert batch == [extract_topics(text) for text in texts]
+    assert batch[0][:4] == ["Tesla", "Berlin", "factory", "jobs"]
+    assert batch[1] == ["No topics identified"]
+
+
+def test_topics_batch_runs_ner_once_with_other_pipes_disabled(nlp):
+    extract_topics_batch(["Tesla in Berlin", "", "Model news"])
+
+    assert len(nlp.calls) == 1
+    texts, disabled = nlp.calls[0]
+    assert texts == ["Tesla in Berlin", "Model news"]
+    assert "ner" not in disabled and set(disabled) == set(StubNLP.pipe_names) - {"ner"}
+
+
+def _article(title, summary, sentiment, score):
+    return {"title": title, "summary": summary, "sentiment": sentiment, "sentiment_score": score}
+
+
+ARTICLES = [
+    _article("Tesla battery factory expands", "New battery plant adds jobs", "Positive", 0.8),
+    _article("Tesla battery factory delayed", "Battery plant faces setbacks", "Negative", -0.7),
+    _article("Apple iPhone sales record", "iPhone demand surges in China", "Positive", 0.6),
+    _article("Apple iPhone sales slow", "iPhone demand cools in China", "Neutral", 0.0),
+    _article("Central bank holds rates", "Inflation remains steady", "Neutral", 0.01),
+    _article("Tesla recalls cars", "Recall covers battery defects", "Negative", -0.5),
+]
+
+
+def _dense_similarity(articles):
+    vectors = comparative_analysis._coverage_vectors(articles).toarray()
+    return vectors @ vectors.T
+
+
+def test_all_mode_pages_through_every_pair_in_order():
+    full = coverage_differences(ARTICLES)
+    pairs = [entry["Articles"] for entry in full]
+    assert pairs == [[i + 1, j + 1] for i, j in combinations(range(len(ARTICLES)), 2)]
+
+    similarity = _dense_similarity(ARTICLES)
+    for entry in full:
+        i, j = entry["Articles"]
+        assert entry["Similarity"] == pytest.approx(similarity[i - 1, j - 1], abs=1e-4)
+
+    pages = [coverage_differences(ARTICLES, offset=offset, limit=4) for offset in range(0, len(full), 4)]
+    assert [entry for page in pages for entry in page] == full
+    assert coverage_differences(ARTICLES, offset=len(full), limit=4) == []
+
+
+def test_similar_mode_returns_the_top_k_pairs_by_similarity():
+    similarity = _dense_similarity(ARTICLES)
+    expected = sorted(
+        ((similarity[i, j], [i + 1, j + 1]) for i, j in combinations(range(len(ARTICLES)), 2) if similarity[i, j] > 0),
+        key=lambda item: -item[0],
+    )
+
+    result = coverage_differences(ARTICLES, mode="similar", top_k=3)
+
+    assert [entry["Articles"] for entry in result] == [pair for _, pair in expected[:3]]
+    assert len(coverage_differences(ARTICLES, mode="similar", top_k=100)) == len(expected)
+
+
+def test_contrast_mode_ranks_similar_pairs_by_opposed_sentiment():
+    similarity = _dense_similarity(ARTICLES)
+    scores = [article["sentiment_score"] for article in ARTICLES]
+    weights = {
+        (i + 1, j + 1): similarity[i, j] * abs(scores[i] - scores[j]) for i, j in combinations(range(len(ARTICLES)), 2)
+    }
+    expected = sorted((pair for pair, weight in weights.items() if weight > 0), key=lambda pair: -weights[pair])
+
+    result = coverage_differences(ARTICLES, mode="contrast", top_k=4)
+
+    assert [tuple(entry["Articles"]) for entry in result] == expected[:4]
+    assert result[0]["Articles"] == [1, 2]  # Same story, opposite stance
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        coverage_differences(ARTICLES, mode="nearest")
+
+
+@pytest.mark.parametrize("n", [0, 1, 2, 5])
+def test_coverage_pairs_total(n):
+    articles = (ARTICLES * 2)[:n]
+    result = comparative_sentiment_analysis(articles, coverage_mode="similar", top_k=1)
+
+    assert result["Coverage Pairs Total"] == n * (n - 1) // 2
+    assert len(coverage_differences(articles)) == n * (n - 1) // 2
+
+
+def _dated(articles):
+    return [dict(article, published_at=f"2025-03-0{1 + i % 3}T10:00:00+00:00") for i, article in enumerate(articles)]
+
+
+@pytest.mark.parametrize("cuts", [(3,), (1, 4), (0, 2, 2, 5), (6,)])
+def test_merged_shards_match_a_single_pass(cuts):
+    articles = _dated(ARTICLES * 2)
+    bounds = [0, *cuts, len(articles)]
+    single = ArticleAggregator().extend(articles)
+
+    merged = ArticleAggregator()
+    for start, stop in zip(bounds, bounds[1:]):
+        merged.merge(ArticleAggregator().extend(articles[start:stop]))
+
+    assert merged.count == single.count == len(articles)
+    assert merged.distribution() == single.distribution()
+    assert merged.majority_sentiment() == single.majority_sentiment()
+    assert merged.keyword_counts == single.keyword_counts
+    assert merged.trends == single.trends
+    assert merged.extremes() == single.extremes() == ("Tesla battery factory expands", "Tesla battery factory delayed")
+    assert merged.shifts == single.shifts
+
+
+@pytest.mark.parametrize("mode", ["all", "similar", "contrast"])
+def test_article_batch_matches_the_dict_path(mode):
+    articles = _dated(ARTICLES * 2)
+
+    from_dicts = comparative_sentiment_analysis(articles, coverage_mode=mode, top_k=5)
+    from_batch = comparative_sentiment_analysis(ArticleBatch.from_articles(articles), coverage_mode=mode, top_k=5)
+
+    assert from_batch == from_dicts
@@ -0,0 +1,46 @@
+import numpy as np
+
+from deduplication import collapse_duplicates, cluster_near_duplicates, fan_out, minhash_signatures
+
+STORY = (
+    "Tesla shares jumped on Tuesday after the carmaker reported record quarterly deliveries, "
+    "beating analyst estimates as demand for its cheaper models recovered in China and Europe."
+)
+OTHER = (
+    "Regulators in Germany opened an investigation into a data breach at a major bank, "
+    "saying customer records may have been exposed for several months before it was found."
+)
+
+
+def test_signatures_are_deterministic_and_similarity_preserving():
+    signatures = minhash_signatures([STORY, STORY + " Reuters", OTHER])
+    assert signatures.shape == (3, 64)
+    assert np.array_equal(minhash_signatures([STORY])[0], signatures[0])
+    assert np.mean(signatures[0] == signatures[1]) > np.mean(signatures[0] == signatures[2])
+
+
+def test_clusters_syndicated_copies_under_the_first_member():
+    texts = [OTHER, STORY, f"{STORY} (Reuters)", "", STORY.upper()]
+    assert cluster_near_duplicates(texts) == [0, 1, 1, 3, 1]
+
+
+def test_empty_texts_never_match_each_other():
+    assert cluster_near_duplicates(["", "", ""]) == [0, 1, 2]
+
+
+def test_collapse_and_fan_out():
+    news = [
+        {"title": "Tesla deliveries", "summary": STORY, "url": "https://a.test/1", "source": "A"},
+        {"title": "Bank probe", "summary": OTHER, "url": "https://b.test/1", "source": "B"},
+        {"title": "Tesla deliveries", "summary": STORY, "url": "https://c.test/1", "source": "C"},
+    ]
+    representatives, labels = collapse_duplicates(news)
+
+    assert [article["url"] for article in representatives] == ["https://a.test/1", "https://b.test/1"]
+    assert representatives[0]["cluster_size"] == 2
+    assert representatives[0]["duplicates"] == [{"url": "https://c.test/1", "source": "C"}]
+
+    representatives[0]["sentiment"] = "Positive"
+    fan_out(news, labels)
+    assert news[2]["sentiment"] == "Positive"
+    assert "sentiment" not in news[1]
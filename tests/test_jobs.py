@@ -0,0 +1,66 @@
+import threading
+
+import pytest
+
+from jobs import JobManager, JobQueueFull
+
+
+def _wait_for(job, timeout=5):
+    for name, data in job.iter_events(keepalive=timeout):
+        pass
+    return job
+
+
+def test_job_runs_and_records_events():
+    manager = JobManager(workers=1)
+    job = _wait_for(manager.submit("square", lambda job, items: job.map(lambda x: x * x, items), [1, 2, 3]))
+
+    assert job.status == "completed"
+    assert job.result == [1, 4, 9]
+    assert job.finished_at >= job.started_at
+    assert sorted(item["result"] for item in job.to_dict()["items"] if "result" in item) == [1, 4, 9]
+    assert job.events[-1] == ("result", [1, 4, 9])
+
+
+def test_failed_job_records_the_error():
+    def fail(job):
+        raise RuntimeError("boom")
+
+    job = _wait_for(JobManager(workers=1).submit("fail", fail))
+    assert job.status == "failed"
+    assert job.error == "boom"
+    assert job.events[-1] == ("error", {"error": "boom"})
+
+
+def test_queue_full_applies_backpressure():
+    manager = JobManager(workers=1, max_pending=2)
+    release = threading.Event()
+    blocked = [manager.submit("block", lambda job: release.wait(5)) for _ in range(2)]
+
+    with pytest.raises(JobQueueFull):
+        manager.submit("block", lambda job: None)
+    assert manager.stats()["pending"] == 2
+
+    release.set()
+    for job in blocked:
+        _wait_for(job)
+    assert manager.stats()["pending"] == 0
+    _wait_for(manager.submit("after", lambda job: None))
+
+
+def test_finished_jobs_are_purged_after_retention():
+    manager = JobManager(workers=1, retention=0)
+    job = _wait_for(manager.submit("quick", lambda job: 1))
+    running = threading.Event()
+    release = threading.Event()
+
+    def slow(job):
+        running.set()
+        release.wait(5)
+
+    pending = manager.submit("slow", slow)  # Purges the finished job while leaving unfinished ones
+    running.wait(5)
+    assert manager.get(job.id) is None
+    manager.submit("other", lambda job: None)
+    assert manager.get(pending.id) is pending
+    release.set()
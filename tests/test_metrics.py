@@ -0,0 +1,104 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import api
+import metrics
+from metrics import BUCKETS, MetricsRegistry
+
+
+def _samples(text, name):
+    return [line for line in text.splitlines() if line.startswith(name) and not line.startswith("#")]
+
+
+def test_histogram_buckets_are_cumulative_with_an_inf_bucket():
+    registry = MetricsRegistry(enabled=True)
+    for value in (0.003, 0.2, 0.2, 60.0):
+        registry.observe("latency_seconds", value, endpoint="/analyze")
+
+    lines = _samples(registry.render(), "latency_seconds")
+
+    buckets = [line for line in lines if "_bucket" in line]
+    assert len(buckets) == len(BUCKETS) + 1
+    assert 'latency_seconds_bucket{endpoint="/analyze",le="0.005"} 1' in buckets
+    assert 'latency_seconds_bucket{endpoint="/analyze",le="0.25"} 3' in buckets
+    assert 'latency_seconds_bucket{endpoint="/analyze",le="30"} 3' in buckets
+    assert buckets[-1] == 'latency_seconds_bucket{endpoint="/analyze",le="+Inf"} 4'
+    assert 'latency_seconds_sum{endpoint="/analyze"} 60.403' in lines
+    assert 'latency_seconds_count{endpoint="/analyze"} 4' in lines
+
+
+def test_counters_and_gauges_render_with_escaped_labels():
+    registry = MetricsRegistry(enabled=True)
+    registry.describe("jobs_total", "counter", "Jobs run.")
+    registry.inc("jobs_total", kind='say "hi"\\\n')
+    registry.inc("jobs_total", 2, kind='say "hi"\\\n')
+    registry.register_collector(lambda: [("queue_depth", "Queued jobs.", {"queue": "tts"}, 3), ("unset", "Skipped.", {}, None)])
+
+    text = registry.render()
+
+    assert "# HELP jobs_total Jobs run.\n# TYPE jobs_total counter\n" in text
+    assert 'jobs_total{kind="say \\"hi\\"\\\\\\n"} 3' in text
+    assert "# TYPE queue_depth gauge\n" in text
+    assert 'queue_depth{queue="tts"} 3' in text
+    assert "unset" not in text
+
+
+def test_a_failing_collector_does_not_break_the_scrape():
+    registry = MetricsRegistry(enabled=True)
+    registry.inc("jobs_total")
+    registry.register_collector(lambda: 1 / 0)
+
+    assert "jobs_total 1" in registry.render()
+
+
+def test_disabled_registry_records_nothing(monkeypatch):
+    registry = MetricsRegistry(enabled=False)
+    registry.inc("jobs_total")
+    registry.observe("latency_seconds", 0.1)
+    assert registry.render() == "\n"
+
+    monkeypatch.setattr(metrics, "REGISTRY", registry)
+    token = metrics.start_trace("t-1")
+    with metrics.stage("fetch"):
+        pass
+    metrics.timed("score")(lambda: None)()
+    assert metrics.finish_trace(token)["stages"] == {}
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    registry = MetricsRegistry(enabled=True)
+    monkeypatch.setattr(metrics, "REGISTRY", registry)
+    return registry
+
+
+def test_trace_includes_stages_run_on_worker_threads(registry):
+    fetch = metrics.timed("fetch")(lambda url: url)
+
+    token = metrics.start_trace("t-2")
+    with metrics.stage("score"):
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            futures = [metrics.submit_in_context(pool, fetch, url) for url in ("a", "b", "c")]
+            assert [future.result() for future in futures] == ["a", "b", "c"]
+    trace = metrics.finish_trace(token)
+
+    assert trace["trace_id"] == "t-2"
+    assert set(trace["stages"]) == {"fetch", "score"}
+    assert 'newsapp_stage_seconds_count{stage="fetch"} 3' in registry.render()
+    assert metrics._current_trace.get() is None
+
+
+def test_slow_request_log_breaks_down_worker_stages(registry, monkeypatch, capsys):
+    monkeypatch.setattr(api, "SLOW_REQUEST_SECONDS", 0.0)
+    monkeypatch.setattr(api, "REGISTRY", registry)
+    monkeypatch.setattr(api, "iter_news", metrics.timed("news_fetch")(lambda company, score, **options: iter([])))
+
+    response = api.app.test_client().post("/analyze_batch", json={"companies": ["Tesla", "Ford"]}, headers={"X-Trace-Id": "slow-1"})
+
+    assert response.headers["X-Trace-Id"] == "slow-1"
+    log = capsys.readouterr().out
+    assert "Slow request POST /analyze_batch" in log
+    assert "[slow-1]" in log
+    assert "news_fetch=" in log
+    assert 'newsapp_slow_requests_total{endpoint="/analyze_batch"} 1' in registry.render()
@@ -0,0 +1,118 @@
+import sys
+import types
+
+import nltk
+import nltk.sentiment
+import pytest
+
+import model_loader
+from model_loader import ModelUnavailable, ensure_nltk_resource, get_nlp, get_sia
+
+
+@pytest.fixture
+def nltk_data(monkeypatch):
+    """Stub NLTK's data lookup with a set of installed paths; records every download attempt."""
+    installed, downloads = set(), []
+
+    def find(path):
+        if path not in installed:
+            raise LookupError(path)
+        return path
+
+    def download(name, quiet=False):
+        downloads.append(name)
+        installed.add(model_loader.NLTK_RESOURCES[name])
+
+    monkeypatch.setattr(nltk.data, "find", find)
+    monkeypatch.setattr(nltk, "download", download)
+    return installed, downloads
+
+
+@pytest.fixture
+def fake_spacy(monkeypatch):
+    """Install a stand-in `spacy` module; returns the list of models it was asked to load."""
+    loads = []
+    module = types.ModuleType("spacy")
+
+    def load(name):
+        loads.append(name)
+        if not module.installed:
+            raise OSError(f"Can't find model '{name}'")
+        return f"pipeline:{name}"
+
+    module.load, module.installed = load, True
+    monkeypatch.setitem(sys.modules, "spacy", module)
+    get_nlp.cache_clear()
+    yield module, loads
+    get_nlp.cache_clear()
+
+
+def test_installed_nltk_data_is_never_downloaded(nltk_data):
+    installed, downloads = nltk_data
+    installed.add("corpora/stopwords")
+
+    ensure_nltk_resource("stopwords")
+
+    assert downloads == []
+
+
+def test_missing_nltk_data_is_downloaded_once(nltk_data):
+    _, downloads = nltk_data
+
+    ensure_nltk_resource("punkt")
+    ensure_nltk_resource("punkt")
+
+    assert downloads == ["punkt"]
+
+
+def test_missing_nltk_data_raises_when_downloads_are_off(nltk_data, monkeypatch):
+    monkeypatch.setattr(model_loader, "MODEL_DOWNLOADS", False)
+
+    with pytest.raises(ModelUnavailable, match="vader_lexicon"):
+        ensure_nltk_resource("vader_lexicon")
+    assert nltk_data[1] == []
+
+
+def test_vader_is_loaded_once(nltk_data, monkeypatch):
+    nltk_data[0].add(model_loader.NLTK_RESOURCES["vader_lexicon"])
+    created = []
+    monkeypatch.setattr(nltk.sentiment, "SentimentIntensityAnalyzer", lambda: created.append(object()) or created[-1])
+    get_sia.cache_clear()
+    try:
+        assert get_sia() is get_sia()
+    finally:
+        get_sia.cache_clear()
+    assert len(created) == 1
+
+
+def test_spacy_model_is_loaded_once(fake_spacy):
+    _, loads = fake_spacy
+
+    assert get_nlp() == get_nlp() == f"pipeline:{model_loader.SPACY_MODEL}"
+    assert loads == [model_loader.SPACY_MODEL]
+
+
+def test_missing_spacy_model_raises_when_downloads_are_off(fake_spacy, monkeypatch):
+    module, _ = fake_spacy
+    module.installed = False
+    monkeypatch.setattr(model_loader, "MODEL_DOWNLOADS", False)
+    monkeypatch.setattr(model_loader.subprocess, "run", lambda *args, **kwargs: pytest.fail("model download attempted"))
+
+    with pytest.raises(ModelUnavailable, match=model_loader.SPACY_MODEL):
+        get_nlp()
+
+
+def test_missing_spacy_model_is_downloaded(fake_spacy, monkeypatch):
+    module, loads = fake_spacy
+    module.installed = False
+    commands = []
+
+    def run(command, check):
+        commands.append(command)
+        module.installed = True
+
+    monkeypatch.setattr(model_loader.subprocess, "run", run)
+
+    assert get_nlp() == f"pipeline:{model_loader.SPACY_MODEL}"
+    assert commands == [[sys.executable, "-m", "spacy", "download", model_loader.SPACY_MODEL]]
+    assert len(loads) == 2
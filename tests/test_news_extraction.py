@@ -0,0 +1,137 @@
+import json
+from unittest import mock
+
+import pytest
+import requests
+
+import news_extraction
+import upstream
+from benchmarks.fixtures import fixture_fetcher, load_fixture_page
+from news_extraction import http_fetch, iter_news
+from response_cache import MemoryBackend
+from upstream import UpstreamUnavailable
+
+
+def _news(company="Tesla", **kwargs):
+    kwargs.setdefault("fetcher", fixture_fetcher())
+    return list(iter_news(company, score=False, summarize=False, **kwargs))
+
+
+class JsonSource:
+    """A minimal pluggable source serving articles from a JSON document."""
+
+    name = "json"
+    timeout = 5
+
+    def page_urls(self, company_name, pages):
+        return [f"https://feed.example.com/{company_name}/{page}" for page in range(pages)]
+
+    def parse(self, text):
+        return json.loads(text)
+
+
+def _json_fetcher(url, timeout):
+    page = url.rsplit("/", 1)[1]
+    articles = [
+        {"title": f"Story {page}-{i}", "summary": "Text", "url": f"https://feed.example.com/a/{page}-{i}", "timestamp": "2025-01-02"}
+        for i in range(3)
+    ]
+    return json.dumps(articles)
+
+
+def test_limit_stops_the_stream():
+    assert len(_news(pages=3, limit=25)) == 25
+    assert len(_news(pages=3, limit=None)) == 30
+
+
+def test_urls_seen_on_an_earlier_page_are_skipped():
+    page = load_fixture_page()
+    articles = _news(pages=3, limit=None, fetcher=lambda url, timeout: page)  # Every page repeats the same results
+
+    urls = [article["url"] for article in articles]
+    assert len(urls) == 10 and len(set(urls)) == 10
+
+
+def test_pluggable_source_objects():
+    articles = _news(sources=(JsonSource(),), pages=2, limit=None, fetcher=_json_fetcher)
+
+    assert sorted(article["title"] for article in articles) == [f"Story {p}-{i}" for p in range(2) for i in range(3)]
+    assert {article["source"] for article in articles} == {"json"}
+    assert all(article["published_at"].startswith("2025-01-02") for article in articles)
+
+
+def test_unknown_source_name_is_rejected():
+    with pytest.raises(KeyError):
+        _news(sources=("nope",))
+
+
+def test_one_failing_page_does_not_stop_the_others():
+    fetch = fixture_fetcher()
+
+    def flaky(url, timeout):
+        if "first=11" in url:
+            raise requests.ConnectionError("down")
+        return fetch(url, timeout)
+
+    assert len(_news(pages=3, limit=None, fetcher=flaky)) == 20
+
+
+def test_all_pages_failing_raises_upstream_unavailable():
+    def down(url, timeout):
+        raise requests.ConnectionError("down")
+
+    with pytest.raises(UpstreamUnavailable):
+        _news(pages=2, fetcher=down)
+
+
+@pytest.fixture
+def bing_session():
+    """Replace the HTTP session with a mock and reset page fallbacks and upstream state."""
+    session = mock.Mock()
+    with mock.patch.object(news_extraction, "get_session", return_value=session), mock.patch.object(
+        news_extraction, "_PAGE_FALLBACK", MemoryBackend()
+    ), mock.patch.dict(upstream._UPSTREAMS):
+        upstream.configure_upstream("www.bing.com", retries=0)
+        yield session
+
+
+def test_http_fetch_serves_the_last_good_copy_while_the_host_is_down(bing_session):
+    url = "https://www.bing.com/news/search?q=Tesla"
+    bing_session.get.return_value = mock.Mock(text="<html>ok</html>", raise_for_status=lambda: None)
+    assert http_fetch(url, timeout=1) == "<html>ok</html>"
+
+    bing_session.get.side_effect = requests.ConnectionError("down")
+    assert http_fetch(url, timeout=1) == "<html>ok</html>"
+
+    with pytest.raises(requests.ConnectionError):
+        http_fetch("https://www.bing.com/news/search?q=Apple", timeout=1)  # Nothing cached for this page
+
+
+def test_http_fetch_serves_the_last_good_copy_once_the_circuit_opens(bing_session):
+    url = "https://www.bing.com/news/search?q=Tesla"
+    bing_session.get.return_value = mock.Mock(text="<html>ok</html>", raise_for_status=lambda: None)
+    http_fetch(url, timeout=1)
+
+    bing_session.get.side_effect = requests.ConnectionError("down")
+    breaker = upstream.get_upstream(url).breaker
+    for _ in range(breaker.failure_threshold + 2):
+        assert http_fetch(url, timeout=1) == "<html>ok</html>"
+    assert breaker.state == "open"
+    calls = bing_session.get.call_count
+
+    assert http_fetch(url, timeout=1) == "<html>ok</html>"  # Served without calling the host
+    assert bing_session.get.call_count == calls
+    with pytest.raises(upstream.CircuitOpenError):
+        http_fetch("https://www.bing.com/news/search?q=Apple", timeout=1)
+
+
+def test_http_fetch_does_not_mask_client_errors(bing_session):
+    url = "https://www.bing.com/news/search?q=Tesla"
+    bing_session.get.return_value = mock.Mock(text="<html>ok</html>", raise_for_status=lambda: None)
+    http_fetch(url, timeout=1)
+
+    response = requests.Response()
+    response.status_code = 404
+    bing_session.get.side_effect = requests.HTTPError("not found", response=response)
+    with pytest.raises(requests.HTTPError):
+        http_fetch(url, timeout=1)
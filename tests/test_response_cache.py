@@ -0,0 +1,95 @@
+import sys
+import threading
+import time
+
+import pytest
+
+import response_cache
+from response_cache import MemoryBackend, ResponseCache, create_backend, normalize_company
+
+
+def test_normalize_company():
+    assert normalize_company("  Tesla   Inc ") == "tesla inc"
+
+
+def test_memory_backend_expires_and_evicts_least_recently_used():
+    backend = MemoryBackend(max_entries=2)
+    backend.set("a", 1, ttl=60)
+    backend.set("b", 2, ttl=60)
+    backend.get("a")
+    backend.set("c", 3, ttl=60)
+    assert backend.get("b") is None
+    assert backend.get("a")[0] == 1
+
+    backend.set("short", 4, ttl=-1)
+    assert backend.get("short") is None
+
+
+def test_fresh_hit_skips_compute():
+    cache = ResponseCache(ttl=60, stale_ttl=60)
+    calls = []
+    compute = lambda: calls.append(1) or "value"
+
+    assert cache.get_or_compute("k", compute) == "value"
+    assert cache.get_or_compute("k", compute) == "value"
+    assert len(calls) == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_empty_results_are_not_cached():
+    cache = ResponseCache()
+    calls = []
+    compute = lambda: calls.append(1) or []
+
+    cache.get_or_compute("k", compute)
+    cache.get_or_compute("k", compute)
+    assert len(calls) == 2
+
+
+def test_concurrent_misses_share_one_computation():
+    cache = ResponseCache()
+    started = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        time.sleep(0.1)
+        return "value"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute("k", compute))) for _ in range(5)]
+    threads[0].start()
+    started.wait()
+    for thread in threads[1:]:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["value"] * 5
+    assert len(calls) == 1
+    assert cache.stats()["coalesced"] == 4
+
+
+def test_stale_value_is_served_while_refreshing():
+    cache = ResponseCache(ttl=0.05, stale_ttl=60)
+    values = iter(["old", "new"])
+    compute = lambda: next(values)
+
+    assert cache.get_or_compute("k", compute) == "old"
+    time.sleep(0.06)
+    assert cache.get_or_compute("k", compute) == "old"
+    for _ in range(50):
+        if cache.stats()["inflight"] == 0:
+            break
+        time.sleep(0.01)
+    assert cache.get_or_compute("k", compute) == "new"
+
+
+def test_create_backend_explains_a_missing_redis_package(monkeypatch):
+    assert isinstance(create_backend(), MemoryBackend)
+
+    monkeypatch.setattr(response_cache, "RESPONSE_CACHE_REDIS_URL", "redis://localhost:6379/0")
+    monkeypatch.setitem(sys.modules, "redis", None)  # Makes `import redis` fail
+    with pytest.raises(ImportError, match="pip install redis"):
+        create_backend()
@@ -0,0 +1,87 @@
+import gzip
+import json
+
+import numpy as np
+import pytest
+from flask import Flask
+
+from responses import MAX_PAGE_SIZE, CursorError, dumps, encode_cursor, json_response, page_options, paginate, select_fields
+
+app = Flask(__name__)
+
+
+def test_dumps_handles_numpy_values():
+    assert json.loads(dumps({"score": np.float32(0.5), "counts": np.array([1, 2])})) == {"score": 0.5, "counts": [1, 2]}
+
+
+def test_paginate_walks_the_list_with_cursors():
+    items = list(range(5))
+    page, info = paginate(items, None, 2)
+    assert page == [0, 1] and info["total"] == 5
+
+    pages = [page]
+    while info["next_cursor"]:
+        page, info = paginate(items, info["next_cursor"], 2)
+        pages.append(page)
+    assert pages == [[0, 1], [2, 3], [4]]
+
+
+def test_cursor_errors():
+    _, info = paginate([1, 2, 3], None, 1)
+    with pytest.raises(CursorError) as malformed:
+        paginate([1, 2, 3], "not a cursor!", 1)
+    assert malformed.value.status == 400
+
+    with pytest.raises(CursorError) as expired:
+        paginate([1, 2, 3, 4], info["next_cursor"], 1)  # The list changed since the cursor was issued
+    assert expired.value.status == 410
+
+    with pytest.raises(CursorError):
+        paginate([1, 2, 3], encode_cursor(-1, "0" * 16), 1)
+
+
+def test_select_fields():
+    data = {"a": 1, "b": {"x": 1, "y": 2}, "c": 3}
+    assert select_fields(data, "a, b.y, missing") == {"a": 1, "b": {"y": 2}}
+
+
+def test_etag_revalidation_returns_304():
+    with app.test_request_context():
+        etag = json_response({"a": 1}).get_etag()[0]
+    with app.test_request_context(headers={"If-None-Match": f'W/"{etag}"'}):
+        response = json_response({"a": 1})
+    assert response.status_code == 304
+    assert response.get_data() == b""
+
+
+def test_large_bodies_are_compressed_when_accepted():
+    data = {"items": ["headline"] * 500}
+    with app.test_request_context(headers={"Accept-Encoding": "gzip"}):
+        response = json_response(data)
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert json.loads(gzip.decompress(response.get_data())) == data
+
+    with app.test_request_context():
+        assert "Content-Encoding" not in json_response({"a": 1}).headers
+
+
+@pytest.mark.parametrize(
+    "query, message",
+    [
+        ("page_size=abc", "page_size must be an integer"),
+        ("page_size=0", f"page_size must be between 1 and {MAX_PAGE_SIZE}"),
+        (f"page_size={MAX_PAGE_SIZE + 1}", f"page_size must be between 1 and {MAX_PAGE_SIZE}"),
+    ],
+)
+def test_page_options_rejects_bad_page_sizes(query, message):
+    with app.test_request_context(f"/?{query}"):
+        with pytest.raises(ValueError) as error:
+            page_options("cursor")
+    assert str(error.value) == message
+
+
+def test_page_options_reads_the_cursors():
+    with app.test_request_context("/?page_size=5&cursor=abc"):
+        assert page_options("cursor", "other") == (5, {"cursor": "abc", "other": None})
+    with app.test_request_context("/"):
+        assert page_options("cursor") == (None, {})
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+import sentiment_analysis
+from sentiment_analysis import analyze_sentiment, analyze_sentiment_batch, label_sentiments
+
+# Compound score returned by the stand-in analyzer for each text
+COMPOUND = {"great": 0.6, "edge up": 0.05, "just up": 0.0499, "flat": 0.0, "just down": -0.0499, "edge down": -0.05, "awful": -0.7}
+
+
+class StubSIA:
+    """VADER stand-in that scores texts from a fixed table, so no lexicon is needed."""
+
+    def polarity_scores(self, text):
+        compound = COMPOUND[text]
+        return {"compound": compound, "pos": max(compound, 0), "neg": max(-compound, 0), "neu": 1 - abs(compound)}
+
+
+@pytest.fixture(autouse=True)
+def stub_sia(monkeypatch):
+    monkeypatch.setattr(sentiment_analysis, "get_sia", StubSIA)
+    sentiment_analysis._polarity_scores.cache_clear()
+    yield
+    sentiment_analysis._polarity_scores.cache_clear()
+
+
+def test_label_thresholds():
+    compound = np.array([0.05, 0.0499, 0.0, -0.0499, -0.05, 1.0, -1.0], dtype=np.float32)
+    assert label_sentiments(compound).tolist() == ["Positive", "Neutral", "Neutral", "Neutral", "Negative", "Positive", "Negative"]
+
+
+def test_empty_texts_are_neutral():
+    batch = analyze_sentiment_batch(["", None, "great"])
+
+    assert batch.labels == ["Neutral", "Neutral", "Positive"]
+    assert batch.scores[:2].tolist() == [[0, 0, 0, 1], [0, 0, 0, 1]]
+    assert batch.scores.dtype == np.float32
+
+
+def test_batch_labels_match_single_text_labels():
+    texts = list(COMPOUND) + ["", "great"]
+    batch = analyze_sentiment_batch(texts)
+
+    assert batch.labels == [analyze_sentiment(text) for text in texts]
+    assert batch.compound.tolist() == pytest.approx([COMPOUND.get(text, 0.0) for text in texts])
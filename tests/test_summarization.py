@@ -0,0 +1,105 @@
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+import summarization
+from summarization import _pinned_session, check_public_url, fetch_article_text
+
+PUBLIC_IP = "93.184.216.34"
+
+
+@pytest.fixture
+def resolve(monkeypatch):
+    """Point host names at fixed addresses: resolve({"host": "1.2.3.4"})."""
+    table = {}
+    real = socket.getaddrinfo
+
+    def getaddrinfo(host, port, *args, **kwargs):
+        if host in table:
+            return [(socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP, "", (table[host], port or 80))]
+        return real(host, port, *args, **kwargs)
+
+    monkeypatch.setattr(socket, "getaddrinfo", getaddrinfo)
+    return table.update
+
+
+@pytest.fixture
+def local_server():
+    """A local HTTP server; handlers maps a path to (status, headers, body)."""
+    handlers, hosts = {}, []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            hosts.append(self.headers["Host"])
+            status, headers, body = handlers.get(self.path, (404, {}, b""))
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server.server_port, handlers, hosts
+    server.shutdown()
+
+
+def test_public_hosts_are_allowed(resolve):
+    resolve({"news.test": PUBLIC_IP})
+    assert check_public_url("https://news.test/story") == PUBLIC_IP
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "ftp://news.test/story",
+        "file:///etc/passwd",
+        "http:///no-host",
+        "http://127.0.0.1/",
+        "http://localhost/",
+        "http://169.254.169.254/latest/meta-data/",
+        "http://10.0.0.5/",
+        "http://[::1]/",
+        "http://internal.test/",
+    ],
+)
+def test_internal_and_non_http_urls_are_refused(resolve, url):
+    resolve({"internal.test": "192.168.1.10"})
+    with pytest.raises(ValueError):
+        check_public_url(url)
+
+
+def test_pinned_session_connects_to_the_vetted_address(local_server):
+    port, handlers, hosts = local_server
+    handlers["/story"] = (200, {}, b"ok")
+    with _pinned_session(f"http://news.test:{port}/story", "127.0.0.1") as session:
+        response = session.get(f"http://news.test:{port}/story", timeout=5)
+    assert response.text == "ok"
+    assert hosts == [f"news.test:{port}"]
+
+
+def test_redirects_to_internal_addresses_are_refused(resolve, local_server, monkeypatch):
+    port, handlers, hosts = local_server
+    resolve({"news.test": PUBLIC_IP})
+    handlers["/story"] = (302, {"Location": "http://169.254.169.254/latest/meta-data/"}, b"")
+    # Serve the "public" host from the local server
+    monkeypatch.setattr(summarization, "_pinned_session", lambda url, address: _pinned_session(url, "127.0.0.1"))
+
+    with pytest.raises(ValueError):
+        summarization._download_article(f"http://news.test:{port}/story", timeout=5)
+    assert hosts == [f"news.test:{port}"]
+
+
+def test_fetch_article_text_keeps_article_paragraphs():
+    page = (
+        "<html><body><nav><p>Home | World | Business | Technology | Markets | Opinion</p></nav>"
+        "<article><p>Tesla reported record deliveries for the quarter, beating estimates.</p>"
+        "<p>Short.</p><script>var tracking = 'ignored by the extractor entirely';</script></article></body></html>"
+    )
+    text = fetch_article_text("https://news.test/story", fetcher=lambda url, timeout: page)
+    assert text == "Tesla reported record deliveries for the quarter, beating estimates."
@@ -0,0 +1,72 @@
+import threading
+
+from benchmarks.fixtures import StubTranslatorBackend
+from translation import BatchTranslator
+
+
+class LineMergingBackend(StubTranslatorBackend):
+    """Backend that joins packed lines into one, as a real service sometimes does."""
+
+    def translate(self, text, source, target):
+        return super().translate(text.replace("\n", " "), source, target)
+
+
+def test_packs_texts_under_max_chars():
+    backend = StubTranslatorBackend()
+    translator = BatchTranslator(backend, max_chars=25)
+    texts = ["aaaa bbbb", "cccc dddd", "eeee ffff", "gggg hhhh"]  # 9 chars each, 19 for two joined
+
+    assert translator._pack(texts) == [texts[:2], texts[2:]]
+    assert translator.translate_batch(texts) == [f"[hi] {text}" for text in texts]
+    assert backend.calls == 2
+    assert translator.stats()["requests"] == 2
+
+
+def test_oversized_text_gets_its_own_chunk():
+    translator = BatchTranslator(StubTranslatorBackend(), max_chars=10)
+    assert translator._pack(["short", "much longer than ten", "tiny"]) == [["short"], ["much longer than ten"], ["tiny"]]
+
+
+def test_mismatched_line_count_falls_back_to_one_request_per_text():
+    backend = LineMergingBackend()
+    translator = BatchTranslator(backend)
+
+    assert translator.translate_batch(["one", "two", "three"]) == ["[hi] one", "[hi] two", "[hi] three"]
+    assert backend.calls == 4  # The packed request plus one retry per text
+    assert translator.stats()["requests"] == 4
+
+
+def test_memo_hits_skip_the_backend():
+    backend = StubTranslatorBackend()
+    translator = BatchTranslator(backend)
+    translator.translate_batch(["hello", "world"])
+
+    assert translator.translate_batch(["world", "", "hello", "world"]) == ["[hi] world", "", "[hi] hello", "[hi] world"]
+    assert backend.calls == 1
+    assert translator.stats() == {"hits": 3, "misses": 2, "requests": 1, "entries": 2}
+    translator.translate_batch(["hello"], target="fr")
+    assert backend.calls == 2  # Memo entries are per target language
+
+
+def test_memo_evicts_least_recently_used():
+    translator = BatchTranslator(StubTranslatorBackend(), cache_size=2)
+    translator.translate_batch(["a", "b"])
+    translator.translate("a")
+    translator.translate("c")
+
+    assert [key[0] for key in translator._memo] == ["a", "c"]
+
+
+def test_request_counter_is_exact_under_concurrency():
+    translator = BatchTranslator(StubTranslatorBackend(), cache_size=0)
+
+    def work(n):
+        for i in range(200):
+            translator.translate(f"text {n} {i}")
+
+    threads = [threading.Thread(target=work, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert translator.stats()["requests"] == 1600
@@ -0,0 +1,104 @@
+import math
+import threading
+from unittest import mock
+
+import pytest
+
+import translation
+import tts_converter
+import upstream
+from benchmarks.fixtures import StubGTTS, StubTranslatorBackend
+from tts_converter import iter_speech_hindi, text_to_speech_hindi_as_completed, text_to_speech_hindi_batch
+
+
+class FlakyGTTS(StubGTTS):
+    """StubGTTS that fails for any text mentioning "fail"."""
+
+    def save(self, filename):
+        if "fail" in self.text:
+            raise RuntimeError("synthesis failed")
+        super().save(filename)
+
+
+@pytest.fixture
+def offline_tts(tmp_path):
+    """Stub translation and gTTS, with an empty audio cache and no upstream rate limit."""
+    cache = tts_converter.AudioCache(str(tmp_path))
+    with mock.patch.object(tts_converter, "gTTS", FlakyGTTS), mock.patch.object(tts_converter, "AUDIO_CACHE", cache), mock.patch.object(
+        translation, "_TRANSLATOR", translation.BatchTranslator(StubTranslatorBackend())
+    ), mock.patch.dict(upstream._UPSTREAMS):
+        upstream.configure_upstream(translation.TRANSLATION_HOST, rate=math.inf, burst=math.inf, max_concurrency=64)
+        yield cache
+
+
+def _spoken(path):
+    with open(path, "rb") as f:
+        return f.read().replace(b"\xff\xfb", b"").decode("utf-8")
+
+
+def test_batch_preserves_input_order(offline_tts):
+    texts = [f"Story number {i}." for i in range(12)]
+    paths = text_to_speech_hindi_batch(texts)
+
+    assert [_spoken(path) for path in paths] == [f"[hi] {text}" for text in texts]
+
+
+def test_batch_maps_empty_and_duplicate_texts(offline_tts):
+    paths = text_to_speech_hindi_batch(["a b", "", "a b"])
+
+    assert paths[0] is not None and paths[0] == paths[2]
+    assert paths[1] is None
+    assert translation._TRANSLATOR.stats()["misses"] == 1
+
+
+def test_failed_item_yields_none_without_breaking_the_batch(offline_tts):
+    paths = text_to_speech_hindi_batch(["good one", "this will fail", "good two"])
+
+    assert paths[1] is None
+    assert _spoken(paths[0]) == "[hi] good one"
+    assert _spoken(paths[2]) == "[hi] good two"
+
+
+def test_batch_serves_cached_audio(offline_tts):
+    first = text_to_speech_hindi_batch(["cached text"])
+    assert text_to_speech_hindi_batch(["cached  text"]) == first
+    assert offline_tts.hits == 1
+
+
+def test_as_completed_yields_each_item_without_waiting_for_slower_ones(offline_tts):
+    release = threading.Event()
+
+    class SlowGTTS(FlakyGTTS):
+        def save(self, filename):
+            if "slow" in self.text:
+                assert release.wait(5)
+            super().save(filename)
+
+    with mock.patch.object(tts_converter, "gTTS", SlowGTTS):
+        results = text_to_speech_hindi_as_completed(["slow story", "", "quick story", "quick story"])
+
+        assert next(results) == (1, None)
+        first, second = next(results), next(results)
+        assert {first[0], second[0]} == {2, 3} and first[1] == second[1]
+        assert _spoken(first[1]) == "[hi] quick story"
+        release.set()
+        index, path = next(results)
+        assert index == 0 and _spoken(path) == "[hi] slow story"
+        assert next(results, None) is None
+
+
+def test_stream_yields_chunks_in_order_and_caches_the_audio(offline_tts):
+    text = " ".join(f"Sentence number {i} of a long article about the company." for i in range(30))
+
+    audio = b"".join(iter_speech_hindi(text))
+
+    chunks = tts_converter._chunk_sentences(text)
+    assert len(chunks) > 2
+    assert audio == b"".join(b"".join(StubGTTS(f"[hi] {chunk}").stream()) for chunk in chunks)
+    key = offline_tts.make_key(text)
+    with open(offline_tts.get(key), "rb") as f:
+        assert f.read() == audio
+
+
+def test_stream_of_empty_text_is_empty(offline_tts):
+    assert list(iter_speech_hindi("")) == []
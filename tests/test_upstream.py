@@ -0,0 +1,155 @@
+import time
+
+import pytest
+import requests
+
+import upstream
+from upstream import AdaptiveLimiter, CircuitBreaker, CircuitOpenError, TokenBucket, Upstream, classify
+
+
+def _http_error(status, headers=None):
+    response = requests.Response()
+    response.status_code = status
+    response.headers.update(headers or {})
+    return requests.HTTPError(f"{status} error", response=response)
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(upstream.random, "uniform", lambda low, high: 0)
+
+
+def test_classify():
+    assert classify(_http_error(429)) == "throttled"
+    assert classify(_http_error(503)) == "throttled"
+    assert classify(requests.Timeout()) == "throttled"
+    assert classify(_http_error(500)) == "failed"
+    assert classify(requests.ConnectionError()) == "failed"
+    assert classify(_http_error(404)) == "error"
+    assert classify(ValueError("bad input")) == "error"
+
+
+def test_token_bucket_allows_burst_then_waits():
+    bucket = TokenBucket(rate=100, burst=3)
+    assert [bucket.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.acquire() > 0
+
+
+def test_token_bucket_pause_holds_callers_back():
+    bucket = TokenBucket(rate=100, burst=10)
+    bucket.pause(0.05)
+    start = time.monotonic()
+    bucket.acquire()
+    assert time.monotonic() - start >= 0.04
+
+
+def test_adaptive_limiter_grows_on_success_and_halves_on_throttling():
+    limiter = AdaptiveLimiter(initial=4, minimum=1, maximum=8)
+    for _ in range(4):
+        assert limiter.acquire(0)
+    assert not limiter.acquire(0)
+
+    for _ in range(4):
+        limiter.release("ok")
+    assert limiter.limit == pytest.approx(5, abs=0.1)
+
+    limiter.acquire(0)
+    limiter.release("throttled")
+    assert limiter.limit == pytest.approx(2.5, abs=0.1)
+    limiter.acquire(0)
+    limiter.release("failed")  # Within the cooldown: one burst of errors counts once
+    assert limiter.limit == pytest.approx(2.5, abs=0.1)
+
+
+def test_breaker_opens_after_consecutive_failures_and_probes_once():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow()  # The single half-open probe
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.allow()
+
+
+def test_failed_probe_reopens_the_circuit():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+
+def test_client_error_probe_leaves_the_circuit_half_open():
+    host = Upstream("example.test")
+    host.breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    host.breaker.record_failure()
+    time.sleep(0.06)
+
+    with pytest.raises(requests.HTTPError):
+        with host.slot():
+            raise _http_error(404)
+    assert host.breaker.state == "half_open"
+
+    with host.slot():
+        pass
+    assert host.breaker.state == "closed"
+
+
+def test_open_circuit_fails_fast():
+    host = Upstream("example.test")
+    host.breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    host.breaker.record_failure()
+    with pytest.raises(CircuitOpenError) as info:
+        host.call(lambda: "never called")
+    assert info.value.retry_after > 0
+
+
+def test_call_retries_transient_failures():
+    host = Upstream("example.test", rate=1000, burst=1000, retries=3)
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise _http_error(503)
+        return "ok"
+
+    assert host.call(flaky) == "ok"
+    assert len(attempts) == 3
+
+
+def test_call_does_not_retry_client_errors():
+    host = Upstream("example.test", rate=1000, burst=1000, retries=3)
+    attempts = []
+
+    def missing():
+        attempts.append(1)
+        raise _http_error(404)
+
+    with pytest.raises(requests.HTTPError):
+        host.call(missing)
+    assert len(attempts) == 1
+
+
+def test_host_limits_are_validated():
+    assert upstream._validate_host_limits({"WWW.Bing.com": {"rate": 2, "retries": 0}}) == {"www.bing.com": {"rate": 2, "retries": 0}}
+    for bad in ([], {"h": 1}, {"h": {"speed": 1}}, {"h": {"rate": 0}}, {"h": {"rate": True}}, {"h": {"retries": -1}}):
+        with pytest.raises(ValueError):
+            upstream._validate_host_limits(bad)
+
+
+def test_untracked_hosts_are_bounded_and_unlabelled(monkeypatch):
+    monkeypatch.setattr(upstream, "UPSTREAM_MAX_HOSTS", 2)
+    monkeypatch.setattr(upstream, "_UNTRACKED_UPSTREAMS", upstream.OrderedDict())
+
+    for i in range(5):
+        host = upstream.get_upstream(f"https://site{i}.test/article", track=False)
+    assert list(upstream._UNTRACKED_UPSTREAMS) == ["site3.test", "site4.test"]
+    assert host.label == "other"
+    assert "site4.test" not in upstream.upstream_stats()
+    assert upstream.get_upstream("https://site4.test/other", track=False) is host
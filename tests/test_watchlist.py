@@ -0,0 +1,199 @@
+import json
+
+import numpy as np
+import pytest
+
+import news_extraction
+from article_store import ArticleStore
+from sentiment_analysis import SentimentBatch
+from watchlist import QueueAlertSink, Watchlist, WatchedCompany, load_watchlist, sentiment_shift
+
+# Rejected by both POST /watchlist and load_watchlist
+INVALID_ENTRIES = [
+    {"company": "X", "sources": 5},
+    {"company": "X", "sources": "bing"},
+    {"company": "X", "sources": []},
+    {"company": "X", "sources": ["bing", "nope"]},
+    {"company": "X", "sources": [["bing"]]},
+    {"company": "X", "priority": 9},
+    {"company": 5},
+    {"sources": ["bing"]},
+]
+
+CARD = (
+    '<div class="news-card"><a class="title" href="https://news.example.com/{slug}">{title}</a>'
+    '<div class="snippet">{snippet}</div><div class="source">Wire · 1h</div></div>'
+)
+
+
+class Listing:
+    """Fixture fetcher serving a Bing News results page built from the articles currently listed."""
+
+    def __init__(self):
+        self.articles = []
+
+    def publish(self, tone: str, count: int) -> None:
+        """List `count` new stories; "gain" stories score Positive and "loss" stories Negative."""
+        start = len(self.articles)
+        for i in range(start, start + count):
+            snippet = f"Company {tone} number {i} in region {i * 7}."
+            self.articles.append({"slug": f"story-{i}", "title": f"Story {i} reports a {tone}", "snippet": snippet})
+
+    def __call__(self, url, timeout):
+        return "<html><body>" + "".join(CARD.format(**article) for article in reversed(self.articles)) + "</body></html>"
+
+
+@pytest.fixture
+def scored(monkeypatch):
+    """Replace VADER with keyword scoring; returns every text scored."""
+    texts = []
+
+    def analyze_sentiment_batch(batch):
+        texts.extend(batch)
+        compound = np.array([0.6 if "gain" in text else -0.6 if "loss" in text else 0.0 for text in batch], dtype=np.float32)
+        scores = np.zeros((len(batch), 4), dtype=np.float32)
+        scores[:, 0] = compound
+        labels = ["Positive" if c > 0 else "Negative" if c < 0 else "Neutral" for c in compound]
+        return SentimentBatch(scores=scores, labels=labels)
+
+    monkeypatch.setattr(news_extraction, "analyze_sentiment_batch", analyze_sentiment_batch)
+    return texts
+
+
+@pytest.fixture
+def listing():
+    return Listing()
+
+
+@pytest.fixture
+def watchlist(listing, scored):
+    store = ArticleStore(":memory:")
+    monitor = Watchlist(store=store, sinks=[QueueAlertSink()], workers=1, fetcher=listing)
+    yield monitor
+    store.close()
+
+
+def test_sentiment_shift_is_total_variation_distance():
+    assert sentiment_shift({"Positive": 1.0}, {"Positive": 1.0}) == 0
+    assert sentiment_shift({"Positive": 1.0}, {"Negative": 1.0}) == 1
+    assert sentiment_shift({"Positive": 1.0}, {"Positive": 0.5, "Negative": 0.5}) == pytest.approx(0.5)
+
+
+def test_poll_processes_only_newly_seen_articles(watchlist, listing, scored):
+    item = watchlist.watch("Tesla")
+    listing.publish("gain", 3)
+    assert watchlist.poll(item)["new_articles"] == 3
+    assert len(scored) == 3
+
+    listing.publish("gain", 2)
+    result = watchlist.poll(item)
+
+    assert result["new_articles"] == 2
+    assert len(scored) == 5  # Only the two new stories were scored
+    assert watchlist.poll(item)["new_articles"] == 0
+    assert len(item.window) == 5 and item.new_articles == 5
+
+
+def test_poll_picks_up_articles_stored_by_other_requests(watchlist, listing):
+    item = watchlist.watch("Tesla")
+    watchlist.poll(item)
+    other = {"title": "From /analyze", "url": "https://news.example.com/other", "sentiment": "Negative"}
+    watchlist.store.add_articles("Tesla", [other])
+
+    assert watchlist.poll(item)["new_articles"] == 1
+    assert item.mix()["Negative"] == 1.0
+
+
+def test_interval_adapts_to_news_volume(watchlist, listing):
+    item = watchlist.watch("Tesla")
+    low, high = item.interval_bounds
+    start = item.interval
+
+    watchlist.poll(item)  # Nothing listed: slow down
+    assert item.interval == pytest.approx(start * 1.5)
+
+    listing.publish("gain", 5)
+    watchlist.poll(item)  # A burst of news: speed up
+    assert item.interval == pytest.approx(start * 0.75)
+
+    for _ in range(20):
+        listing.publish("gain", 5)
+        watchlist.poll(item)
+    assert item.interval == low
+
+    for _ in range(20):
+        watchlist.poll(item)
+    assert item.interval == high
+
+
+def test_failed_poll_backs_off(watchlist):
+    def down(url, timeout):
+        raise ConnectionError("down")
+
+    watchlist.fetcher = down
+    item = watchlist.watch("Tesla")
+    start = item.interval
+
+    assert watchlist.poll(item)["new_articles"] == 0
+    assert item.errors == 1 and item.interval == pytest.approx(start * 2)
+
+
+def test_sentiment_shift_raises_one_alert(watchlist, listing):
+    item = watchlist.watch("Tesla")
+    listing.publish("gain", 5)
+    assert watchlist.poll(item)["alert"] is None  # First full window sets the baseline
+    assert item.baseline == {"Positive": 1.0, "Negative": 0.0, "Neutral": 0.0}
+
+    listing.publish("gain", 1)
+    assert watchlist.poll(item)["shift"] == 0
+
+    listing.publish("loss", 5)
+    result = watchlist.poll(item)
+
+    alert = result["alert"]
+    assert alert["company"] == "Tesla"
+    assert alert["shift"] == pytest.approx(result["shift"]) and result["shift"] >= 0.2
+    assert alert["after"]["Negative"] == pytest.approx(5 / 11, abs=1e-4)
+    assert [h["sentiment"] for h in alert["headlines"]] == ["Negative"] * 5
+    assert watchlist.sinks[0].drain() == [alert]
+    assert list(watchlist.recent_alerts) == [alert]
+    assert item.baseline == alert["after"]
+
+    listing.publish("loss", 1)
+    assert watchlist.poll(item)["alert"] is None  # Too few articles since the last alert
+
+
+def test_watch_validates_priority_and_updates_existing_companies(watchlist):
+    with pytest.raises(ValueError):
+        watchlist.watch("Tesla", priority=0)
+
+    first = watchlist.watch("Tesla")
+    again = watchlist.watch(" tesla ", priority=4, sources=("google",))
+
+    assert again is first
+    assert (first.priority, first.sources, first.interval) == (4, ("google",), WatchedCompany("x", 4).target_interval)
+    assert watchlist.unwatch("TESLA") and not watchlist.unwatch("Tesla")
+
+
+def test_load_watchlist_reads_names_and_objects(tmp_path):
+    path = tmp_path / "watchlist.json"
+    path.write_text(json.dumps(["Tesla", {"company": "Ford", "priority": 3, "sources": ["bing", "google"]}]))
+
+    assert load_watchlist(str(path)) == [("Tesla", 1, ("bing",)), ("Ford", 3, ("bing", "google"))]
+
+
+@pytest.mark.parametrize("entry", INVALID_ENTRIES)
+def test_load_watchlist_rejects_invalid_entries(tmp_path, entry):
+    path = tmp_path / "watchlist.json"
+    path.write_text(json.dumps(["Tesla", entry]))
+
+    with pytest.raises(ValueError, match="entry 2: "):
+        load_watchlist(str(path))
+
+
+def test_load_watchlist_requires_a_list(tmp_path):
+    path = tmp_path / "watchlist.json"
+    path.write_text(json.dumps({"company": "Tesla"}))
+
+    with pytest.raises(ValueError, match="JSON list"):
+        load_watchlist(str(path))
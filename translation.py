@@ -0,0 +1,218 @@
+import os
+import threading
+from collections import OrderedDict
+
+from metrics import count_cache, timed
+from upstream import get_upstream
+
+# Google's web endpoint rejects payloads over 5000 characters; keep some headroom
+TRANSLATION_MAX_CHARS = int(os.environ.get("TRANSLATION_MAX_CHARS", 4500))
+TRANSLATION_CACHE_SIZE = int(os.environ.get("TRANSLATION_CACHE_SIZE", 4096))
+
+# Host behind GoogleTranslator, whose rate/concurrency limits and circuit breaker the backend shares
+TRANSLATION_HOST = "translate.google.com"
+
+# Texts are packed one per line; the backend preserves line breaks between segments
+_SEPARATOR = "\n"
+
+
+class GoogleTranslatorBackend:
+    """
+    Translation backend built on deep_translator's GoogleTranslator.
+
+    Translator objects are created once per (source, target) pair and reused across calls.
+    Requests go through the shared limits of `TRANSLATION_HOST` (see `upstream.Upstream`).
+    """
+
+    max_chars = TRANSLATION_MAX_CHARS
+
+    def __init__(self):
+        self._translators = {}
+        self._lock = threading.Lock()
+
+    def translate(self, text: str, source: str, target: str) -> str:
+        """
+        Translate a single piece of text.
+
+        Args:
+            text (str): Text to translate.
+            source (str): Source language code ("auto" to detect).
+            target (str): Target language code.
+
+        Returns:
+            str: The translated text.
+        """
+        with self._lock:
+            translator = self._translators.get((source, target))
+            if translator is None:
+                from deep_translator import GoogleTranslator
+
+                translator = GoogleTranslator(source=source, target=target)
+                self._translators[(source, target)] = translator
+        return get_upstream(TRANSLATION_HOST).call(translator.translate, text)
+
+
+class BatchTranslator:
+    """
+    Translation layer that packs many short texts into as few backend requests as possible
+    and memoizes results by (text, source, target) in a bounded LRU cache.
+    """
+
+    def __init__(self, backend=None, max_chars: int = None, cache_size: int = TRANSLATION_CACHE_SIZE):
+        self.backend = backend if backend is not None else GoogleTranslatorBackend()
+        self.max_chars = max_chars or getattr(self.backend, "max_chars", TRANSLATION_MAX_CHARS)
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self.requests = 0
+        self._memo = OrderedDict()
+        self._lock = threading.Lock()
+
+    def translate(self, text: str, target: str = "hi", source: str = "auto") -> str:
+        """Translate a single text (see `translate_batch`)."""
+        return self.translate_batch([text], target=target, source=source)[0]
+
+    def translate_batch(self, texts: list, target: str = "hi", source: str = "auto") -> list:
+        """
+        Translate a list of texts with as few backend round-trips as possible.
+
+        Args:
+            texts (list): Texts to translate.
+            target (str): Target language code.
+            source (str): Source language code ("auto" to detect).
+
+        Returns:
+            list: Translations in input order. Empty inputs are returned unchanged.
+        """
+        results = [None] * len(texts)
+        pending = OrderedDict()  # text -> indices still waiting for a translation
+
+        with self._lock:
+            for i, text in enumerate(texts):
+                if not text or not text.strip():
+                    results[i] = text
+                    continue
+                key = (text, source, target)
+                if key in self._memo:
+                    self._memo.move_to_end(key)
+                    results[i] = self._memo[key]
+                    self.hits += 1
+                else:
+                    if text not in pending:
+                        self.misses += 1
+                    pending.setdefault(text, []).append(i)
+
+        count_cache("translation", "hit", len(texts) - sum(len(indices) for indices in pending.values()))
+        count_cache("translation", "miss", len(pending))
+
+        for chunk in self._pack(list(pending)):
+            translations = self._translate_chunk(chunk, source, target)
+            with self._lock:
+                for text, translated in zip(chunk, translations):
+                    self._remember((text, source, target), translated)
+                    for i in pending[text]:
+                        results[i] = translated
+
+        return results
+
+    def _pack(self, texts: list) -> list:
+        """Greedily group texts into chunks whose joined length fits the backend limit."""
+        chunks, current, size = [], [], 0
+        for text in texts:
+            extra = len(text) + (len(_SEPARATOR) if current else 0)
+            if current and size + extra > self.max_chars:
+                chunks.append(current)
+                current, size = [], 0
+                extra = len(text)
+            current.append(text)
+            size += extra
+        if current:
+            chunks.append(current)
+        return chunks
+
+    @timed("translation")
+    def _translate_chunk(self, chunk: list, source: str, target: str) -> list:
+        """Translate one packed chunk and split it back into per-text results."""
+        self._count_request()
+        if len(chunk) == 1:
+            return [self.backend.translate(chunk[0], source, target)]
+
+        joined = _SEPARATOR.join(" ".join(text.split()) for text in chunk)
+        translated = self.backend.translate(joined, source, target) or ""
+        parts = [part.strip() for part in translated.split(_SEPARATOR) if part.strip()]
+        if len(parts) == len(chunk):
+            return parts
+
+        # The backend merged or split lines; fall back to one request per text
+        print(f"⚠ Packed translation returned {len(parts)} segments for {len(chunk)} texts, retrying individually.")
+        results = []
+        for text in chunk:
+            self._count_request()
+            results.append(self.backend.translate(text, source, target))
+        return results
+
+    def _count_request(self) -> None:
+        """Count one backend round-trip (translations may run concurrently)."""
+        with self._lock:
+            self.requests += 1
+
+    def _remember(self, key: tuple, value: str) -> None:
+        """Insert into the memo cache, evicting the least recently used entry when full."""
+        self._memo[key] = value
+        self._memo.move_to_end(key)
+        while len(self._memo) > self.cache_size:
+            self._memo.popitem(last=False)
+
+    def stats(self) -> dict:
+        """
+        Report memo cache and request counters.
+
+        Returns:
+            dict: Hits, misses, backend requests and cached entry count.
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "requests": self.requests, "entries": len(self._memo)}
+
+
+_TRANSLATOR = None
+_TRANSLATOR_LOCK = threading.Lock()
+
+
+def get_translator() -> BatchTranslator:
+    """Return the process-wide translator, creating it with the Google backend on first use."""
+    global _TRANSLATOR
+    with _TRANSLATOR_LOCK:
+        if _TRANSLATOR is None:
+            _TRANSLATOR = BatchTranslator()
+        return _TRANSLATOR
+
+
+def set_translation_backend(backend) -> BatchTranslator:
+    """
+    Replace the process-wide translator backend (e.g. with a local stand-in for tests).
+
+    Args:
+        backend: Object with a `translate(text, source, target)` method.
+
+    Returns:
+        BatchTranslator: The new process-wide translator.
+    """
+    global _TRANSLATOR
+    with _TRANSLATOR_LOCK:
+        _TRANSLATOR = BatchTranslator(backend)
+        return _TRANSLATOR
+
+
+def translate_texts(texts: list, target: str = "hi", source: str = "auto") -> list:
+    """
+    Translate a list of texts through the shared batching translator.
+
+    Args:
+        texts (list): Texts to translate.
+        target (str): Target language code.
+        source (str): Source language code ("auto" to detect).
+
+    Returns:
+        list: Translations in input order.
+    """
+    return get_translator().translate_batch(texts, target=target, source=source)
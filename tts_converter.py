@@ -1,34 +1,574 @@
+import hashlib
+import json
+import math
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, TimeoutError as FutureTimeoutError, wait
+
 from gtts import gTTS
-from deep_translator import GoogleTranslator
 
+from metrics import count_cache, submit_in_context, timed
+from translation import TRANSLATION_HOST, translate_texts
+from upstream import get_upstream
+from utils import split_sentences
+
+# On-disk audio cache location and byte budget (overridable via environment)
+TTS_CACHE_DIR = os.environ.get("TTS_CACHE_DIR", "tts_cache")
+TTS_CACHE_MAX_BYTES = int(os.environ.get("TTS_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+
+# Bounded worker pool for batch conversion and the default per-item timeout (seconds)
+TTS_MAX_WORKERS = int(os.environ.get("TTS_MAX_WORKERS", 8))
+TTS_ITEM_TIMEOUT = float(os.environ.get("TTS_ITEM_TIMEOUT", 30))
+
+# Seconds between directory rescans; other workers' writes count towards the budget after at most this long
+TTS_CACHE_RESCAN_SECONDS = float(os.environ.get("TTS_CACHE_RESCAN_SECONDS", 60))
+
+# Network timeout of each gTTS request, so a hung request can't hold a worker forever
+TTS_REQUEST_TIMEOUT = float(os.environ.get("TTS_REQUEST_TIMEOUT", 15))
+
+# Streaming mode: the first chunk is kept to one sentence so audio starts quickly
+TTS_STREAM_CHUNK_CHARS = int(os.environ.get("TTS_STREAM_CHUNK_CHARS", 400))
+_STREAM_READ_BYTES = 64 * 1024
+
+
+def _normalize_text(text: str) -> str:
+    """Collapse whitespace so trivially different summaries share one cache entry."""
+    return " ".join(text.split())
 
-def text_to_speech_hindi(text: str, filename: str = "output.mp3") -> None:
+
+class AudioCache:
+    """
+    Content-addressed, size-bounded MP3 cache with LRU eviction.
+
+    Entries are keyed by a hash of (normalized text, source language, target language, voice),
+    so the same summary is only translated and synthesized once across requests and processes.
+    Files are written to a temporary name and atomically renamed into place, and recency is
+    tracked through file modification times. Writes update the in-memory index; the directory
+    is rescanned before evicting (and at least every `TTS_CACHE_RESCAN_SECONDS`), so concurrent
+    workers share one LRU order and one byte budget.
     """
-    Converts English text to Hindi speech and saves it as an audio file.
-    
+
+    def __init__(self, cache_dir: str = TTS_CACHE_DIR, max_bytes: int = TTS_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._entries = None  # OrderedDict of key -> size, oldest first (loaded lazily)
+        self._total_bytes = 0
+        self._scanned_at = 0.0
+
+    @staticmethod
+    def make_key(text: str, source: str = "auto", target: str = "hi", voice: str = "hi") -> str:
+        """
+        Build the content hash for a cache entry.
+
+        Args:
+            text (str): The source text to be spoken.
+            source (str): Source language code used for translation.
+            target (str): Target language code used for translation.
+            voice (str): Voice identifier used for synthesis.
+
+        Returns:
+            str: Hex digest identifying the audio for these inputs.
+        """
+        payload = json.dumps([_normalize_text(text), source, target, voice], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def path_for(self, key: str) -> str:
+        """Return the on-disk path of the MP3 for a cache key."""
+        return os.path.join(self.cache_dir, f"{key}.mp3")
+
+    def _load(self, refresh: bool = False) -> None:
+        """
+        Index the existing cache directory, ordered from least to most recently used.
+
+        Args:
+            refresh (bool): Rescan even if already indexed, picking up other workers' files.
+        """
+        if self._entries is not None and not refresh:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        found = []
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.is_file() and entry.name.endswith(".mp3"):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue  # Evicted by another worker mid-scan
+                    found.append((stat.st_mtime, entry.name[:-4], stat.st_size))
+        found.sort()
+        self._entries = OrderedDict((key, size) for _, key, size in found)
+        self._total_bytes = sum(size for _, _, size in found)
+        self._scanned_at = time.monotonic()
+
+    def get(self, key: str):
+        """
+        Look up a cached MP3 and mark it as recently used.
+
+        Args:
+            key (str): Cache key from `make_key`.
+
+        Returns:
+            str | None: Path to the cached file, or None on a miss.
+        """
+        path = self.path_for(key)
+        with self._lock:
+            self._load()
+            if os.path.exists(path):
+                try:
+                    os.utime(path)  # Bump recency for other processes sharing the directory
+                except OSError:
+                    pass
+                if key not in self._entries:
+                    self._entries[key] = os.path.getsize(path)
+                    self._total_bytes += self._entries[key]
+                self._entries.move_to_end(key)
+                self.hits += 1
+                count_cache("audio", "hit")
+                return path
+
+            # File vanished (evicted by another worker) – forget it
+            if key in self._entries:
+                self._total_bytes -= self._entries.pop(key)
+            self.misses += 1
+            count_cache("audio", "miss")
+            return None
+
+    def put(self, key: str, writer) -> str:
+        """
+        Store a new entry by calling `writer(tmp_path)` and atomically publishing the result.
+
+        Args:
+            key (str): Cache key from `make_key`.
+            writer (callable): Function that writes the MP3 to the given temporary path.
+
+        Returns:
+            str: Path to the cached file.
+        """
+        with self._lock:
+            self._load()
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        os.close(fd)
+        try:
+            writer(tmp_path)
+            path = self.path_for(key)
+            size = os.path.getsize(tmp_path)
+            os.replace(tmp_path, path)  # Atomic on POSIX and Windows
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        with self._lock:
+            self._total_bytes += size - self._entries.pop(key, 0)
+            self._entries[key] = size
+            if self._total_bytes > self.max_bytes or time.monotonic() - self._scanned_at > TTS_CACHE_RESCAN_SECONDS:
+                # Rescan so files written (and recency bumped) by other workers count towards the budget
+                self._load(refresh=True)
+            self._evict(keep=key)
+        return path
+
+    def _evict(self, keep: str) -> None:
+        """Remove least recently used entries until the cache fits its byte budget."""
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            key, size = next(iter(self._entries.items()))
+            if key == keep:
+                break
+            del self._entries[key]
+            self._total_bytes -= size
+            try:
+                os.remove(self.path_for(key))
+            except FileNotFoundError:
+                pass
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        """
+        Report cache counters.
+
+        Returns:
+            dict: Hits, misses, evictions, entry count and total bytes held.
+        """
+        with self._lock:
+            self._load()
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+# Shared cache instance for all callers in this process
+AUDIO_CACHE = AudioCache()
+
+
+@timed("synthesis")
+def _synthesize(key: str, translated_text: str) -> str:
+    """Generate Hindi speech for already-translated text and store it in the audio cache."""
+    tts = gTTS(text=translated_text, lang="hi", timeout=TTS_REQUEST_TIMEOUT)
+    audio_path = AUDIO_CACHE.put(key, lambda path: get_upstream(TRANSLATION_HOST).call(tts.save, path))
+    print(f"✅ Speech saved as {audio_path}")
+    return audio_path
+
+
+def text_to_speech_hindi(text: str, filename: str = None):
+    """
+    Converts English text to Hindi speech and returns the path of the audio file.
+
+    Audio is served from the on-disk cache when the same (normalized) text has been
+    synthesized before; otherwise it is translated, synthesized and cached.
+
     Args:
         text (str): The text to convert to speech.
-        filename (str): The output filename for the generated speech (default is "output.mp3").
-    
+        filename (str): Optional path to copy the generated speech to. When omitted,
+            the cached file path is returned directly.
+
     Returns:
-        None
+        str | None: Path to the MP3 file, or None if conversion failed.
     """
     if not text:
         print("⚠ No text provided for TTS conversion.")
-        return
+        return None
 
     try:
-        # 🔹 Translate English text to Hindi
-        translated_text = GoogleTranslator(source="auto", target="hi").translate(text)
+        key = AUDIO_CACHE.make_key(text, source="auto", target="hi", voice="hi")
+        audio_path = AUDIO_CACHE.get(key)
+
+        if audio_path is None:
+            # 🔹 Translate English text to Hindi
+            translated_text = translate_texts([text], target="hi")[0]
 
-        # 🔹 Generate Hindi speech
-        tts = gTTS(text=translated_text, lang="hi")
+            # 🔹 Generate Hindi speech and save it into the cache
+            audio_path = _synthesize(key, translated_text)
 
-        # 🔹 Save the file
-        tts.save(filename)
-        print(f"✅ Speech saved as {filename}")
+        if filename:
+            shutil.copyfile(audio_path, filename)
+            return filename
+        return audio_path
 
     except Exception as e:
         print(f"❌ Error in TTS conversion: {e}")
+        return None
+
+
+_TTS_POOL = None
+_TTS_POOL_LOCK = threading.Lock()
+
+
+def _get_pool() -> ThreadPoolExecutor:
+    """Create the shared TTS worker pool on first use."""
+    global _TTS_POOL
+    with _TTS_POOL_LOCK:
+        if _TTS_POOL is None:
+            _TTS_POOL = ThreadPoolExecutor(max_workers=TTS_MAX_WORKERS, thread_name_prefix="tts")
+        return _TTS_POOL
+
+
+def text_to_speech_hindi_batch(texts: list, timeout: float = TTS_ITEM_TIMEOUT) -> list:
+    """
+    Converts a list of English texts to Hindi speech concurrently.
+
+    Cached audio is returned immediately. All remaining texts are translated together in
+    packed requests, then synthesized on a bounded thread pool, so the batch takes roughly
+    as long as its slowest item rather than the sum of all items. Identical texts are only
+    converted once.
+
+    Args:
+        texts (list): The texts to convert to speech.
+        timeout (float): Maximum seconds each synthesis may run once it has started. Items still
+            queued after `timeout` times the number of worker rounds the batch needs are given up.
+
+    Returns:
+        list: Audio file paths in input order (None for items that failed or timed out).
+
+    Raises:
+        TypeError: If an item is not a string.
+    """
+    paths = [None] * len(texts)
+    for index, path in text_to_speech_hindi_as_completed(texts, timeout):
+        paths[index] = path
+    return paths
+
+
+def text_to_speech_hindi_as_completed(texts: list, timeout: float = TTS_ITEM_TIMEOUT):
+    """
+    Converts a list of English texts to Hindi speech, yielding each result as soon as it is ready.
+
+    Works like `text_to_speech_hindi_batch` (same caching, translation batching and timeouts),
+    but lets callers show each item without waiting for the slowest one.
+
+    Yields:
+        tuple: `(index, path)` once per input, cached and empty texts first, the rest in
+            completion order (path is None for items that failed or timed out).
+
+    Raises:
+        TypeError: If an item is not a string.
+    """
+    if not all(isinstance(text, str) for text in texts if text):
+        raise TypeError("texts must be strings")
+    positions = {}
+    for index, text in enumerate(texts):
+        if text:
+            positions.setdefault(text, []).append(index)
+        else:
+            yield index, None
+    keys = {text: AUDIO_CACHE.make_key(text, source="auto", target="hi", voice="hi") for text in positions}
+
+    missing = []
+    for text in positions:
+        path = AUDIO_CACHE.get(keys[text])
+        if path is None:
+            missing.append(text)
+        else:
+            yield from ((index, path) for index in positions[text])
+    if not missing:
+        return
+
+    try:
+        # 🔹 Translate every uncached text in as few requests as possible
+        translations = dict(zip(missing, translate_texts(missing, target="hi")))
+    except Exception as e:
+        print(f"❌ Error in TTS translation: {e}")
+        yield from ((index, None) for text in missing for index in positions[text])
+        return
+
+    started = {}
+
+    def run(text):
+        started[text] = time.monotonic()
+        try:
+            return _synthesize(keys[text], translations[text])
+        except Exception as e:
+            print(f"❌ Error in TTS conversion: {e}")
+            return None
+
+    pool = _get_pool()
+    pending = {submit_in_context(pool, run, text): text for text in missing}
+    # Items queued behind busy workers (possibly other requests' items) must start by this deadline
+    queue_deadline = time.monotonic() + timeout * math.ceil(len(missing) / TTS_MAX_WORKERS)
+
+    def deadline(text):
+        # A started item gets its full timeout; a queued one waits until the queue deadline
+        start = started.get(text)
+        return queue_deadline if start is None else start + timeout
+
+    while pending:
+        nearest = min(deadline(text) for text in pending.values())
+        done, _ = wait(pending, timeout=max(nearest - time.monotonic(), 0), return_when=FIRST_COMPLETED)
+        for future in done:
+            text = pending.pop(future)
+            yield from ((index, future.result()) for index in positions[text])
+
+        now = time.monotonic()
+        for future, text in list(pending.items()):
+            if deadline(text) > now:
+                continue
+            del pending[future]
+            future.cancel()
+            print(f"❌ TTS conversion timed out after {timeout}s" if text in started else "❌ TTS conversion never started")
+            yield from ((index, None) for index in positions[text])
+
+
+_STREAM_STATS = {"streams": 0, "first_byte_total": 0.0, "first_byte_last": None, "truncated": 0}
+_STREAM_STATS_LOCK = threading.Lock()
+
+
+def _record_first_byte(seconds: float) -> None:
+    """Track time-to-first-audio-byte for streaming conversions."""
+    with _STREAM_STATS_LOCK:
+        _STREAM_STATS["streams"] += 1
+        _STREAM_STATS["first_byte_total"] += seconds
+        _STREAM_STATS["first_byte_last"] = seconds
+    print(f"⏱ First audio byte after {seconds * 1000:.0f} ms")
+
+
+def _record_truncated(sent: int, total: int, reason: str) -> None:
+    """Count and log a stream that ended before all of its chunks were sent."""
+    with _STREAM_STATS_LOCK:
+        _STREAM_STATS["truncated"] += 1
+    print(f"⚠ TTS stream truncated after {sent} of {total} chunks: {reason}")
+
+
+def stream_stats() -> dict:
+    """
+    Report first-audio-byte latency of streaming conversions.
+
+    Returns:
+        dict: Number of streams, last and average first-byte latency in milliseconds, and the
+              number of streams that ended early.
+    """
+    with _STREAM_STATS_LOCK:
+        streams = _STREAM_STATS["streams"]
+        last = _STREAM_STATS["first_byte_last"]
+        return {
+            "streams": streams,
+            "first_byte_ms_last": round(last * 1000, 1) if last is not None else None,
+            "first_byte_ms_avg": round(_STREAM_STATS["first_byte_total"] / streams * 1000, 1) if streams else None,
+            "truncated": _STREAM_STATS["truncated"],
+        }
+
+
+def _chunk_sentences(text: str, max_chars: int = TTS_STREAM_CHUNK_CHARS) -> list:
+    """Split text into speech chunks: the first sentence alone, then sentences packed up to `max_chars`."""
+    sentences = split_sentences(text)
+    if not sentences:
+        return []
+    chunks, current = [sentences[0]], ""
+    for sentence in sentences[1:]:
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            chunks.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+@timed("synthesis")
+def _synthesize_bytes(translated_text: str) -> bytes:
+    """Generate Hindi speech for already-translated text as MP3 bytes."""
+    return get_upstream(TRANSLATION_HOST).call(lambda: b"".join(gTTS(text=translated_text, lang="hi", timeout=TTS_REQUEST_TIMEOUT).stream()))
+
+
+def _iter_cached_speech(path: str, start: float):
+    """Stream cached MP3 data from disk, recording time-to-first-byte."""
+    with open(path, "rb") as f:
+        data = f.read(_STREAM_READ_BYTES)
+        _record_first_byte(time.monotonic() - start)
+        while data:
+            yield data
+            data = f.read(_STREAM_READ_BYTES)
+
+
+def iter_speech_hindi(text: str):
+    """
+    Convert English text to Hindi speech, returning an iterator of MP3 data that yields each
+    part as soon as it is ready.
+
+    The text is split on sentence boundaries. The first sentence is translated and synthesized
+    before this function returns, so an upstream failure is raised to the caller instead of
+    producing an empty stream. The remaining chunks are translated together in the background
+    and synthesized in parallel; their audio is yielded in order. The complete audio is stored
+    in the cache afterwards, and cached audio is streamed straight from disk.
+
+    A later chunk can still fail once the response has started. The stream then ends early
+    with incomplete audio (logged and counted in `stream_stats`), and nothing is cached.
+
+    Args:
+        text (str): The text to convert to speech.
+
+    Returns:
+        Iterator[bytes]: Consecutive pieces of one MP3 stream.
+
+    Raises:
+        UpstreamError: If Google Translate / gTTS is unavailable (circuit open or no slot).
+        Exception: If the first sentence cannot be translated or synthesized.
+    """
+    if not text:
+        print("⚠ No text provided for TTS conversion.")
+        return iter(())
+
+    start = time.monotonic()
+    key = AUDIO_CACHE.make_key(text, source="auto", target="hi", voice="hi")
+
+    cached_path = AUDIO_CACHE.get(key)
+    if cached_path:
+        return _iter_cached_speech(cached_path, start)
+
+    chunks = _chunk_sentences(text)
+    pool = _get_pool()
+    rest_futures = []
+    rest_ready = threading.Event()
+    cancelled = threading.Event()
+    rest_lock = threading.Lock()
+
+    def schedule_rest(translation_future):
+        # Runs when the background translation finishes: start synthesizing every remaining chunk
+        if translation_future.cancelled():
+            rest_ready.set()
+            return
+        try:
+            translations = translation_future.result()
+            with rest_lock:
+                if not cancelled.is_set():
+                    rest_futures.extend(submit_in_context(pool, _synthesize_bytes, translated) for translated in translations)
+        except Exception as e:
+            print(f"❌ Error in TTS translation: {e}")
+        finally:
+            rest_ready.set()
+
+    def cancel_rest():
+        # The client is gone (or the stream failed): don't synthesize audio nobody will read
+        with rest_lock:
+            cancelled.set()
+            for future in rest_futures:
+                future.cancel()
+
+    if len(chunks) > 1:
+        translation_future = submit_in_context(pool, translate_texts, chunks[1:], "hi")
+        translation_future.add_done_callback(schedule_rest)
+    else:
+        translation_future = None
+        rest_ready.set()
+
+    try:
+        # 🔹 Translate and speak the first sentence before the response starts
+        first_translation = translate_texts(chunks[:1], target="hi")[0]
+        # Read fully inside the upstream slot, so a slow client never holds the slot while reading
+        first_audio = get_upstream(TRANSLATION_HOST).call(lambda: list(gTTS(text=first_translation, lang="hi", timeout=TTS_REQUEST_TIMEOUT).stream()))
+    except Exception:
+        cancel_rest()
+        if translation_future is not None:
+            translation_future.cancel()
+        raise
+
+    def stream():
+        audio = []
+        try:
+            for i, piece in enumerate(first_audio):
+                if i == 0:
+                    _record_first_byte(time.monotonic() - start)
+                audio.append(piece)
+                yield piece
+
+            # 🔹 Then the rest, in order, as each chunk finishes synthesizing
+            rest_ready.wait()
+            if len(rest_futures) != len(chunks) - 1:
+                _record_truncated(1, len(chunks), "translation of the remaining text failed")
+                return
+            for n, future in enumerate(rest_futures, start=1):
+                try:
+                    piece = future.result(timeout=TTS_ITEM_TIMEOUT)
+                except FutureTimeoutError:
+                    _record_truncated(n, len(chunks), f"synthesis timed out after {TTS_ITEM_TIMEOUT}s")
+                    cancel_rest()
+                    return
+                except Exception as e:
+                    _record_truncated(n, len(chunks), f"synthesis failed: {e}")
+                    cancel_rest()
+                    return
+                audio.append(piece)
+                yield piece
+        except GeneratorExit:
+            cancel_rest()
+            raise
+
+        def write_audio(path):
+            with open(path, "wb") as f:
+                f.writelines(audio)
 
+        AUDIO_CACHE.put(key, write_audio)
 
+    return stream()
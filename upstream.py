@@ -0,0 +1,467 @@
+import json
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+import requests
+
+from metrics import REGISTRY
+
+# Default per-host limits: sustained requests per second and burst size of the token bucket
+UPSTREAM_RATE = float(os.environ.get("UPSTREAM_RATE", 5))
+UPSTREAM_BURST = float(os.environ.get("UPSTREAM_BURST", 10))
+
+# Adaptive (AIMD) concurrency: starting point and bounds of concurrent requests per host
+UPSTREAM_INITIAL_CONCURRENCY = int(os.environ.get("UPSTREAM_INITIAL_CONCURRENCY", 4))
+UPSTREAM_MIN_CONCURRENCY = int(os.environ.get("UPSTREAM_MIN_CONCURRENCY", 1))
+UPSTREAM_MAX_CONCURRENCY = int(os.environ.get("UPSTREAM_MAX_CONCURRENCY", 16))
+
+# Retries of transient failures, with full-jitter exponential backoff between attempts
+UPSTREAM_RETRIES = int(os.environ.get("UPSTREAM_RETRIES", 3))
+UPSTREAM_BACKOFF_BASE = float(os.environ.get("UPSTREAM_BACKOFF_BASE", 0.5))
+UPSTREAM_BACKOFF_MAX = float(os.environ.get("UPSTREAM_BACKOFF_MAX", 10))
+
+# Consecutive failures that open a host's circuit, and how long it stays open before a probe
+UPSTREAM_BREAKER_FAILURES = int(os.environ.get("UPSTREAM_BREAKER_FAILURES", 5))
+UPSTREAM_BREAKER_RESET = float(os.environ.get("UPSTREAM_BREAKER_RESET", 30))
+
+# Longest wait for a concurrency slot before giving up
+UPSTREAM_QUEUE_TIMEOUT = float(os.environ.get("UPSTREAM_QUEUE_TIMEOUT", 30))
+
+# Most untracked hosts (e.g. article sites) kept at once; the least recently used are forgotten
+UPSTREAM_MAX_HOSTS = int(os.environ.get("UPSTREAM_MAX_HOSTS", 256))
+
+# Metrics label shared by all untracked hosts, so arbitrary host names don't create new series
+_UNTRACKED_LABEL = "other"
+
+# Keys accepted in the per-host UPSTREAM_HOST_LIMITS overrides (parsed and checked below)
+_HOST_LIMIT_KEYS = {"rate", "burst", "max_concurrency", "retries"}
+
+# The limit is cut at most once per this many seconds, so one burst of errors counts as one signal
+_DECREASE_COOLDOWN = 1.0
+
+_BREAKER_STATES = {"closed": 0, "half_open": 1, "open": 2}
+
+REGISTRY.describe("newsapp_upstream_requests_total", "counter", "Upstream requests by host and outcome.")
+REGISTRY.describe("newsapp_upstream_retries_total", "counter", "Upstream request retries by host.")
+REGISTRY.describe("newsapp_upstream_rejected_total", "counter", "Upstream requests refused locally (open circuit or no slot).")
+REGISTRY.describe("newsapp_upstream_fallbacks_total", "counter", "Cached results served because a host was failing.")
+REGISTRY.describe("newsapp_upstream_request_seconds", "histogram", "Upstream request latency by host.")
+REGISTRY.describe("newsapp_upstream_wait_seconds", "histogram", "Time spent waiting for a rate-limit token or slot.")
+
+
+class UpstreamError(Exception):
+    """Raised when an upstream host cannot be called (circuit open, or no slot in time)."""
+
+    def __init__(self, message: str, retry_after: float = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(UpstreamError):
+    """Raised without calling the host while its circuit breaker is open."""
+
+
+class UpstreamUnavailable(UpstreamError):
+    """Raised when every request of an operation failed, rather than reporting an empty result."""
+
+
+def _status_code(exc: Exception):
+    """HTTP status carried by a requests, gTTS or similar exception (None if there is none)."""
+    for attr in ("response", "rsp"):
+        status = getattr(getattr(exc, attr, None), "status_code", None)
+        if status is not None:
+            return status
+    return None
+
+
+def classify(exc: Exception) -> str:
+    """
+    Sort an exception from an upstream call into the outcome the limiters react to.
+
+    Returns:
+        str: "throttled" (429/503, timeouts, explicit rate-limit errors), "failed" (other
+             transient upstream failures) or "error" (anything the host's health doesn't explain,
+             such as a 404 or bad input).
+    """
+    status = _status_code(exc)
+    if status is not None:
+        if status in (429, 503):
+            return "throttled"
+        return "failed" if status >= 500 or status == 408 else "error"
+    if isinstance(exc, requests.Timeout) or type(exc).__name__ == "TooManyRequests":
+        return "throttled"
+    if isinstance(exc, (requests.RequestException, ConnectionError, TimeoutError)):
+        return "failed"
+    if type(exc).__name__ in ("gTTSError", "RequestError"):  # Network failures of gTTS / deep_translator
+        return "failed"
+    return "error"
+
+
+def _retry_after(exc: Exception):
+    """Seconds requested by a Retry-After header on the exception's response, if any."""
+    for attr in ("response", "rsp"):
+        headers = getattr(getattr(exc, attr, None), "headers", None) or {}
+        try:
+            return float(headers["Retry-After"])
+        except (KeyError, TypeError, ValueError):
+            continue
+    return None
+
+
+class TokenBucket:
+    """Token bucket rate limiter: `rate` tokens per second, holding at most `burst`."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        """Add the tokens earned since the last update (caller holds the lock)."""
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self) -> float:
+        """
+        Take one token, sleeping until one is available.
+
+        Returns:
+            float: Seconds spent waiting.
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every caller for `seconds` (e.g. honoring a Retry-After header)."""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self._tokens, -seconds * self.rate)
+
+    @property
+    def tokens(self) -> float:
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+
+class AdaptiveLimiter:
+    """
+    Concurrency limit adjusted by additive increase / multiplicative decrease (AIMD).
+
+    Every successful request raises the limit by 1/limit (about one slot per round of requests);
+    a throttled or failed request halves it, at most once per `_DECREASE_COOLDOWN` seconds.
+    """
+
+    def __init__(
+        self,
+        initial: int = UPSTREAM_INITIAL_CONCURRENCY,
+        minimum: int = UPSTREAM_MIN_CONCURRENCY,
+        maximum: int = UPSTREAM_MAX_CONCURRENCY,
+        backoff: float = 0.5,
+    ):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.backoff = backoff
+        self.limit = float(min(max(initial, minimum), maximum))
+        self.in_flight = 0
+        self._last_decrease = 0.0
+        self._changed = threading.Condition()
+
+    def acquire(self, timeout: float = None) -> bool:
+        """Wait for a free slot; returns False if none freed up within `timeout` seconds."""
+        with self._changed:
+            if not self._changed.wait_for(lambda: self.in_flight < int(self.limit), timeout):
+                return False
+            self.in_flight += 1
+            return True
+
+    def release(self, outcome: str) -> None:
+        """Free a slot and adapt the limit to the request's outcome."""
+        with self._changed:
+            self.in_flight -= 1
+            if outcome == "ok":
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            elif outcome in ("throttled", "failed"):
+                now = time.monotonic()
+                if now - self._last_decrease >= _DECREASE_COOLDOWN:
+                    self.limit = max(self.minimum, self.limit * self.backoff)
+                    self._last_decrease = now
+            self._changed.notify_all()
+
+
+class CircuitBreaker:
+    """
+    Stops calls to a failing host.
+
+    After `failure_threshold` consecutive failures the circuit opens and calls are refused for
+    `reset_timeout` seconds. Then a single probe is let through (half-open): success closes the
+    circuit, failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int = UPSTREAM_BREAKER_FAILURES, reset_timeout: float = UPSTREAM_BREAKER_RESET):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead now."""
+        with self._lock:
+            if self.state == "open" and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state, self._probing = "half_open", False
+            if self.state == "half_open":
+                if self._probing:
+                    return False
+                self._probing = True
+            return self.state != "open"
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state, self.failures, self._probing = "closed", 0, False
+
+    def record_inconclusive(self) -> None:
+        """A call that says nothing about the host's health (e.g. a 404): keep the state, free the probe."""
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    print(f"⚠ Circuit opened after {self.failures} consecutive upstream failures")
+                self.state, self._opened_at, self._probing = "open", time.monotonic(), False
+
+    def retry_after(self) -> float:
+        """Seconds until an open circuit lets a probe through (0 when not open)."""
+        with self._lock:
+            if self.state != "open":
+                return 0.0
+            return max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+
+
+class Upstream:
+    """
+    Client-side protection for one upstream host.
+
+    Every call takes a concurrency slot from an `AdaptiveLimiter` and a token from a
+    `TokenBucket`, and is refused outright while the host's `CircuitBreaker` is open. `call`
+    adds retries of transient failures with jittered exponential backoff.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        rate: float = UPSTREAM_RATE,
+        burst: float = UPSTREAM_BURST,
+        max_concurrency: int = UPSTREAM_MAX_CONCURRENCY,
+        retries: int = UPSTREAM_RETRIES,
+        label: str = None,
+    ):
+        self.host = host
+        self.label = label or host  # "host" label of this upstream's metrics
+        self.retries = retries
+        self.bucket = TokenBucket(rate, burst)
+        self.limiter = AdaptiveLimiter(initial=min(UPSTREAM_INITIAL_CONCURRENCY, max_concurrency), maximum=max_concurrency)
+        self.breaker = CircuitBreaker()
+
+    def _reject(self, reason: str, exc: UpstreamError):
+        """Count a locally refused request and raise `exc`."""
+        REGISTRY.inc("newsapp_upstream_rejected_total", host=self.label, reason=reason)
+        raise exc
+
+    @contextmanager
+    def slot(self):
+        """
+        Guard one request to the host (no retries); the body of the `with` block makes the request.
+
+        Raises:
+            CircuitOpenError: If the circuit is open.
+            UpstreamError: If no concurrency slot freed up within `UPSTREAM_QUEUE_TIMEOUT`.
+        """
+        if self.breaker.retry_after() > 0:  # Fail fast instead of queueing for a slot
+            self._reject("circuit_open", CircuitOpenError(f"{self.host} is unavailable", self.breaker.retry_after()))
+
+        start = time.perf_counter()
+        if not self.limiter.acquire(UPSTREAM_QUEUE_TIMEOUT):
+            self._reject("busy", UpstreamError(f"No free connection slot for {self.host}", UPSTREAM_QUEUE_TIMEOUT))
+        if not self.breaker.allow():
+            self.limiter.release("rejected")
+            self._reject("circuit_open", CircuitOpenError(f"{self.host} is unavailable", self.breaker.retry_after()))
+        self.bucket.acquire()
+        REGISTRY.observe("newsapp_upstream_wait_seconds", time.perf_counter() - start, host=self.label)
+
+        outcome = "ok"
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            outcome = classify(e)
+            retry_after = _retry_after(e)
+            if retry_after:
+                self.bucket.pause(retry_after)
+            raise
+        finally:
+            self.limiter.release(outcome)
+            if outcome in ("throttled", "failed"):
+                self.breaker.record_failure()
+            elif outcome == "ok":
+                self.breaker.record_success()
+            else:
+                # A 404 or bad input doesn't prove the host healthy, so it mustn't close a half-open circuit
+                self.breaker.record_inconclusive()
+            REGISTRY.inc("newsapp_upstream_requests_total", host=self.label, result=outcome)
+            REGISTRY.observe("newsapp_upstream_request_seconds", time.perf_counter() - start, host=self.label)
+
+    def call(self, fn, *args, **kwargs):
+        """
+        Call `fn(*args, **kwargs)` against the host, retrying throttled and transient failures.
+
+        Returns:
+            The result of `fn`.
+
+        Raises:
+            CircuitOpenError: If the circuit is (or becomes) open.
+            Exception: The last error of `fn` once retries are exhausted, or any non-transient error.
+        """
+        for attempt in range(self.retries + 1):
+            try:
+                with self.slot():
+                    return fn(*args, **kwargs)
+            except UpstreamError:
+                raise
+            except Exception as e:
+                if attempt == self.retries or classify(e) == "error":
+                    raise
+                delay = _retry_after(e) or random.uniform(0, min(UPSTREAM_BACKOFF_MAX, UPSTREAM_BACKOFF_BASE * 2**attempt))
+                REGISTRY.inc("newsapp_upstream_retries_total", host=self.label)
+                time.sleep(delay)
+
+    def stats(self) -> dict:
+        """
+        Report limiter state.
+
+        Returns:
+            dict: Rate, available tokens, concurrency limit and in-flight requests, circuit
+                  state (0 closed, 1 half-open, 2 open) and consecutive failures.
+        """
+        return {
+            "rate": self.bucket.rate,
+            "tokens": round(self.bucket.tokens, 2),
+            "concurrency_limit": round(self.limiter.limit, 2),
+            "in_flight": self.limiter.in_flight,
+            "circuit_state": _BREAKER_STATES[self.breaker.state],
+            "consecutive_failures": self.breaker.failures,
+        }
+
+
+def _validate_host_limits(limits: dict) -> dict:
+    """
+    Check per-host overrides up front, so a typo fails at startup rather than on the first request.
+
+    Raises:
+        ValueError: If the config is not a host -> {limit: number} mapping of known limits.
+    """
+    if not isinstance(limits, dict):
+        raise ValueError("UPSTREAM_HOST_LIMITS must be a JSON object mapping hosts to limits")
+    for host, overrides in limits.items():
+        if not isinstance(overrides, dict):
+            raise ValueError(f"UPSTREAM_HOST_LIMITS[{host!r}] must be an object")
+        unknown = set(overrides) - _HOST_LIMIT_KEYS
+        if unknown:
+            raise ValueError(
+                f"Unknown UPSTREAM_HOST_LIMITS keys for {host}: {', '.join(sorted(unknown))} "
+                f"(expected {', '.join(sorted(_HOST_LIMIT_KEYS))})"
+            )
+        for key, value in overrides.items():
+            if not isinstance(value, (int, float)) or isinstance(value, bool) or value < (0 if key == "retries" else 1e-9):
+                raise ValueError(f"UPSTREAM_HOST_LIMITS[{host!r}][{key!r}] must be a positive number")
+    return {host.lower(): overrides for host, overrides in limits.items()}
+
+
+# Per-host overrides, e.g. '{"www.bing.com": {"rate": 2, "burst": 4, "max_concurrency": 4}}'
+UPSTREAM_HOST_LIMITS = _validate_host_limits(json.loads(os.environ.get("UPSTREAM_HOST_LIMITS", "{}")))
+
+_UPSTREAMS = {}
+_UNTRACKED_UPSTREAMS = OrderedDict()  # host -> Upstream, least recently used first
+_UPSTREAMS_LOCK = threading.Lock()
+
+
+def get_upstream(host_or_url: str, track: bool = True) -> Upstream:
+    """
+    Return the shared `Upstream` for a host (a URL's host is used when given a URL).
+
+    Limits come from the `UPSTREAM_*` defaults, overridden per host by `UPSTREAM_HOST_LIMITS`.
+
+    Args:
+        host_or_url (str): Host name or URL.
+        track (bool): Keep the host for the life of the process and report it on /metrics. Pass
+            False for hosts taken from outside input (such as article URLs): those are kept in
+            an LRU of `UPSTREAM_MAX_HOSTS` entries and share the "other" metrics label, unless
+            the host is configured in `UPSTREAM_HOST_LIMITS`.
+    """
+    host = urlsplit(host_or_url).netloc.lower() if "://" in host_or_url else host_or_url.lower()
+    with _UPSTREAMS_LOCK:
+        upstream = _UPSTREAMS.get(host)
+        if upstream is not None:
+            return upstream
+        if track or host in UPSTREAM_HOST_LIMITS:
+            upstream = _UPSTREAMS[host] = Upstream(host, **UPSTREAM_HOST_LIMITS.get(host, {}))
+            return upstream
+
+        upstream = _UNTRACKED_UPSTREAMS.get(host)
+        if upstream is None:
+            upstream = _UNTRACKED_UPSTREAMS[host] = Upstream(host, label=_UNTRACKED_LABEL)
+            while len(_UNTRACKED_UPSTREAMS) > UPSTREAM_MAX_HOSTS:
+                _UNTRACKED_UPSTREAMS.popitem(last=False)
+        else:
+            _UNTRACKED_UPSTREAMS.move_to_end(host)
+        return upstream
+
+
+def configure_upstream(host: str, **limits) -> Upstream:
+    """
+    Replace a host's `Upstream` with one using the given limits (e.g. lifting them for a local stand-in).
+
+    Args:
+        host (str): Host name.
+        **limits: `Upstream` keyword arguments (rate, burst, max_concurrency, retries).
+
+    Returns:
+        Upstream: The new upstream for the host.
+    """
+    with _UPSTREAMS_LOCK:
+        _UNTRACKED_UPSTREAMS.pop(host.lower(), None)
+        upstream = _UPSTREAMS[host.lower()] = Upstream(host.lower(), **limits)
+        return upstream
+
+
+def upstream_stats() -> dict:
+    """
+    Report the limiter state of every tracked host called so far.
+
+    Returns:
+        dict: Host -> `Upstream.stats()`.
+    """
+    with _UPSTREAMS_LOCK:
+        upstreams = list(_UPSTREAMS.values())
+    return {upstream.host: upstream.stats() for upstream in upstreams}
@@ -1,6 +1,21 @@
 import re
 import pandas as pd
 from collections import Counter
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+
+import numpy as np
+
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])[\"'”’)]*\s+(?=[\"'“‘(]?[A-Z0-9])")
+
+# Relative ages as shown by news listings ("2h", "3 days ago", "1mo"); months before minutes
+_RELATIVE_AGE = re.compile(
+    r"(\d+)\s*(mo|mon|months?|y|yrs?|years?|w|wks?|weeks?|d|days?|h|hrs?|hours?|m|mins?|minutes?|s|secs?|seconds?)\b",
+    re.IGNORECASE,
+)
+_AGE_UNITS = {"mo": 30 * 86400, "y": 365 * 86400, "w": 7 * 86400, "d": 86400, "h": 3600, "m": 60, "s": 1}
+_ABSOLUTE_DATE = re.compile(r"[A-Z][a-z]{2,8}\.? \d{1,2}, \d{4}|\d{1,2} [A-Z][a-z]{2,8}\.? \d{4}|\d{4}-\d{2}-\d{2}")
+_ABSOLUTE_FORMATS = ("%b %d, %Y", "%B %d, %Y", "%d %b %Y", "%d %B %Y", "%Y-%m-%d")
 
 
 def clean_text(text: str) -> str:
@@ -17,6 +32,20 @@ def clean_text(text: str) -> str:
     return text.replace("\n", " ")
 
 
+def split_sentences(text: str) -> list:
+    """
+    Splits text into sentences on terminal punctuation followed by a capitalized word.
+
+    Args:
+        text (str): The text to split.
+
+    Returns:
+        list: Non-empty sentences in order.
+    """
+    text = re.sub(r'\s+', ' ', text).strip()
+    return [sentence.strip() for sentence in _SENTENCE_BOUNDARY.split(text) if sentence.strip()]
+
+
 def format_timestamp(timestamp: str) -> str:
     """
     Formats a timestamp string into a more readable date format (YYYY-MM-DD).
@@ -30,6 +59,63 @@ def format_timestamp(timestamp: str) -> str:
     return timestamp.split("T")[0] if timestamp else "Unknown"
 
 
+def parse_timestamp(timestamp: str, now: datetime = None):
+    """
+    Parses the timestamp text of a news listing into an ISO-8601 UTC datetime.
+
+    Understands RSS dates ("Tue, 04 Mar 2025 10:00:00 GMT"), ISO dates, absolute dates
+    ("Mar 4, 2025") and relative ages ("2h", "3 days ago", "Yesterday") found anywhere in the text.
+
+    Args:
+        timestamp (str): The raw timestamp text.
+        now (datetime): Reference time for relative ages (defaults to the current UTC time).
+
+    Returns:
+        str | None: "YYYY-MM-DDTHH:MM:SSZ", or None if no date could be recognized.
+    """
+    if not timestamp:
+        return None
+    text = timestamp.strip()
+    now = now or datetime.now(timezone.utc)
+    parsed = None
+
+    try:
+        parsed = parsedate_to_datetime(text)
+    except (TypeError, ValueError, IndexError):
+        try:
+            parsed = datetime.fromisoformat(text.replace("Z", "+00:00"))
+        except ValueError:
+            pass
+
+    if parsed is None:
+        match = _ABSOLUTE_DATE.search(text)
+        if match:
+            for fmt in _ABSOLUTE_FORMATS:
+                try:
+                    parsed = datetime.strptime(match.group(0).replace(".", ""), fmt)
+                    break
+                except ValueError:
+                    continue
+
+    if parsed is None:
+        lowered = text.lower()
+        match = _RELATIVE_AGE.search(text)
+        if match:
+            unit = match.group(2).lower()
+            unit = "mo" if unit.startswith("mo") else unit[0]
+            parsed = now - timedelta(seconds=int(match.group(1)) * _AGE_UNITS[unit])
+        elif "yesterday" in lowered:
+            parsed = now - timedelta(days=1)
+        elif "just now" in lowered or "today" in lowered:
+            parsed = now
+
+    if parsed is None:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
 def extract_top_keywords(text: str, top_n: int = 5) -> dict:
     """
     Extracts the top N keywords from the given text based on word frequency analysis.
@@ -56,10 +142,15 @@ def format_sentiment_trends(sentiment_trends: dict) -> pd.DataFrame:
     Returns:
         pd.DataFrame: A sorted DataFrame with columns ['Date', 'Positive', 'Negative', 'Neutral'].
     """
-    data = [
-        [date, counts.get("Positive", 0), counts.get("Negative", 0), counts.get("Neutral", 0)]
-        for date, counts in sentiment_trends.items()
-    ]
-
-    df = pd.DataFrame(data, columns=["Date", "Positive", "Negative", "Neutral"])
+    # Build each column in one go rather than row by row
+    dates = list(sentiment_trends)
+    df = pd.DataFrame(
+        {
+            "Date": dates,
+            **{
+                label: np.fromiter((sentiment_trends[date].get(label, 0) for date in dates), dtype=np.int64, count=len(dates))
+                for label in ("Positive", "Negative", "Neutral")
+            },
+        }
+    )
     return df.sort_values("Date")  # Ensure chronological order
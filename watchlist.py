@@ -0,0 +1,520 @@
+import heapq
+import json
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from article_batch import SENTIMENT_CATEGORIES
+from article_store import get_article_store
+from metrics import REGISTRY
+from news_extraction import NEWS_SOURCES, get_session, iter_news
+from response_cache import normalize_company
+
+# Refresh interval of a priority-1 company; priority p is polled every BASE / p seconds at first
+WATCHLIST_BASE_INTERVAL = float(os.environ.get("WATCHLIST_BASE_INTERVAL", 1800))
+WATCHLIST_MIN_INTERVAL = float(os.environ.get("WATCHLIST_MIN_INTERVAL", 120))
+WATCHLIST_MAX_INTERVAL = float(os.environ.get("WATCHLIST_MAX_INTERVAL", 6 * 3600))
+WATCHLIST_WORKERS = int(os.environ.get("WATCHLIST_WORKERS", 4))
+
+# Result pages read on a company's first poll; later polls only read the first page
+WATCHLIST_INITIAL_PAGES = int(os.environ.get("WATCHLIST_INITIAL_PAGES", 3))
+
+# Rolling sentiment window per company, and the change in its sentiment mix (total variation
+# distance, 0-1) that raises an alert once at least WATCHLIST_MIN_ARTICLES arrived since the last one
+WATCHLIST_WINDOW = int(os.environ.get("WATCHLIST_WINDOW", 50))
+WATCHLIST_SHIFT_THRESHOLD = float(os.environ.get("WATCHLIST_SHIFT_THRESHOLD", 0.2))
+WATCHLIST_MIN_ARTICLES = int(os.environ.get("WATCHLIST_MIN_ARTICLES", 5))
+
+# Alerts are also POSTed as JSON to this URL when set
+WATCHLIST_WEBHOOK_URL = os.environ.get("WATCHLIST_WEBHOOK_URL")
+
+MAX_PRIORITY = 5
+
+# A poll finding this many new articles halves the interval (a page holds ~10, so bursts aren't missed);
+# a poll finding none stretches it by _SLOWDOWN
+_BUSY_ARTICLES = 5
+_SLOWDOWN = 1.5
+_JITTER = 0.1
+
+REGISTRY.describe("newsapp_watchlist_polls_total", "counter", "Watchlist polls by result (new, unchanged, error).")
+REGISTRY.describe("newsapp_watchlist_new_articles_total", "counter", "New articles found by watchlist polls.")
+REGISTRY.describe("newsapp_watchlist_alerts_total", "counter", "Sentiment-shift alerts raised by the watchlist.")
+
+
+def sentiment_shift(before: dict, after: dict) -> float:
+    """
+    Measure how far a sentiment mix moved, as the total variation distance of the two mixes.
+
+    Args:
+        before (dict): Label -> fraction of articles.
+        after (dict): Label -> fraction of articles.
+
+    Returns:
+        float: 0 for identical mixes, 1 when no label overlaps.
+    """
+    return 0.5 * sum(abs(after.get(label, 0.0) - before.get(label, 0.0)) for label in SENTIMENT_CATEGORIES)
+
+
+class WatchedCompany:
+    """
+    Scheduling and rolling sentiment state of one company on the watchlist.
+
+    The poll interval starts at `WATCHLIST_BASE_INTERVAL / priority` and adapts to how much news
+    each poll finds, within a quarter and eight times that target.
+    """
+
+    def __init__(self, company: str, priority: int = 1, sources: tuple = ("bing",)):
+        self.company = company
+        self.priority = priority
+        self.sources = tuple(sources)
+        self.interval = self.target_interval
+        self.next_due = None
+        self.last_polled = None
+        self.polls = 0
+        self.new_articles = 0
+        self.errors = 0
+        self.window = deque(maxlen=WATCHLIST_WINDOW)  # (sentiment, score) of the latest articles
+        self.mark = 0  # Article store insertion mark of the last article taken into the window
+        self.baseline = None  # Sentiment mix at the last alert
+        self.baseline_score = None
+        self.since_baseline = 0
+        self.seeded = False
+        self.running = False
+        self.version = 0  # Bumped on every reschedule so stale heap entries are skipped
+        self._window_lock = threading.Lock()  # Poll workers append while request threads read
+
+    @property
+    def target_interval(self) -> float:
+        return min(max(WATCHLIST_BASE_INTERVAL / self.priority, WATCHLIST_MIN_INTERVAL), WATCHLIST_MAX_INTERVAL)
+
+    @property
+    def interval_bounds(self) -> tuple:
+        target = self.target_interval
+        return max(target / 4, WATCHLIST_MIN_INTERVAL), min(target * 8, WATCHLIST_MAX_INTERVAL)
+
+    def add(self, articles: list) -> None:
+        """Append articles' sentiment to the rolling window, oldest first."""
+        with self._window_lock:
+            self.window.extend((article.get("sentiment"), article.get("sentiment_score")) for article in articles)
+
+    def _snapshot(self) -> list:
+        with self._window_lock:
+            return list(self.window)
+
+    def mix(self) -> dict:
+        """Fraction of each sentiment label in the rolling window."""
+        window = self._snapshot()
+        counts = dict.fromkeys(SENTIMENT_CATEGORIES, 0)
+        for sentiment, _ in window:
+            if sentiment in counts:
+                counts[sentiment] += 1
+        total = len(window) or 1
+        return {label: round(count / total, 4) for label, count in counts.items()}
+
+    def mean_score(self):
+        """Mean compound sentiment score of the rolling window (None when empty)."""
+        scores = [score for _, score in self._snapshot() if score is not None]
+        return round(sum(scores) / len(scores), 4) if scores else None
+
+    def to_dict(self) -> dict:
+        """
+        Summarize the company's state for status responses.
+
+        Returns:
+            dict: Company, priority, interval and schedule, poll counters and the rolling sentiment.
+        """
+        return {
+            "company": self.company,
+            "priority": self.priority,
+            "sources": list(self.sources),
+            "interval": round(self.interval, 1),
+            "next_due": self.next_due,
+            "last_polled": self.last_polled,
+            "polls": self.polls,
+            "new_articles": self.new_articles,
+            "errors": self.errors,
+            "window": len(self._snapshot()),
+            "sentiment_mix": self.mix(),
+            "mean_score": self.mean_score(),
+        }
+
+
+class QueueAlertSink:
+    """
+    In-process stand-in for a message queue: keeps the latest alerts for a consumer to drain.
+
+    When the queue is full the oldest alert is dropped, so a stalled consumer never blocks polling.
+    """
+
+    def __init__(self, maxsize: int = 1000):
+        self.queue = queue.Queue(maxsize)
+
+    def send(self, alert: dict) -> None:
+        while True:
+            try:
+                self.queue.put_nowait(alert)
+                return
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def drain(self, max_items: int = None) -> list:
+        """Remove and return queued alerts, oldest first."""
+        alerts = []
+        while max_items is None or len(alerts) < max_items:
+            try:
+                alerts.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return alerts
+
+
+class WebhookAlertSink:
+    """POSTs each alert as JSON to a webhook URL over the shared HTTP session."""
+
+    def __init__(self, url: str, timeout: float = 5):
+        self.url = url
+        self.timeout = timeout
+
+    def send(self, alert: dict) -> None:
+        response = get_session().post(self.url, json=alert, timeout=self.timeout)
+        response.raise_for_status()
+
+
+# Alerts of the process-wide watchlist, for consumers inside the process
+ALERT_QUEUE = QueueAlertSink()
+
+
+def default_sinks() -> list:
+    """The alert queue, plus the webhook when `WATCHLIST_WEBHOOK_URL` is set."""
+    sinks = [ALERT_QUEUE]
+    if WATCHLIST_WEBHOOK_URL:
+        sinks.append(WebhookAlertSink(WATCHLIST_WEBHOOK_URL))
+    return sinks
+
+
+class Watchlist:
+    """
+    Background monitor that keeps a list of companies' news and sentiment up to date.
+
+    Companies are polled from a due-time heap on a small worker pool. First polls are spread over
+    each company's interval, and every poll only processes articles that are not in the article
+    store yet. Intervals shrink while a company produces a lot of news and stretch while it is
+    quiet. Each company keeps a rolling sentiment window, and an alert is sent to the sinks when
+    its sentiment mix moves by `WATCHLIST_SHIFT_THRESHOLD` or more since the last alert.
+    """
+
+    def __init__(self, store=None, sinks: list = None, workers: int = WATCHLIST_WORKERS, fetcher=None):
+        self._store = store
+        self.sinks = default_sinks() if sinks is None else list(sinks)
+        self.workers = workers
+        self.fetcher = fetcher
+        self.recent_alerts = deque(maxlen=100)
+        self._companies = {}
+        self._heap = []  # (due time, company key, version)
+        self._running = 0
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="watch")
+        self._thread = None
+        self._stopped = False
+
+    @property
+    def store(self):
+        return self._store or get_article_store()
+
+    def watch(self, company: str, priority: int = 1, sources: tuple = ("bing",)) -> WatchedCompany:
+        """
+        Add a company to the watchlist, or update its priority and sources.
+
+        Args:
+            company (str): Company name.
+            priority (int): 1 (least frequent) to `MAX_PRIORITY` (most frequent polling).
+            sources (tuple): Names of news sources to poll.
+
+        Returns:
+            WatchedCompany: The company's state.
+
+        Raises:
+            ValueError: If the priority is out of range.
+        """
+        if not 1 <= priority <= MAX_PRIORITY:
+            raise ValueError(f"priority must be between 1 and {MAX_PRIORITY}")
+        key = normalize_company(company)
+        with self._wakeup:
+            item = self._companies.get(key)
+            if item is None:
+                item = self._companies[key] = WatchedCompany(company, priority, sources)
+                # Stagger first polls so a large watchlist doesn't hit the sources all at once
+                self._schedule(item, random.uniform(0, item.interval))
+            elif (priority, tuple(sources)) != (item.priority, item.sources):
+                item.priority, item.sources = priority, tuple(sources)
+                item.interval = item.target_interval
+                if not item.running:
+                    self._schedule(item, min(item.interval, max(item.next_due - time.time(), 0)))
+            self._wakeup.notify()
+            return item
+
+    def unwatch(self, company: str) -> bool:
+        """Remove a company; returns False if it wasn't watched."""
+        with self._lock:
+            return self._companies.pop(normalize_company(company), None) is not None
+
+    def companies(self) -> list:
+        """State of every watched company, soonest due first."""
+        with self._lock:
+            items = list(self._companies.values())
+        return [item.to_dict() for item in sorted(items, key=lambda item: item.next_due or 0)]
+
+    def _schedule(self, item: WatchedCompany, delay: float) -> None:
+        """Queue the company's next poll `delay` seconds from now, with jitter (caller holds the lock)."""
+        item.version += 1
+        item.next_due = time.time() + delay * random.uniform(1 - _JITTER, 1 + _JITTER)
+        heapq.heappush(self._heap, (item.next_due, normalize_company(item.company), item.version))
+
+    def start(self) -> None:
+        """Start the scheduler thread (no-op if it is already running)."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stopped = False
+            self._thread = threading.Thread(target=self._loop, name="watchlist", daemon=True)
+            self._thread.start()
+        print(f"👀 Watchlist monitor started ({len(self._companies)} companies)")
+
+    def stop(self) -> None:
+        """Stop the scheduler thread; polls already running finish in the background."""
+        with self._wakeup:
+            self._stopped = True
+            thread, self._thread = self._thread, None
+            self._wakeup.notify()
+        if thread is not None:
+            thread.join()
+
+    def _loop(self) -> None:
+        """Dispatch due companies to the worker pool and sleep until the next one is due."""
+        with self._wakeup:
+            while not self._stopped:
+                self._wakeup.wait(self._dispatch_due())
+
+    def _dispatch_due(self):
+        """
+        Submit due polls while workers are free (caller holds the lock).
+
+        Returns:
+            float | None: Seconds until the next poll is due, or None to wait for a notification.
+        """
+        while self._heap and self._running < self.workers:
+            due, key, version = self._heap[0]
+            item = self._companies.get(key)
+            if item is None or item.version != version:
+                heapq.heappop(self._heap)  # Unwatched or rescheduled since
+                continue
+            if due > time.time():
+                return due - time.time()
+            heapq.heappop(self._heap)
+            item.running = True
+            self._running += 1
+            self._pool.submit(self._run_poll, item)
+        return None
+
+    def _run_poll(self, item: WatchedCompany) -> None:
+        """Poll one company, then schedule its next poll from the adapted interval."""
+        try:
+            self.poll(item)
+        finally:
+            with self._wakeup:
+                self._running -= 1
+                item.running = False
+                if self._companies.get(normalize_company(item.company)) is item:
+                    self._schedule(item, item.interval)
+                self._wakeup.notify()
+
+    def _seed(self, item: WatchedCompany) -> None:
+        """Fill a company's rolling window from its stored history and start tracking from the newest row."""
+        item.mark = self.store.last_mark(item.company)
+        item.add(list(reversed(self.store.articles(item.company, limit=WATCHLIST_WINDOW))))
+        if len(item.window) >= WATCHLIST_MIN_ARTICLES:
+            item.baseline, item.baseline_score = item.mix(), item.mean_score()
+        item.seeded = True
+
+    def poll(self, item: WatchedCompany) -> dict:
+        """
+        Fetch and score a company's new articles, update its rolling sentiment and adapt its interval.
+
+        New articles are those stored since the company's last poll, whoever stored them, so news
+        first fetched by an /analyze request or the app still reaches the rolling window.
+
+        Args:
+            item (WatchedCompany): The company to poll.
+
+        Returns:
+            dict: Company, number of new articles, sentiment shift since the last alert and the alert raised (or None).
+        """
+        first = not item.seeded
+        try:
+            if first:
+                self._seed(item)
+            for _ in iter_news(
+                item.company,
+                sources=item.sources,
+                pages=WATCHLIST_INITIAL_PAGES if first else 1,
+                limit=None,
+                fetcher=self.fetcher,
+                store=self.store,
+            ):
+                pass
+            new, item.mark = self.store.added_since(item.company, item.mark)
+        except Exception as e:
+            print(f"❌ Watchlist poll for {item.company} failed: {e}")
+            item.errors += 1
+            item.interval = min(item.interval * 2, item.interval_bounds[1])
+            REGISTRY.inc("newsapp_watchlist_polls_total", result="error")
+            return {"company": item.company, "new_articles": 0, "shift": None, "alert": None}
+
+        item.polls += 1
+        item.last_polled = time.time()
+        item.new_articles += len(new)
+        new.sort(key=lambda article: article.get("published_at") or "")
+        item.add(new)
+        item.since_baseline += len(new)
+
+        shift, alert = None, None
+        if item.baseline is None:
+            if len(item.window) >= WATCHLIST_MIN_ARTICLES:
+                item.baseline, item.baseline_score = item.mix(), item.mean_score()
+                item.since_baseline = 0
+        elif new:
+            mix = item.mix()
+            shift = sentiment_shift(item.baseline, mix)
+            if shift >= WATCHLIST_SHIFT_THRESHOLD and item.since_baseline >= WATCHLIST_MIN_ARTICLES:
+                alert = self._alert(item, shift, mix, new)
+
+        low, high = item.interval_bounds
+        if alert or len(new) >= _BUSY_ARTICLES:
+            item.interval = max(item.interval / 2, low)
+        elif not new:
+            item.interval = min(item.interval * _SLOWDOWN, high)
+
+        REGISTRY.inc("newsapp_watchlist_polls_total", result="new" if new else "unchanged")
+        REGISTRY.inc("newsapp_watchlist_new_articles_total", len(new))
+        return {"company": item.company, "new_articles": len(new), "shift": shift, "alert": alert}
+
+    def _alert(self, item: WatchedCompany, shift: float, mix: dict, new: list) -> dict:
+        """Build a sentiment-shift alert, deliver it to every sink and reset the company's baseline."""
+        alert = {
+            "company": item.company,
+            "detected_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "shift": round(shift, 4),
+            "before": item.baseline,
+            "after": mix,
+            "mean_score_before": item.baseline_score,
+            "mean_score_after": item.mean_score(),
+            "articles_since_last_alert": item.since_baseline,
+            "headlines": [{"title": a.get("title"), "url": a.get("url"), "sentiment": a.get("sentiment")} for a in new[-5:]],
+        }
+        item.baseline, item.baseline_score = mix, alert["mean_score_after"]
+        item.since_baseline = 0
+
+        print(f"🔔 Sentiment shift for {item.company}: {shift:.2f} ({alert['before']} -> {mix})")
+        REGISTRY.inc("newsapp_watchlist_alerts_total")
+        self.recent_alerts.append(alert)
+        for sink in self.sinks:
+            try:
+                sink.send(alert)
+            except Exception as e:
+                print(f"Error delivering alert for {item.company} to {type(sink).__name__}: {e}")
+        return alert
+
+    def stats(self) -> dict:
+        """
+        Report scheduler state.
+
+        Returns:
+            dict: Companies watched, polls running, polls overdue and the mean poll interval.
+        """
+        now = time.time()
+        with self._lock:
+            items = list(self._companies.values())
+            running = self._running
+        return {
+            "companies": len(items),
+            "running": running,
+            "overdue": sum(1 for item in items if not item.running and item.next_due is not None and item.next_due < now),
+            "mean_interval": round(sum(item.interval for item in items) / len(items), 1) if items else None,
+        }
+
+
+def parse_entry(entry) -> tuple:
+    """
+    Validate one watchlist entry: a company name or a {"company", "priority", "sources"} object.
+
+    Returns:
+        tuple: (company, priority, sources).
+
+    Raises:
+        ValueError: If the company is missing, a source is unknown or the priority is out of range.
+    """
+    entry = {"company": entry} if isinstance(entry, str) else entry
+    if not isinstance(entry, dict) or not isinstance(entry.get("company"), str) or not entry["company"].strip():
+        raise ValueError("Each entry needs a company name")
+    sources = entry.get("sources", ["bing"])
+    if (
+        not isinstance(sources, list)
+        or not sources
+        or any(not isinstance(source, str) or source not in NEWS_SOURCES for source in sources)
+    ):
+        raise ValueError(f"sources must be a list drawn from {', '.join(NEWS_SOURCES)}")
+    priority = entry.get("priority", 1)
+    if not isinstance(priority, int) or isinstance(priority, bool) or not 1 <= priority <= MAX_PRIORITY:
+        raise ValueError(f"priority must be an integer between 1 and {MAX_PRIORITY}")
+    return entry["company"], priority, tuple(sources)
+
+
+def load_watchlist(path: str) -> list:
+    """
+    Read a watchlist file: a JSON list of company names or {"company", "priority", "sources"} objects.
+
+    Returns:
+        list: (company, priority, sources) tuples.
+
+    Raises:
+        ValueError: If the file isn't a JSON list or an entry is invalid (see `parse_entry`).
+    """
+    with open(path, encoding="utf-8") as f:
+        entries = json.load(f)
+    if not isinstance(entries, list):
+        raise ValueError(f"{path} must hold a JSON list of watchlist entries")
+    watched = []
+    for number, entry in enumerate(entries, 1):
+        try:
+            watched.append(parse_entry(entry))
+        except ValueError as e:
+            raise ValueError(f"{path}, entry {number}: {e}") from None
+    return watched
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        sys.exit("usage: python watchlist.py <watchlist.json>")
+    try:
+        watched = load_watchlist(sys.argv[1])
+    except (OSError, ValueError) as e:
+        sys.exit(f"Invalid watchlist file: {e}")
+    monitor = Watchlist()
+    for company, priority, sources in watched:
+        monitor.watch(company, priority, sources)
+    monitor.start()
+    try:
+        while True:
+            time.sleep(60)
+    except KeyboardInterrupt:
+        monitor.stop()